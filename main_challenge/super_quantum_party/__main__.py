@@ -1,8 +1,29 @@
+import argparse
+import atexit
+import time
 import pygame, sys
-from super_quantum_party.settings import WIDTH, HEIGHT, FPS
+from super_quantum_party.settings import WIDTH, HEIGHT, FPS, TRACE_DIR, TRACE_FORMAT, OVERLAY, \
+    PROFILE, PROFILER, PROFILE_DIR, PROFILE_FRAMES, JOB_REPORT, MEMORY
 from super_quantum_party.ui.widgets import init_fonts
+from super_quantum_party.ui.overlay import PerfOverlay
+from super_quantum_party.core import assets, jobs, memory, trace
+from super_quantum_party.core.profiling import Profiler
 from super_quantum_party.core.scene import SceneManager
 from super_quantum_party.scenes.menu import MenuScene
+from super_quantum_party.scenes.game import GameScene
+from super_quantum_party.scenes.gate import GateScene
+from super_quantum_party.scenes.winner import WinnerScene
+from super_quantum_party.scenes.loading import LoadingScene
+from super_quantum_party import quantum_dice
+
+# ─── command line ──────────────────────────────────────────────────────
+parser = argparse.ArgumentParser(prog="python -m super_quantum_party")
+parser.add_argument("--join", metavar="HOST[:PORT]",
+                    help="join a LAN game hosted with super_quantum_party.net.server")
+parser.add_argument("--name", default="", help="your name in a LAN game")
+parser.add_argument("--quit-after-frames", type=int, default=0, metavar="N",
+                    help="exit after drawing N frames of the menu (startup benchmark)")
+args = parser.parse_args()
 
 # ─── initialise Pygame & fonts ─────────────────────────────────────────
 pygame.init()
@@ -10,22 +31,73 @@ screen = pygame.display.set_mode((WIDTH, HEIGHT))
 clock  = pygame.time.Clock()
 pygame.display.set_caption("Super Quantum Party")
 
-# Fonts must be created *after* pygame.init()
-FONT_L = pygame.font.SysFont(None, 72)
-FONT_M = pygame.font.SysFont(None, 32)
-FONT_S = pygame.font.SysFont(None, 24)
+# Fonts must be created *after* pygame.init(); the scenes share them through the registry
+FONT_L = assets.font(None, 72)
+FONT_M = assets.font(None, 32)
+FONT_S = assets.font(None, 24)
 init_fonts(FONT_L, FONT_M, FONT_S)          # give them to the widgets
 
 # ─── boot the first scene ──────────────────────────────────────────────
-manager = SceneManager(MenuScene(None))     # create scene without manager
-manager.scene.manager = manager             # then patch back-reference
+# images, sounds and fonts load on worker threads behind a progress bar
+make_first = MenuScene
+if args.join:
+    from super_quantum_party.net.client import NetClient
+    from super_quantum_party.net.protocol import DEFAULT_PORT
+    from super_quantum_party.scenes.network import LobbyScene
+    host, _, port = args.join.partition(":")
+    client = NetClient(host, int(port or DEFAULT_PORT), args.name)
+    make_first = lambda manager: LobbyScene(manager, client)
+manager = SceneManager(LoadingScene(None, make_first, MenuScene.ASSETS + GameScene.ASSETS +
+                                    GateScene.ASSETS + WinnerScene.ASSETS))
+manager.scene.manager = manager             # patch the back-reference
+
+# ─── diagnostics: F3 overlay, traces, F4 profiles, jobs, memory ────────
+overlay = PerfOverlay(OVERLAY)
+if TRACE_DIR:
+    print(f">>> tracing to {trace.start(TRACE_DIR, TRACE_FORMAT)}")
+    atexit.register(trace.stop)
+profiler = Profiler(PROFILER, PROFILE_DIR)
+atexit.register(profiler.finish)            # a capture cut short by quitting is kept
+if PROFILE:
+    profiler.start(manager.scene, None if PROFILE == "scene" else int(PROFILE))
+jobs.report_at_exit(JOB_REPORT)
+if MEMORY:
+    memory.start()
+    atexit.register(lambda: print("\n".join(memory.report())))
 
 # ─── main loop ─────────────────────────────────────────────────────────
+frames = 0
 while True:
     dt = clock.tick(FPS) / 1000
+    start = time.perf_counter_ns()
     for event in pygame.event.get():
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            overlay.toggle()
+            continue
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            until_switch = event.mod & pygame.KMOD_SHIFT
+            profiler.start(manager.scene, None if until_switch else PROFILE_FRAMES)
+            continue
         manager.handle_event(event)
 
     manager.update(dt)
     manager.draw(screen)
+    overlay.update(dt)
+    overlay.draw(screen)
     pygame.display.flip()
+    trace.frame(start, time.perf_counter_ns())
+    if profiler.active:
+        profiler.frame_done(manager.scene)
+    if isinstance(manager.scene, LoadingScene):
+        continue                    # frames count from the menu (or LAN lobby) on
+    frames += 1
+    if frames == 1:
+        if args.quit_after_frames:
+            from super_quantum_party.startup import FIRST_FRAME
+            print(FIRST_FRAME, file=sys.stderr, flush=True)
+        else:
+            # the menu is up and the asset threads are done: load qiskit/Aer
+            # in the background before the first roll
+            quantum_dice.start_warm_up()
+    if frames == args.quit_after_frames:
+        pygame.quit(); sys.exit()
@@ -0,0 +1,356 @@
+"""
+Shared fonts, images and sounds, loaded once and ahead of time.
+
+An asset is identified by a small tuple (``image_asset``, ``sound_asset``,
+``music_asset``, ``font_asset``, ``map_asset``) – its kind, file or font
+name and size.  ``preload(assets)`` decodes them on worker threads –
+pygame releases the GIL while it decodes and scales – and ``poll()``,
+called every frame by ``scenes.loading.LoadingScene`` on the main thread,
+converts the finished images to the display's pixel format once and
+reports progress.
+
+Files are read through ``core.bundle`` – from the packed asset bundle when
+there is one, else from the loose files, wherever the game is launched.
+Scaled images and map thumbnails are derived once and kept as small PNGs
+in ``settings.CACHE_DIR``, named after the source's SHA-256 and the target
+size, so later launches decode the small file instead of the full-size one.
+
+The registry hands out one object per asset.  ``acquire(asset)`` returns a
+``Handle`` and counts it; the object stays cached while any handle is
+live.  Scenes hold theirs through ``Scene.resource``, which releases them
+when the scene is collected.  Unreferenced objects are kept, least
+recently used first out, while they fit in ``IDLE_BUDGET`` bytes, so going
+back to a scene does not reload it.  ``get(asset)`` – and ``image``,
+``sound``, ``music``, ``font`` – borrows an object without counting it,
+for per-frame lookups and process-wide fonts.
+
+Scenes list what they need in an ``ASSETS`` class attribute so the
+loading screen can preload it.  Anything not preloaded is loaded on the
+spot, which headless tools (``video``) rely on.  ``footprint()`` and
+``report()`` give the registry's memory use:
+
+    $ python -m super_quantum_party.core.assets
+"""
+from __future__ import annotations
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from super_quantum_party.core import bundle
+from super_quantum_party.settings import CACHE_DIR
+
+IDLE_BUDGET = 32 << 20      # bytes of unreferenced objects kept for later
+
+_entries = {}               # asset -> _Entry
+_idle = OrderedDict()       # unreferenced assets, least recently used first
+_idle_bytes = 0
+_pending = {}               # asset -> Future
+_executor = None
+_total = 0                  # assets requested by preload() so far
+
+
+class _Entry:
+    __slots__ = ("value", "refs", "nbytes")
+
+    def __init__(self, value, nbytes):
+        self.value = value
+        self.refs = 0
+        self.nbytes = nbytes
+
+
+class Handle:
+    """A counted reference to a shared asset; ``value`` is the object."""
+    __slots__ = ("asset", "value", "live")
+
+    def __init__(self, asset, value):
+        self.asset = asset
+        self.value = value
+        self.live = True
+
+    def release(self):
+        if self.live:
+            self.live = False
+            release(self.asset)
+
+
+# ── asset descriptions ─────────────────────────────────────────────────
+def image_asset(path, size=None, alpha=False):
+    """An image file, optionally scaled to ``size`` (per-pixel alpha if ``alpha``)."""
+    return ("image", path, tuple(size) if size else None, bool(alpha))
+
+
+def sound_asset(path):
+    return ("sound", path)
+
+
+def music_asset(path):
+    """A music file kept in memory and streamed by ``pygame.mixer.music``."""
+    return ("music", path)
+
+
+def font_asset(name=None, size=24):
+    """pygame's default font (``None``), a system font name or a font file."""
+    return ("font", name, int(size))
+
+
+def map_asset(name, size):
+    """A thumbnail of the map ``name`` drawn from its YAML (``maps.thumbnail``)."""
+    return ("map", name, tuple(size))
+
+
+# ── loading ────────────────────────────────────────────────────────────
+def _derived(digest, size, make):
+    """The surface cached for ``(digest, size)``, or ``make()`` stored there."""
+    if not CACHE_DIR:
+        return make()
+    path = os.path.join(CACHE_DIR, f"{digest[:24]}-{size[0]}x{size[1]}.png")
+    if os.path.isfile(path):
+        try:
+            return pygame.image.load(path)
+        except pygame.error:
+            pass                                # truncated or foreign file: rebuild it
+    surf = make()
+    tmp = f"{path[:-4]}.{os.getpid()}-{threading.get_ident()}.png"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pygame.image.save(surf, tmp)
+        os.replace(tmp, path)
+    except (OSError, pygame.error):
+        pass                                    # read-only cache: just don't keep it
+    return surf
+
+
+def _scaled(path, size):
+    data = bundle.read(path)
+    digest = hashlib.sha256(data).hexdigest()
+
+    def make():
+        surf = pygame.image.load(bundle.View(data), path)
+        if surf.get_size() == size:
+            return surf
+        try:
+            return pygame.transform.smoothscale(surf, size)
+        except ValueError:                      # palette images: no smooth scaling
+            return pygame.transform.scale(surf, size)
+    return _derived(digest, size, make)
+
+
+def _map_thumbnail(name, size):
+    from super_quantum_party.maps import registry, thumbnail
+    cmap = registry.get_map(name).load()
+    return _derived("map-" + cmap.digest.hex(), size, lambda: thumbnail.render(cmap, size))
+
+
+def _font_file(name):
+    if name is None or os.path.isfile(name):
+        return name
+    return pygame.font.match_font(name) or None     # missing fonts fall back to the default
+
+
+def _decode(asset):
+    """Worker-thread part of loading ``asset`` (no display access)."""
+    kind, path = asset[0], asset[1]
+    if kind == "image":
+        if asset[2] is None:
+            with bundle.open(path) as f:
+                return pygame.image.load(f, path)
+        return _scaled(path, asset[2])
+    if kind == "map":
+        return _map_thumbnail(path, asset[2])
+    if kind == "sound":
+        with bundle.open(path) as f:
+            return pygame.mixer.Sound(file=f)
+    if kind == "music":
+        return bundle.read(path)
+    if kind == "font":
+        if not pygame.font.get_init():
+            pygame.font.init()
+        return pygame.font.Font(_font_file(path), asset[2])
+    raise ValueError(f"unknown asset {asset!r}")
+
+
+def _nbytes(asset, value):
+    """Approximate memory held by a loaded asset."""
+    kind = asset[0]
+    if kind in ("image", "map"):
+        return value.get_pitch() * value.get_height()
+    if kind == "sound":
+        freq, fmt, channels = pygame.mixer.get_init() or (44100, -16, 2)
+        return round(value.get_length() * freq) * (abs(fmt) // 8) * channels
+    if kind == "music":
+        return len(value)
+    if kind == "font":                          # the font file, which FreeType keeps open
+        path = _font_file(asset[1])
+        if path is None:
+            path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+        return os.path.getsize(path) if os.path.isfile(path) else 0
+    return 0
+
+
+def _finish(asset, value):
+    """Main-thread part: convert images to the display format, once."""
+    if asset[0] == "image" and pygame.display.get_surface() is not None:
+        value = value.convert_alpha() if asset[3] else value.convert()
+    elif asset[0] == "map" and pygame.display.get_surface() is not None:
+        value = value.convert()
+    entry = _entries[asset] = _Entry(value, _nbytes(asset, value))
+    _park(asset, entry)
+    return entry
+
+
+def _park(asset, entry):
+    """Put an unreferenced entry at the young end of the idle list; trim it."""
+    global _idle_bytes
+    _idle[asset] = None
+    _idle_bytes += entry.nbytes
+    while _idle_bytes > IDLE_BUDGET and len(_idle) > 1:
+        old, _ = _idle.popitem(last=False)
+        _idle_bytes -= _entries.pop(old).nbytes
+
+
+def _entry(asset):
+    entry = _entries.get(asset)
+    if entry is None:
+        future = _pending.pop(asset, None)
+        entry = _finish(asset, future.result() if future is not None else _decode(asset))
+    elif asset in _idle:
+        _idle.move_to_end(asset)
+    return entry
+
+
+def preload(assets, workers=4):
+    """Start decoding ``assets`` in the background."""
+    global _executor, _total
+    if _executor is None:
+        _executor = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+    for asset in assets:
+        if asset not in _entries and asset not in _pending:
+            _pending[asset] = _executor.submit(_decode, asset)
+            _total += 1
+
+
+def poll():
+    """Collect finished loads; returns ``(loaded, requested)``."""
+    for asset, future in list(_pending.items()):
+        if future.done():
+            del _pending[asset]
+            _finish(asset, future.result())
+    return _total - len(_pending), _total
+
+
+def ready():
+    done, total = poll()
+    return done == total
+
+
+# ── sharing ────────────────────────────────────────────────────────────
+def acquire(asset):
+    """A counted ``Handle`` on ``asset``, loading it if needed."""
+    global _idle_bytes
+    entry = _entry(asset)
+    if entry.refs == 0:
+        del _idle[asset]
+        _idle_bytes -= entry.nbytes
+    entry.refs += 1
+    return Handle(asset, entry.value)
+
+
+def release(asset):
+    """Drop one reference taken by ``acquire``."""
+    entry = _entries[asset]
+    entry.refs -= 1
+    if entry.refs == 0:
+        _park(asset, entry)
+
+
+def release_all(handles):
+    for handle in handles:
+        handle.release()
+    handles.clear()
+
+
+def get(asset):
+    """The loaded ``asset``, borrowed: waits for (or does) its load if needed."""
+    return _entry(asset).value
+
+
+def image(path, size=None, alpha=False):
+    return get(image_asset(path, size, alpha))
+
+
+def sound(path):
+    return get(sound_asset(path))
+
+
+def music(path):
+    """A fresh file object over the music's bytes, for ``mixer.music.load``."""
+    return bundle.View(get(music_asset(path)))
+
+
+def font(name=None, size=24):
+    return get(font_asset(name, size))
+
+
+# ── memory ─────────────────────────────────────────────────────────────
+def footprint():
+    """``{kind: (objects, bytes)}`` plus ``"in use"`` and ``"idle"`` byte totals."""
+    out = {}
+    for asset, entry in _entries.items():
+        n, size = out.get(asset[0], (0, 0))
+        out[asset[0]] = (n + 1, size + entry.nbytes)
+    out["in use"] = sum(e.nbytes for e in _entries.values() if e.refs)
+    out["idle"] = _idle_bytes
+    return out
+
+
+def cached():
+    """The registry's objects, in use or idle."""
+    return [entry.value for entry in _entries.values()]
+
+
+def _label(asset):
+    kind, name = asset[0], asset[1] or "default"
+    if kind == "image":
+        size = "x".join(map(str, asset[2])) if asset[2] else "native"
+        return f"image {name} ({size}{', alpha' if asset[3] else ''})"
+    if kind == "font":
+        return f"font {name} {asset[2]}px"
+    if kind == "map":
+        return f"map {name} ({asset[2][0]}x{asset[2][1]} thumbnail)"
+    return f"{kind} {name}"
+
+
+def report(top=10):
+    """Lines describing the registry: totals per kind, then the largest assets."""
+    fp = footprint()
+    lines = [f"assets: {fp['in use'] / 1024:.0f} KiB in use, "
+             f"{fp['idle'] / 1024:.0f} KiB idle (budget {IDLE_BUDGET / 1024:.0f} KiB)"]
+    for kind in ("image", "map", "sound", "music", "font"):
+        if kind in fp:
+            n, size = fp[kind]
+            lines.append(f"  {kind:6} {n:4} objects {size / 1024:10.0f} KiB")
+    biggest = sorted(_entries.items(), key=lambda item: -item[1].nbytes)[:top]
+    for asset, entry in biggest:
+        lines.append(f"  {entry.nbytes / 1024:10.0f} KiB  refs {entry.refs}  {_label(asset)}")
+    return lines
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from super_quantum_party.settings import WIDTH, HEIGHT
+    from super_quantum_party.scenes.game import GameScene
+    from super_quantum_party.scenes.gate import GateScene
+    from super_quantum_party.scenes.menu import MenuScene
+    from super_quantum_party.scenes.winner import WinnerScene
+
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    preload(MenuScene.ASSETS + GameScene.ASSETS + GateScene.ASSETS + WinnerScene.ASSETS)
+    for asset in list(_pending):
+        get(asset)
+    print("\n".join(report()))
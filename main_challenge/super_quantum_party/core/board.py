@@ -1,34 +1,69 @@
 import random
 import networkx as nx
+
+
 class Board:
-    def __init__(self, spaces):
-        self.spaces = {space.id: space for space in spaces}
-        self.graph = nx.DiGraph()
-        for space in spaces:
-            for next_space in space.next_spaces:
-                self.graph.add_edge(space.id, next_space)
+    """
+    Immutable topology of a map, shared by every game played on it.
+
+    ``successors(node, topology)`` gives the outgoing tiles of ``node`` for
+    each measurement outcome of the gate minigame (``"00"`` is the original
+    board).  Tile types are the *initial* types; stars move during a game,
+    so the live types belong to the game state.
+    """
+    def __init__(self, ids, types, topologies):
+        self.ids = list(ids)
+        self.index = {n: i for i, n in enumerate(self.ids)}   # node -> integer id
+        self.types = dict(types)
+        self.succ = {}
+        for outcome, edges in topologies.items():
+            succ = {n: [] for n in self.ids}
+            for u, v in edges:
+                succ[u].append(v)
+            self.succ[outcome] = succ
+        self.start = self.ids[0]
+
+    @classmethod
+    def from_graph(cls, g: nx.DiGraph, topologies=None):
+        """Build a board from an attributed graph (and its precomputed variants)."""
+        if topologies is None:
+            from super_quantum_party.maps.compiler import topology_variants
+            topologies = topology_variants(g)
+        types = {n: d.get("type", 1) for n, d in g.nodes(data=True)}
+        return cls(g.nodes, types, topologies)
+
+    @classmethod
+    def from_compiled(cls, cmap):
+        """Build a board from a ``maps.compiler.CompiledMap``."""
+        return cls(cmap.ids, zip(cmap.ids, cmap.types.tolist()), cmap.topologies())
+
+    def successors(self, space_id, topology="00"):
+        """Tiles reachable in one step from ``space_id``."""
+        return self.succ[topology].get(space_id, [])
 
     def get_next_spaces(self, space_id):
         """
         Get the next spaces from a given space ID.
         """
-        return self.spaces[space_id].next_spaces if space_id in self.spaces else []
+        return self.successors(space_id)
 
-    def choose_branch(self, current, next_options, player):
+    def choose_branch(self, current, next_options, player, steps=1, topology="00"):
         """
-        Choose a branch based on the player's gates or randomly.
+        Choose the next tile at a fork: the player's bot decides, anybody
+        else goes a random way.
         """
         if not next_options:
             return current  # No options to choose from
-        if player.gates:
-            # Prefer a gate if available
-            gate_choices = [opt for opt in next_options if opt in player.gates]
-            if gate_choices:
-                return random.choice(gate_choices)
+        bot = getattr(player, "bot", None)
+        if bot is not None:
+            return bot.pick_branch(self, self.types, topology, next_options, steps)
         return random.choice(next_options)
 
     def draw_ascii(self):
         """
         Draw the board as an ASCII representation.
         """
-        return "\n".join(str(space) for space in self.spaces.values())
\ No newline at end of file
+        return "\n".join(
+            f"{n} (type {self.types[n]}) -> {', '.join(self.successors(n))}"
+            for n in self.ids
+        )
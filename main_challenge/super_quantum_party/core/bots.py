@@ -0,0 +1,274 @@
+"""
+Computer players.
+
+A bot is attached to a ``Player`` (``player.bot``; ``None`` means a human at
+the keyboard) and decides that player's engine actions:
+
+    random       uniform choices, like ``engine.random_policy``; in the gate
+                 minigame it only places or skips while a human is playing
+    greedy       at an intersection, take the path closest to a star; in the
+                 gate minigame, the single best placement
+    expectimax   search the rest of the walk and the next turn's two-dice
+                 roll, maximising stars and blue-tile rewards; search the
+                 whole gate round (``core.gate_ai``)
+
+Every bot is also usable as an engine policy, and ``bot_policy`` dispatches
+to the bot of whichever player has to act, so fully bot-driven games run
+with ``engine.play(engine, bot_policy)``.
+
+Searches share memo tables keyed by (board, topology, star tiles), so after
+the first decision on a board most lookups are cache hits.  The expectimax
+search deepens one turn at a time within a time budget and keeps the
+deepest finished answer, so a decision always fits in a frame.
+"""
+import random
+import time
+from collections import deque
+
+from super_quantum_party.core.engine import (
+    ROLL, BRANCH, GATES, ROLL_DIE, SKIP, MEASURE, CONTINUE, branch, random_policy,
+)
+from super_quantum_party.quantum_dice import ROLL_DISTRIBUTION
+
+
+def _two_dice(dist):
+    total = sum(dist.values())
+    probs = {}
+    for a, pa in dist.items():
+        for b, pb in dist.items():
+            probs[a + b] = probs.get(a + b, 0.0) + pa * pb / total ** 2
+    return probs
+
+
+# distribution of the number of steps walked in a turn
+TWO_DICE = _two_dice(ROLL_DISTRIBUTION)
+
+
+def acting_player(engine):
+    """The player whose decision ``engine.legal_actions()`` is waiting for."""
+    s = engine.state
+    if s.phase == GATES:
+        return s.players[s.round.current]
+    return s.players[s.active]
+
+
+def star_tiles(types):
+    # a tuple of strings rather than a frozenset: the garbage collector
+    # stops tracking such keys, which keeps big memo tables cheap
+    return tuple(sorted(n for n, t in types.items() if t == 4))
+
+
+class _Tables:
+    """Per-board memo tables, dropped when the board object changes."""
+    MAX_ENTRIES = 500_000
+
+    def __init__(self):
+        self.board = None
+        self.dist = {}       # (topology, stars) -> {node: tiles to nearest star}
+        self.values = {}     # search transposition table
+
+    def check(self, board):
+        if board is not self.board or len(self.values) > self.MAX_ENTRIES:
+            self.board = board
+            self.dist.clear()
+            self.values.clear()
+
+
+class Bot:
+    """Base bot: rolls, skips its gate turns and lets ``pick_branch`` steer."""
+    level = None
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def __call__(self, engine, actions, rng=None):
+        return self.act(engine, actions)
+
+    def act(self, engine, actions):
+        s = engine.state
+        if s.phase == ROLL:
+            return ROLL_DIE
+        if s.phase == BRANCH:
+            return branch(self.choose_branch(engine))
+        if s.phase == GATES:
+            return self.gate_action(engine, actions)
+        return actions[0]
+
+    def choose_branch(self, engine):
+        s = engine.state
+        return self.pick_branch(engine.board, s.types, s.topology,
+                                s.branch_options, s.steps, engine.ruleset)
+
+    def pick_branch(self, board, types, topology, options, steps, ruleset=None):
+        """Next tile among ``options`` with ``steps`` left to walk (this one included)."""
+        return self.rng.choice(list(options))
+
+    def gate_action(self, engine, actions):
+        if SKIP in actions:
+            return SKIP
+        return MEASURE if MEASURE in actions else CONTINUE
+
+
+class RandomBot(Bot):
+    level = "random"
+
+    def gate_action(self, engine, actions):
+        if all(p.bot is not None for p in engine.players):
+            return random_policy(engine, actions, self.rng)
+        # measuring or moving on would end the round for the humans too
+        own = [a for a in actions if a not in (MEASURE, CONTINUE)]
+        if own:
+            return self.rng.choice(own)
+        return super().gate_action(engine, actions)
+
+
+class GreedyBot(Bot):
+    """Takes the way out that is fewest tiles from a star."""
+    level = "greedy"
+    _tables = _Tables()
+
+    def distances(self, board, topology, stars):
+        """Tiles from every node to its nearest star (reverse BFS, memoized)."""
+        tables = self._tables
+        tables.check(board)
+        key = (topology, stars)
+        dist = tables.dist.get(key)
+        if dist is None:
+            pred = {}
+            for u, succ in board.succ[topology].items():
+                for v in succ:
+                    pred.setdefault(v, []).append(u)
+            dist = dict.fromkeys(stars, 0)
+            queue = deque(stars)
+            while queue:
+                v = queue.popleft()
+                for u in pred.get(v, ()):
+                    if u not in dist:
+                        dist[u] = dist[v] + 1
+                        queue.append(u)
+            tables.dist[key] = dist
+        return dist
+
+    gate_depth = 1              # minigame: best single placement
+
+    def gate_action(self, engine, actions):
+        if SKIP not in actions:
+            return super().gate_action(engine, actions)
+        if getattr(self, "_gate_search", None) is None:
+            from super_quantum_party.core.gate_ai import GateSearch
+            self._gate_search = GateSearch(max_depth=self.gate_depth)
+        return self._gate_search.best_action(engine, actions)
+
+    def pick_branch(self, board, types, topology, options, steps, ruleset=None):
+        dist = self.distances(board, topology, star_tiles(types))
+        far = len(board.ids)
+        best = min(dist.get(n, far) for n in options)
+        return self.rng.choice([n for n in options if dist.get(n, far) == best])
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class ExpectimaxBot(GreedyBot):
+    """
+    Expectimax over the walk: max nodes at intersections, a chance node over
+    ``TWO_DICE`` for each following turn, and the star distance as the
+    heuristic at the search horizon.
+    """
+    level = "expectimax"
+    STAR_VALUE  = 10.0    # one star
+    GATE_VALUE  = 0.5     # one rewarded gate (tie-breaker and minigame ammo)
+    DIST_WEIGHT = 0.4     # per tile still between the player and a star
+    DISCOUNT    = 0.9     # per future turn
+    gate_depth  = 12      # minigame: search the round (within the time budget)
+
+    def __init__(self, seed=None, depth=2, time_budget=0.015):
+        super().__init__(seed)
+        self.depth = depth              # future turns searched after this walk
+        self.time_budget = time_budget  # seconds per decision
+
+    def _setup(self, board, types, topology, ruleset):
+        self._tables.check(board)
+        lo, hi = ruleset.reward_range if ruleset is not None else (1, 4)
+        self._reward = (lo + hi) / 2 * self.GATE_VALUE
+        self._board, self._types, self._topology = board, types, topology
+        self._deadline = time.perf_counter() + self.time_budget
+
+    def turn_value(self, board, types, topology, node, ruleset=None):
+        """Expected value of the next turn started on ``node`` under ``topology``."""
+        self._setup(board, types, topology, ruleset)
+        stars = star_tiles(types)
+        return sum(p * self._walk(node, total, stars, 0) for total, p in TWO_DICE.items())
+
+    def pick_branch(self, board, types, topology, options, steps, ruleset=None):
+        self._setup(board, types, topology, ruleset)
+        stars = star_tiles(types)
+        choice = None
+        for depth in range(self.depth + 1):
+            try:
+                scored = [(self._enter(n, steps - 1, stars, depth), n) for n in options]
+            except _OutOfTime:
+                break
+            best = max(v for v, _ in scored)
+            choice = [n for v, n in scored if v >= best - 1e-9]
+        if choice is None:      # not even the walk itself fitted: go greedy
+            return super().pick_branch(board, types, topology, options, steps, ruleset)
+        return self.rng.choice(choice)
+
+    def _enter(self, node, steps, stars, depth):
+        """Value of stepping onto ``node`` with ``steps`` left afterwards."""
+        if node in stars:
+            # the star moves to an unknown blue tile: search on without it
+            rest = tuple(n for n in stars if n != node)
+            return self.STAR_VALUE + self._walk(node, steps, rest, depth)
+        return self._walk(node, steps, stars, depth)
+
+    def _walk(self, node, steps, stars, depth):
+        key = (self._topology, node, steps, stars, depth, self._reward)
+        table = self._tables.values
+        value = table.get(key)
+        if value is None:
+            succ = self._board.succ[self._topology].get(node, [])
+            if steps <= 0 or not succ:
+                value = self._land(node, stars, depth)
+            else:
+                value = max(self._enter(n, steps - 1, stars, depth) for n in succ)
+            table[key] = value
+        return value
+
+    def _land(self, node, stars, depth):
+        """Value of ending the walk on ``node``."""
+        value = self._reward if self._types.get(node) in (1, 4) else 0.0
+        if depth > 0:
+            if time.perf_counter() > self._deadline:
+                raise _OutOfTime
+            future = sum(p * self._walk(node, total, stars, depth - 1)
+                         for total, p in TWO_DICE.items())
+            return value + self.DISCOUNT * future
+        if not stars:
+            return value
+        far = len(self._board.ids)
+        dist = self.distances(self._board, self._topology, stars)
+        return value - self.DIST_WEIGHT * dist.get(node, far)
+
+
+BOT_LEVELS = {cls.level: cls for cls in (RandomBot, GreedyBot, ExpectimaxBot)}
+
+
+def make_bot(level, seed=None):
+    """Bot of the given strength (``None``/``"human"`` -> no bot)."""
+    if level is None or str(level).lower() == "human":
+        return None
+    return BOT_LEVELS[str(level).lower()](seed)
+
+
+def bot_policy(engine, actions, rng=random):
+    """Engine policy: the acting player's bot decides, humans play randomly."""
+    bot = getattr(acting_player(engine), "bot", None)
+    if bot is not None:
+        return bot.act(engine, actions)
+    return random_policy(engine, actions, rng)
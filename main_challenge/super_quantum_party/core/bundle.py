@@ -0,0 +1,219 @@
+"""
+One packed, memory-mapped file holding the game's runtime assets.
+
+    $ python -m super_quantum_party.core.bundle          # writes settings.BUNDLE
+
+packs every image, sound and music file the scenes declare in ``ASSETS``
+and the compiled ``maps/*.qmap`` boards into ``assets.sqpb``.  Layout::
+
+    b"SQPBNDL\\0" | u32 version | u32 index length | index (JSON) | data
+
+The index maps a package-relative name (``resources/map1.png``) to its
+``[offset, length]`` in the data, which starts – like every entry in it –
+on an 8-byte boundary, so compiled maps can be viewed as NumPy arrays in
+place.
+
+At run time the bundle is mapped once and ``open(path)`` returns a
+``View`` – a read-only file object over the mapping, which
+``pygame.image.load`` and ``pygame.mixer.Sound`` read without an extra
+copy of the file.  Paths are accepted the way the scenes write them
+(``super_quantum_party/resources/...``) and resolved against the package,
+so the game launches from any directory.  A loose file newer than the
+bundle wins, so edited resources show up without a rebuild, and without
+a bundle everything is read from the loose files.
+"""
+from __future__ import annotations
+import argparse
+import builtins
+import io
+import json
+import mmap
+import os
+import struct
+
+from super_quantum_party.settings import BUNDLE
+
+MAGIC = b"SQPBNDL\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+def _align(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_PREFIX = os.path.basename(PACKAGE_DIR) + "/"
+
+_bundle = None              # (memoryview, index, mtime) once opened; False if there is none
+
+
+class View(io.RawIOBase):
+    """Seekable, read-only file object over a buffer (no copy of it)."""
+
+    def __init__(self, buf):
+        super().__init__()
+        self._buf = memoryview(buf)
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), len(self._buf) - self._pos)
+        if n <= 0:
+            return 0
+        b[:n] = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = (0, self._pos, len(self._buf))[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def getbuffer(self):
+        return self._buf
+
+
+# ── names ──────────────────────────────────────────────────────────────
+def key(path):
+    """The package-relative name of ``path`` (``resources/map1.png``)."""
+    path = str(path).replace(os.sep, "/")
+    if os.path.isabs(path):
+        return os.path.relpath(path, PACKAGE_DIR).replace(os.sep, "/")
+    return path[len(_PREFIX):] if path.startswith(_PREFIX) else path
+
+
+def loose_path(path):
+    """Where ``path`` lives as a loose file inside the package."""
+    return os.path.join(PACKAGE_DIR, *key(path).split("/"))
+
+
+# ── reading ────────────────────────────────────────────────────────────
+def _open_bundle():
+    global _bundle
+    if _bundle is None:
+        _bundle = False
+        try:
+            with builtins.open(BUNDLE, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                mtime = os.fstat(f.fileno()).st_mtime
+        except (OSError, ValueError):           # missing, or empty
+            return _bundle
+        magic, version, size = _HEADER.unpack_from(mm, 0)
+        if magic == MAGIC and version == VERSION:
+            index = json.loads(bytes(mm[_HEADER.size:_HEADER.size + size]))
+            _bundle = (memoryview(mm)[_align(_HEADER.size + size):], index, mtime)
+    return _bundle
+
+
+def _newer(path, mtime):
+    try:
+        return os.stat(path).st_mtime > mtime
+    except OSError:
+        return False
+
+
+def lookup(path, source=None):
+    """The bundled bytes of ``path`` as a memoryview, or ``None``.
+
+    ``None`` also when the loose file – or ``source``, the file it was
+    built from – is newer than the bundle.
+    """
+    bundle = _open_bundle()
+    if not bundle:
+        return None
+    view, index, mtime = bundle
+    where = index.get(key(path))
+    if where is None or _newer(loose_path(path), mtime) or \
+            (source is not None and _newer(source, mtime)):
+        return None
+    offset, length = where
+    return view[offset:offset + length]
+
+
+def open(path):
+    """A binary file object for ``path``: a ``View`` on the bundle, or the loose file."""
+    buf = lookup(path)
+    return View(buf) if buf is not None else builtins.open(loose_path(path), "rb")
+
+
+def read(path):
+    """The content of ``path``: a memoryview into the bundle, or ``bytes``."""
+    buf = lookup(path)
+    if buf is not None:
+        return buf
+    with builtins.open(loose_path(path), "rb") as f:
+        return f.read()
+
+
+def exists(path):
+    return lookup(path) is not None or os.path.isfile(loose_path(path))
+
+
+def names(prefix=""):
+    """The bundled names starting with ``prefix``."""
+    bundle = _open_bundle()
+    return sorted(n for n in bundle[1] if n.startswith(prefix)) if bundle else []
+
+
+# ── building ───────────────────────────────────────────────────────────
+def runtime_files():
+    """Package-relative names of everything the game loads from disk."""
+    from super_quantum_party.maps import registry
+    from super_quantum_party.scenes.game import GameScene
+    from super_quantum_party.scenes.gate import GateScene
+    from super_quantum_party.scenes.menu import MenuScene
+    from super_quantum_party.scenes.winner import WinnerScene
+    out = set()
+    for asset in MenuScene.ASSETS + GameScene.ASSETS + GateScene.ASSETS + WinnerScene.ASSETS:
+        if asset[0] in ("image", "sound", "music"):
+            out.add(key(asset[1]))
+    registry.compile_all()
+    for entry in registry.discover_maps().values():
+        out.add(key(entry.artifact_path))
+    return sorted(out)
+
+
+def build(files, path=BUNDLE):
+    """Pack the package-relative ``files`` into ``path``; return its size."""
+    blobs = []
+    for name in files:
+        with builtins.open(loose_path(name), "rb") as f:
+            blobs.append((name, f.read()))
+    index, offset = {}, 0
+    for name, data in blobs:
+        index[name] = [offset, len(data)]
+        offset = _align(offset + len(data))
+    raw_index = json.dumps(index).encode()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with builtins.open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(raw_index)) + raw_index)
+        base = _align(f.tell())
+        for name, data in blobs:
+            f.seek(base + index[name][0])
+            f.write(data)
+        total = f.tell()
+    os.replace(tmp, path)
+    return total
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Pack the game's runtime assets into one file.")
+    ap.add_argument("-o", "--output", default=BUNDLE)
+    ap.add_argument("--list", action="store_true", help="list what would be packed")
+    args = ap.parse_args()
+    files = runtime_files()
+    if args.list:
+        print("\n".join(files))
+    else:
+        size = build(files, args.output)
+        print(f"{args.output}: {len(files)} files, {size / 1024:.0f} KiB")
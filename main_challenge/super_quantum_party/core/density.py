@@ -0,0 +1,174 @@
+"""Exact two-qubit simulation of the gate minigame circuit.
+
+The minigame circuit is tiny (2 qubits, a few dozen gates), so its noisy
+outcome distribution can be computed exactly with a 4x4 density matrix
+instead of sampling ``AerSimulator``.  The noise mirrors
+``CircuitSimulator.apply_decoherence_noise``: at a decoherence of ``p``
+percent every single-qubit gate is followed by a depolarizing channel of
+strength ``p/100``, every CNOT/SWAP by a two-qubit one of strength
+``2p/100`` (capped at 1), and each qubit is depolarized with ``p/100`` right
+before it is measured.
+
+Outcome strings follow Qiskit's ordering: ``"ab"`` means qubit 1 measured
+``a`` and qubit 0 measured ``b``.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+OUTCOMES = ("00", "01", "10", "11")
+
+_I = np.eye(2, dtype=complex)
+_X = np.array([[0, 1], [1, 0]], dtype=complex)
+_Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+_Z = np.array([[1, 0], [0, -1]], dtype=complex)
+_H = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+_SX = np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]], dtype=complex) / 2
+SINGLE = {"H": _H, "X": _X, "Y": _Y, "Z": _Z, "SX": _SX}
+
+# basis index = q0 + 2*q1, i.e. kron(q1, q0)
+def _on(q: int, m: np.ndarray) -> np.ndarray:
+    return np.kron(_I, m) if q == 0 else np.kron(m, _I)
+
+_P0 = np.diag([1, 0]).astype(complex)
+_P1 = np.diag([0, 1]).astype(complex)
+CNOT = {  # (control, target)
+    (0, 1): np.kron(_I, _P0) + np.kron(_X, _P1),
+    (1, 0): np.kron(_P0, _I) + np.kron(_P1, _X),
+}
+SWAP = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+_PAULIS = {q: [_on(q, p) for p in (_X, _Y, _Z)] for q in (0, 1)}
+
+Gate = Tuple  # ("H", 0) / ("CNOT", control, target) / ("SWAP", 0, 1) / ("DECOH", None)
+
+
+def _depolarize_1q(rho: np.ndarray, q: int, lam: float) -> np.ndarray:
+    if lam <= 0:
+        return rho
+    twirl = sum(p @ rho @ p for p in _PAULIS[q])
+    return (1 - 0.75 * lam) * rho + 0.25 * lam * twirl
+
+
+def _depolarize_2q(rho: np.ndarray, lam: float) -> np.ndarray:
+    if lam <= 0:
+        return rho
+    return (1 - lam) * rho + lam * np.trace(rho) * np.eye(4) / 4
+
+
+def error_rates(percent: float) -> Tuple[float, float]:
+    """Single- and two-qubit depolarizing strengths for a decoherence %."""
+    p = max(0.0, min(percent, 100)) / 100
+    return p, min(2 * p, 1.0)
+
+
+def final_density(history: Iterable[Gate], percent: float = 0) -> np.ndarray:
+    """Density matrix after ``history`` (before the measurement noise)."""
+    p1, p2 = error_rates(percent)
+    rho = np.zeros((4, 4), dtype=complex)
+    rho[0, 0] = 1
+    for g in history:
+        name = g[0]
+        if name in SINGLE:
+            u = _on(g[1], SINGLE[name])
+            rho = _depolarize_1q(u @ rho @ u.conj().T, g[1], p1)
+        elif name == "CNOT":
+            u = CNOT[(g[1], g[2])]
+            rho = _depolarize_2q(u @ rho @ u.conj().T, p2)
+        elif name == "SWAP":
+            rho = _depolarize_2q(SWAP @ rho @ SWAP, p2)
+        # "DECOH" markers only drive the noise level
+    return rho
+
+
+def probabilities_from_density(rho: np.ndarray, percent: float = 0) -> Dict[str, float]:
+    """Measurement distribution of ``rho`` including the readout noise."""
+    p1, _ = error_rates(percent)
+    for q in (0, 1):
+        rho = _depolarize_1q(rho, q, p1)
+    diag = np.clip(np.real(np.diag(rho)), 0, None)
+    diag = diag / diag.sum()
+    return {f"{i >> 1}{i & 1}": float(diag[i]) for i in range(4)}
+
+
+@lru_cache(maxsize=65536)
+def _cached(history: Tuple[Gate, ...], percent: float) -> Tuple[float, ...]:
+    probs = probabilities_from_density(final_density(history, percent), percent)
+    return tuple(probs[o] for o in OUTCOMES)
+
+
+def outcome_probabilities(history: Iterable[Gate], percent: float = 0) -> Dict[str, float]:
+    """Exact probability of each outcome of the minigame circuit."""
+    return dict(zip(OUTCOMES, _cached(tuple(tuple(g) for g in history), percent)))
+
+
+# ── batched evaluation ─────────────────────────────────────────────────
+# Gate histories of many circuits at once, as integer codes into GATE_TABLE
+# (``-1`` pads shorter histories and is a no-op).
+GATE_TABLE = tuple([(name, q) for name in SINGLE for q in (0, 1)]
+                   + [("CNOT", 0, 1), ("CNOT", 1, 0), ("SWAP", 0, 1)])
+GATE_CODE = {g: i for i, g in enumerate(GATE_TABLE)}
+
+_U_TABLE = np.stack([_on(g[1], SINGLE[g[0]]) if g[0] in SINGLE
+                     else CNOT[(g[1], g[2])] if g[0] == "CNOT" else SWAP
+                     for g in GATE_TABLE] + [np.eye(4, dtype=complex)])
+_TWO_QUBIT = np.array([g[0] not in SINGLE for g in GATE_TABLE] + [False])
+_QUBIT = np.array([g[1] if g[0] in SINGLE else 0 for g in GATE_TABLE] + [0])
+
+
+def gate_code(g: Gate) -> int:
+    """Code of a history entry in ``GATE_TABLE`` (``-1`` for DECOH markers)."""
+    return GATE_CODE.get(tuple(g[:3]) if g[0] in ("CNOT", "SWAP") else (g[0], g[1]), -1)
+
+
+def _depolarize_1q_batch(rho, qubit, lam):
+    # (1 - lam) rho + lam * (I/2 on ``qubit``) x (rho traced over ``qubit``)
+    if not lam.any():
+        return rho
+    t = rho.reshape(-1, 2, 2, 2, 2)                   # [q1, q0, q1', q0']
+    mixed = np.empty_like(t)
+    half = np.eye(2) / 2
+    on0 = qubit == 0
+    if on0.any():
+        red = np.einsum("nabcb->nac", t[on0])
+        mixed[on0] = red[:, :, None, :, None] * half[None, None, :, None, :]
+    if not on0.all():
+        red = np.einsum("nbabc->nac", t[~on0])
+        mixed[~on0] = half[None, :, None, :, None] * red[:, None, :, None, :]
+    lam = lam[:, None, None]
+    return (1 - lam) * rho + lam * mixed.reshape(rho.shape)
+
+
+def batch_outcome_probabilities(codes: np.ndarray, percent: np.ndarray) -> np.ndarray:
+    """Outcome probabilities (columns in ``OUTCOMES`` order) of many circuits.
+
+    ``codes`` is an ``(n, length)`` array of ``GATE_TABLE`` codes, ``percent``
+    the decoherence of each circuit.  Matches ``outcome_probabilities`` row
+    by row.
+    """
+    codes = np.asarray(codes)
+    n = len(codes)
+    p1 = np.clip(np.asarray(percent, dtype=float), 0, 100) / 100
+    p2 = np.minimum(2 * p1, 1.0)
+    rho = np.zeros((n, 4, 4), dtype=complex)
+    rho[:, 0, 0] = 1
+    for j in range(codes.shape[1]):
+        c = codes[:, j]
+        c = np.where(c < 0, len(GATE_TABLE), c)
+        u = _U_TABLE[c]
+        rho = u @ rho @ u.conj().transpose(0, 2, 1)
+        two = _TWO_QUBIT[c]
+        pad = c == len(GATE_TABLE)
+        lam1 = np.where(two | pad, 0.0, p1)
+        lam2 = np.where(two, p2, 0.0)
+        rho = _depolarize_1q_batch(rho, _QUBIT[c], lam1)
+        if lam2.any():
+            trace = np.trace(rho, axis1=1, axis2=2)
+            rho = ((1 - lam2)[:, None, None] * rho
+                   + (lam2 * trace / 4)[:, None, None] * np.eye(4))
+    for q in (0, 1):
+        rho = _depolarize_1q_batch(rho, np.full(n, q), p1)
+    diag = np.clip(np.real(np.diagonal(rho, axis1=1, axis2=2)), 0, None)
+    return diag / diag.sum(axis=1, keepdims=True)
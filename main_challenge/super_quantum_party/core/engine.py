@@ -0,0 +1,367 @@
+"""
+Headless rules engine – the whole game without pygame.
+
+``Engine`` owns an explicit ``GameState`` and advances it with
+``step(action)``.  ``legal_actions()`` lists what may happen next, so bots,
+simulators and the pygame scenes all drive the same rules:
+
+    roll phase      ROLL_DIE (twice; the second die starts the walk)
+    move phase      ADVANCE  (one tile; forced)
+    branch phase    ("branch", node) at an intersection
+    gate phase      ("place", gate, qubit), SKIP, MEASURE, CONTINUE
+    over            nothing
+
+``step`` returns a list of event tuples (``("dice", v)``, ``("move", i, node)``,
+``("star", i, node, new_star)``, ``("reward", i, gates)``, ``("place", i, gate,
+qubit)``, ``("measured", result)``, ``("topology", result)``,
+``("gate_round",)``, ``("game_over",)``) which views use for sounds and
+animation.
+
+Randomness comes from two places: a *backend* for the quantum parts (dice
+and the minigame measurement) and ``Engine.rng`` for the classical parts
+(gate rewards and star relocation).  ``QuantumBackend`` runs the real Aer
+circuits; ``ExactBackend`` samples the same distributions from a seeded
+RNG, which is what makes thousands of headless turns per second possible.
+"""
+import random
+
+from super_quantum_party.core import density, trace
+
+# ── phases & actions ───────────────────────────────────────────────────
+ROLL, MOVE, BRANCH, GATES, OVER = "roll", "move", "branch", "gates", "over"
+
+ROLL_DIE = ("roll",)
+ADVANCE  = ("advance",)
+SKIP     = ("skip",)
+MEASURE  = ("measure",)
+CONTINUE = ("continue",)
+
+def branch(node):         return ("branch", node)
+def place(gate, qubit):   return ("place", gate, qubit)
+
+def gate_entry(gate, qubit):
+    """Circuit history entry for dropping ``gate`` on wire ``qubit``."""
+    if gate == "CNOT":
+        return ("CNOT", qubit, 1 - qubit)
+    if gate == "SWAP":
+        return ("SWAP", 0, 1)
+    return (gate, qubit)
+
+# ── rule constants (see GameScene / GateScene) ─────────────────────────
+PLACEABLE_GATES = ("H", "Z", "Y", "X", "CNOT", "SWAP")       # minigame palette
+REWARD_GATES    = ("X", "Y", "Z", "SX", "H", "SWAP", "CNOT")  # blue-tile rewards
+ALL_GATES       = tuple(dict.fromkeys(PLACEABLE_GATES + REWARD_GATES))  # fixed inventory order
+REWARD_RANGE    = (1, 4)       # gates granted by a blue tile
+DECOH_EVERY     = 4            # placed gates between two DECOH layers
+DECOH_PERCENT   = 20           # decoherence added by each DECOH layer
+INITIAL_HISTORY = (("H", 0), ("H", 1, "layer0"))
+
+
+class RuleSet:
+    """Tunable rule parameters; the defaults are the shipped rules."""
+
+    def __init__(self, reward_range=REWARD_RANGE, decoh_every=DECOH_EVERY,
+                 decoh_percent=DECOH_PERCENT):
+        self.reward_range = tuple(reward_range)
+        self.decoh_every = decoh_every
+        self.decoh_percent = decoh_percent
+
+    def __repr__(self):
+        return (f"RuleSet(reward_range={self.reward_range}, decoh_every={self.decoh_every}, "
+                f"decoh_percent={self.decoh_percent})")
+
+
+DEFAULT_RULES = RuleSet()
+
+
+# ── quantum backends ───────────────────────────────────────────────────
+class QuantumBackend:
+    """Dice and measurements from the real Qiskit/Aer circuits (used by the GUI)."""
+
+    def roll(self):
+        from super_quantum_party.quantum_dice import quantum_walk_roll
+        with trace.span("dice roll", "sim"):
+            return quantum_walk_roll()
+
+    def measure(self, history, percent):
+        from super_quantum_party.scenes.gateGame.CircuitSimulator import CircuitSimulator
+        with trace.span("measurement", "sim", gates=len(history), decoherence=percent):
+            noise_model = CircuitSimulator.apply_decoherence_noise(None, percent)
+            return CircuitSimulator.apply_circuit(None, noise_model=noise_model,
+                                                  gate_history=list(history))
+
+
+class ExactBackend:
+    """Seeded, simulator-free sampling of the same distributions.
+
+    Dice follow ``quantum_dice.ROLL_DISTRIBUTION``; measurements follow the
+    exact noisy distribution computed by ``core.density``.
+    """
+
+    def __init__(self, seed=None):
+        from super_quantum_party.quantum_dice import ROLL_DISTRIBUTION
+        self.rng = random.Random(seed)
+        self._faces = list(ROLL_DISTRIBUTION)
+        self._weights = list(ROLL_DISTRIBUTION.values())
+
+    def roll(self):
+        return self.rng.choices(self._faces, self._weights)[0]
+
+    def measure(self, history, percent):
+        probs = density.outcome_probabilities(history, percent)
+        return self.rng.choices(density.OUTCOMES, [probs[o] for o in density.OUTCOMES])[0]
+
+
+# ── state ──────────────────────────────────────────────────────────────
+class GateRound:
+    """State of one gate minigame round."""
+
+    def __init__(self, n_players, ruleset=DEFAULT_RULES):
+        self.ruleset = ruleset
+        self.history = list(INITIAL_HISTORY)
+        self.current = 0             # index of the player placing a gate
+        self.skipped = set()         # players who pressed "End Turn"
+        self.result = None           # last measurement, if any
+        self.n_players = n_players
+
+    @property
+    def placed(self):
+        """Number of gates placed by players this round."""
+        return sum(1 for g in self.history[len(INITIAL_HISTORY):] if g[0] != "DECOH")
+
+    @property
+    def decoherence_percent(self):
+        decoh = sum(1 for g in self.history if g[0] == "DECOH")
+        return min(100, decoh * self.ruleset.decoh_percent)
+
+    def next_player(self):
+        for _ in range(self.n_players):
+            self.current = (self.current + 1) % self.n_players
+            if self.current not in self.skipped:
+                return
+
+
+class GameState:
+    """Everything that changes during a game (the board itself does not)."""
+
+    def __init__(self, board, players, n_turns):
+        self.players = sorted(players, key=lambda p: p.order)
+        self.n_turns = n_turns           # remaining rounds
+        self.types = dict(board.types)   # live tile types (stars move)
+        self.active = 0                  # index of the player whose turn it is
+        self.phase = ROLL
+        self.dice = []                   # dice rolled so far this turn
+        self.last_roll = None            # (player index, d1, d2, total)
+        self.steps = 0                   # steps left in the current walk
+        self.branch_options = []
+        self.topology = "00"             # last measurement outcome applied
+        self.round = None                # GateRound during the gate phase
+        for p in self.players:
+            p.position = board.start
+
+
+# ── engine ─────────────────────────────────────────────────────────────
+class Engine:
+    def __init__(self, board, players, n_turns, backend=None, seed=None, ruleset=None):
+        self.board = board
+        self.ruleset = ruleset if ruleset is not None else DEFAULT_RULES
+        self.state = GameState(board, players, n_turns)
+        # independent streams for the quantum and the classical randomness
+        self.backend = backend if backend is not None else ExactBackend(
+            None if seed is None else 2 * seed)
+        self.rng = random.Random(None if seed is None else 2 * seed + 1)
+        self.recorder = None             # core.replay.Recorder, if recording
+
+    @property
+    def players(self):
+        return self.state.players
+
+    @property
+    def active_player(self):
+        return self.state.players[self.state.active]
+
+    # ── queries ────────────────────────────────────────────────────────
+    def legal_actions(self):
+        s = self.state
+        if s.phase == ROLL:
+            return [ROLL_DIE]
+        if s.phase == MOVE:
+            return [ADVANCE]
+        if s.phase == BRANCH:
+            return [branch(n) for n in s.branch_options]
+        if s.phase == GATES:
+            r = s.round
+            actions = []
+            if r.current not in r.skipped:
+                gates = s.players[r.current].gates
+                for gate in PLACEABLE_GATES:
+                    if gates.get(gate, 0) > 0:
+                        # SWAP acts on both wires: dropping it on either is the same
+                        for q in ((0,) if gate == "SWAP" else (0, 1)):
+                            actions.append(place(gate, q))
+                actions.append(SKIP)
+            if r.result is None:
+                actions.append(MEASURE)
+            actions.append(CONTINUE)
+            return actions
+        return []
+
+    def is_over(self):
+        return self.state.phase == OVER
+
+    # ── transition ─────────────────────────────────────────────────────
+    def step(self, action):
+        """Apply ``action`` and return the list of resulting events."""
+        s = self.state
+        kind = action[0]
+        events = []
+        if self.recorder is not None:
+            self.recorder.on_action(self, action)
+        if kind == "roll" and s.phase == ROLL:
+            value = self.backend.roll()
+            s.dice.append(value)
+            events.append(("dice", value))
+            if len(s.dice) == 2:
+                d1, d2 = s.dice
+                s.steps = d1 + d2
+                s.last_roll = (s.active, d1, d2, s.steps)
+                s.phase = MOVE
+        elif kind == "advance" and s.phase == MOVE:
+            player = s.players[s.active]
+            succ = self.board.successors(player.position, s.topology)
+            if not succ:
+                self._end_move(events)
+            elif len(succ) > 1:
+                s.phase = BRANCH
+                s.branch_options = list(succ)
+            else:
+                self._walk_to(succ[0], events)
+        elif kind == "branch" and s.phase == BRANCH and action[1] in s.branch_options:
+            s.phase = MOVE
+            s.branch_options = []
+            self._walk_to(action[1], events)
+        elif s.phase == GATES and kind in ("place", "skip", "measure", "continue"):
+            self._gate_action(action, events)
+        else:
+            raise ValueError(f"illegal action {action!r} in phase {s.phase!r}")
+        return events
+
+    def _walk_to(self, node, events):
+        s = self.state
+        player = s.players[s.active]
+        player.position = node
+        events.append(("move", s.active, node))
+        self._check_star(node, events)
+        s.steps -= 1
+        if s.steps <= 0:
+            self._end_move(events)
+
+    def _check_star(self, node, events):
+        """Collect the star on ``node`` and relocate it to a random blue tile."""
+        s = self.state
+        if s.types[node] != 4:
+            return
+        s.players[s.active].add_stars(1)
+        s.types[node] = 1
+        candidates = [n for n in self.board.ids if s.types[n] == 1 and n != node]
+        new_star = None
+        if candidates:
+            new_star = self.rng.choice(candidates)
+            s.types[new_star] = 4
+        events.append(("star", s.active, node, new_star))
+
+    def _end_move(self, events):
+        s = self.state
+        player = s.players[s.active]
+        if s.types[player.position] == 1:
+            gates = [self.rng.choice(REWARD_GATES)
+                     for _ in range(self.rng.randint(*self.ruleset.reward_range))]
+            for gate in gates:
+                player.add_gates(gate)
+            events.append(("reward", s.active, gates))
+        s.dice.clear()
+        s.steps = 0
+        s.active = (s.active + 1) % len(s.players)
+        s.phase = ROLL
+        if s.active == 0:
+            s.n_turns -= 1
+            if s.n_turns <= 0:
+                s.phase = OVER
+                events.append(("game_over",))
+            else:
+                self.start_gate_round()
+                events.append(("gate_round",))
+
+    # ── gate minigame ──────────────────────────────────────────────────
+    def start_gate_round(self):
+        s = self.state
+        s.round = GateRound(len(s.players), self.ruleset)
+        s.phase = GATES
+
+    def _gate_action(self, action, events):
+        s = self.state
+        r = s.round
+        kind = action[0]
+        if kind == "place":
+            gate, q = action[1], action[2]
+            player = s.players[r.current]
+            if r.current in r.skipped or player.gates.get(gate, 0) <= 0 or gate not in PLACEABLE_GATES:
+                raise ValueError(f"illegal action {action!r}")
+            r.history.append(gate_entry(gate, q))
+            player.gates[gate] -= 1
+            events.append(("place", r.current, gate, q))
+            r.next_player()
+            r.result = None
+            if r.placed % self.ruleset.decoh_every == 0:
+                r.history.append(("DECOH", None))
+        elif kind == "skip":
+            if r.current in r.skipped:
+                raise ValueError(f"illegal action {action!r}")
+            r.skipped.add(r.current)
+            r.next_player()
+        elif kind == "measure":
+            if r.result is not None:
+                raise ValueError("the circuit has already been measured")
+            r.result = self.backend.measure(r.history, r.decoherence_percent)
+            events.append(("measured", r.result))
+        else:  # continue
+            s.topology = r.result or "00"
+            s.round = None
+            s.phase = ROLL
+            events.append(("topology", s.topology))
+
+    # ── helpers ────────────────────────────────────────────────────────
+    def set_board(self, board):
+        """Swap in an edited board (map hot-reload) keeping the game going."""
+        s = self.state
+        self.board = board
+        s.types = dict(board.types)
+        for p in s.players:
+            if p.position not in s.types:
+                p.position = board.start
+        if s.phase == BRANCH:
+            s.branch_options = list(board.successors(s.players[s.active].position, s.topology))
+            if len(s.branch_options) <= 1:
+                s.phase = MOVE
+
+
+def final_ranking(players):
+    """Players ordered by stars, then remaining gates (the tie-breaker)."""
+    return sorted(players, key=lambda p: (-p.stars, -sum(p.gates.values())))
+
+
+def random_policy(engine, actions, rng=random):
+    """Pick uniformly among the legal actions (measure before continuing)."""
+    if engine.state.phase == GATES and MEASURE in actions and rng.random() < 0.5:
+        return MEASURE
+    return rng.choice(actions)
+
+
+def play(engine, policy=random_policy, max_steps=1_000_000):
+    """Run ``engine`` to the end with ``policy(engine, actions) -> action``."""
+    for _ in range(max_steps):
+        actions = engine.legal_actions()
+        if not actions:
+            break
+        engine.step(actions[0] if len(actions) == 1 else policy(engine, actions))
+    return final_ranking(engine.players)
@@ -0,0 +1,133 @@
+"""
+Search bot for the gate minigame.
+
+The measurement outcome of the round decides the board topology of the
+next turns, so every player prefers some outcomes over others.
+``GateSearch`` values each outcome for each player with
+``ExpectimaxBot.turn_value`` (the expected next turn from the player's tile
+on that topology) and searches the round as a multi-player game (max^n):
+
+    decision node   the current player places one of their gates or skips
+    chance node     the measurement, weighted by the exact noisy outcome
+                    distribution from ``core.density`` (DECOH layers included)
+
+Gates left at the end of the game break ties, so each gate spent costs its
+owner ``GATE_COST``.  The search deepens one move at a time with a shared
+transposition table and returns the best move of the deepest search that
+finished within ``time_budget``.
+"""
+import time
+
+from super_quantum_party.core import density
+from super_quantum_party.core.bots import ExpectimaxBot
+from super_quantum_party.core.engine import PLACEABLE_GATES, SKIP, gate_entry, place
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class GateSearch:
+    """Picks minigame moves for one player of an ``Engine``."""
+    GATE_COST = 0.1
+
+    def __init__(self, time_budget=0.05, max_depth=12, evaluator=None):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.evaluator = evaluator if evaluator is not None else ExpectimaxBot()
+        self._round = None
+        self._table = {}
+
+    # ── outcome values ─────────────────────────────────────────────────
+    def outcome_values(self, engine):
+        """``values[p][i]``: how much player ``p`` likes outcome ``OUTCOMES[i]``."""
+        s = engine.state
+        return [[self.evaluator.turn_value(engine.board, s.types, o, p.position, engine.ruleset)
+                 for o in density.OUTCOMES] for p in s.players]
+
+    # ── search ─────────────────────────────────────────────────────────
+    def best_action(self, engine, actions):
+        """Best of ``actions`` for the player placing gates right now."""
+        s = engine.state
+        r = s.round
+        if r is not self._round:          # new round: new outcome values
+            self._round = r
+            self._table.clear()
+            self._values = self.outcome_values(engine)
+            self._every = engine.ruleset.decoh_every
+            self._percent = engine.ruleset.decoh_percent
+        moves = [a for a in actions if a[0] == "place" or a == SKIP]
+        if len(moves) <= 1:
+            return moves[0] if moves else actions[0]
+
+        inventory = tuple(tuple(p.gates.get(g, 0) for g in PLACEABLE_GATES) for p in s.players)
+        skipped = sum(1 << i for i in r.skipped)       # bit mask of seats that skipped
+        root = (tuple(r.history), r.placed, r.current, skipped, inventory)
+        self._deadline = time.perf_counter() + self.time_budget
+        best = SKIP if SKIP in moves else moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                scored = [(self._search(*self._child(root, m), depth - 1)[r.current], m)
+                          for m in moves]
+            except _OutOfTime:
+                break
+            best = max(scored, key=lambda vm: vm[0])[1]
+        return best
+
+    def _moves(self, state):
+        history, placed, current, skipped, inventory = state
+        if skipped >> current & 1:
+            return []
+        moves = [place(g, q) for g, n in zip(PLACEABLE_GATES, inventory[current]) if n > 0
+                 for q in ((0,) if g == "SWAP" else (0, 1))]
+        moves.append(SKIP)
+        return moves
+
+    def _child(self, state, move):
+        history, placed, current, skipped, inventory = state
+        n = len(inventory)
+        if move == SKIP:
+            skipped |= 1 << current
+        else:
+            gate, q = move[1], move[2]
+            history = history + (gate_entry(gate, q),)
+            placed += 1
+            if placed % self._every == 0:
+                history = history + (("DECOH", None),)
+            counts = list(inventory[current])
+            counts[PLACEABLE_GATES.index(gate)] -= 1
+            inventory = inventory[:current] + (tuple(counts),) + inventory[current + 1:]
+        for _ in range(n):                   # GateRound.next_player
+            current = (current + 1) % n
+            if not skipped >> current & 1:
+                break
+        return history, placed, current, skipped, inventory
+
+    def _search(self, history, placed, current, skipped, inventory, depth):
+        """Value vector (one entry per player) of a round state, max^n."""
+        key = (history, current, skipped, inventory, depth)
+        value = self._table.get(key)
+        if value is not None:
+            return value
+        if time.perf_counter() > self._deadline:
+            raise _OutOfTime
+        state = (history, placed, current, skipped, inventory)
+        moves = self._moves(state)
+        if depth <= 0 or not moves:
+            value = self._leaf(history, inventory)
+        else:
+            value = None
+            for m in moves:
+                v = self._search(*self._child(state, m), depth - 1)
+                if value is None or v[current] > value[current]:
+                    value = v
+        self._table[key] = value
+        return value
+
+    def _leaf(self, history, inventory):
+        """Expected value of measuring now, minus the gates each player spent."""
+        decoh = sum(1 for g in history if g[0] == "DECOH")
+        probs = density.outcome_probabilities(history, min(100, decoh * self._percent))
+        p = [probs[o] for o in density.OUTCOMES]
+        return tuple(sum(pi * v for pi, v in zip(p, values)) + self.GATE_COST * sum(inv)
+                     for values, inv in zip(self._values, inventory))
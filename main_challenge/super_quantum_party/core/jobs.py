@@ -0,0 +1,245 @@
+"""
+Accounting of every quantum job: how many, how big, how many shots, how long.
+
+All simulator and primitive invocations go through this module:
+
+``run(backend, circuits, shots=...)``
+    ``backend.run(...).result()`` – an ``AerSimulator`` job; with
+    ``transpile=True`` the circuits are transpiled for ``backend`` first.
+``transpile(circuits, target)``
+    times a transpilation, ``target`` being a backend or a pass manager.
+``run_primitive(primitive, pubs)``
+    ``primitive.run(pubs).result()`` – a Sampler or Estimator (V2).
+
+Each records into the row of its call site – the calling function as
+``module.function``, an explicit ``site=`` label, or the label of an
+enclosing ``with jobs.labelled(name):`` on the same thread (the quantum
+warm-up counts as ``"warm-up"``, not as game jobs) – the number of jobs,
+circuits and shots, the largest circuit (qubits, depth, gates), and the
+time spent transpiling and running (submission to result).  Jobs also
+show up as ``"aer"`` spans in ``core.trace``.
+
+``report(top)`` ranks the call sites by run time (``by="shots"`` by
+shots); ``SQP_JOB_REPORT=10`` prints the ten worst when the game, the
+network host or a side quest exits.  Counting costs a few microseconds
+per job, next to milliseconds of simulation, so it is always on.
+
+    python -m super_quantum_party.core.jobs --games 2 --turns 5
+"""
+from __future__ import annotations
+import atexit
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from super_quantum_party.core import trace
+
+_sites = {}                 # call site -> _Site
+_lock = threading.Lock()
+_label = threading.local()  # .site: label of the enclosing labelled() block
+_report_registered = False
+
+
+class _Site:
+    __slots__ = ("name", "jobs", "circuits", "shots", "qubits", "depth", "gates",
+                 "transpile_s", "run_s", "max_run_s")
+
+    def __init__(self, name):
+        self.name = name
+        self.jobs = self.circuits = self.shots = 0
+        self.qubits = self.depth = self.gates = 0       # largest seen
+        self.transpile_s = self.run_s = self.max_run_s = 0.0
+
+
+def _caller(depth=2):
+    """The current ``labelled`` site, else ``module.function`` of the frame
+    ``depth`` levels above the caller."""
+    label = getattr(_label, "site", None)
+    if label is not None:
+        return label
+    frame = sys._getframe(depth)
+    module = frame.f_globals.get("__name__", "?").removeprefix("super_quantum_party.")
+    return f"{module}.{frame.f_code.co_name}"
+
+
+@contextmanager
+def labelled(site):
+    """Account the jobs run on this thread inside the block to ``site``."""
+    outer = getattr(_label, "site", None)
+    _label.site = site
+    try:
+        yield
+    finally:
+        _label.site = outer
+
+
+def _site(name):
+    site = _sites.get(name)
+    if site is None:
+        site = _sites[name] = _Site(name)
+    return site
+
+
+def _circuits(circuits):
+    return list(circuits) if isinstance(circuits, (list, tuple)) else [circuits]
+
+
+def _measure(circuits):
+    """(qubits, depth, gates) of the largest of ``circuits``."""
+    qubits = depth = gates = 0
+    for qc in circuits:
+        qubits = max(qubits, qc.num_qubits)
+        depth = max(depth, qc.depth())
+        gates = max(gates, qc.size())
+    return qubits, depth, gates
+
+
+def record(site, circuits=(), shots=0, transpile_s=0.0, run_s=None):
+    """Add one job (``run_s`` given) or one transpilation to ``site``'s row."""
+    size = _measure(circuits)
+    with _lock:
+        row = _site(site)
+        row.qubits, row.depth, row.gates = (max(a, b) for a, b in
+                                            zip((row.qubits, row.depth, row.gates), size))
+        row.transpile_s += transpile_s
+        if run_s is not None:
+            row.jobs += 1
+            row.circuits += len(circuits)
+            row.shots += shots
+            row.run_s += run_s
+            row.max_run_s = max(row.max_run_s, run_s)
+
+
+# ── wrappers ───────────────────────────────────────────────────────────
+def transpile(circuits, target, site=None):
+    """``target.run(circuits)`` for a pass manager, else ``qiskit.transpile``; timed."""
+    return _transpile(circuits, target, site or _caller())
+
+
+def _transpile(circuits, target, site):
+    start = time.perf_counter()
+    with trace.span(f"transpile {site}", "aer"):
+        if hasattr(target, "run") and not hasattr(target, "options"):
+            out = target.run(circuits)
+        else:
+            from qiskit import transpile as qiskit_transpile
+            out = qiskit_transpile(circuits, target)
+    record(site, _circuits(out), transpile_s=time.perf_counter() - start)
+    return out
+
+
+def run(backend, circuits, shots=None, site=None, transpile=False, **options):
+    """``backend.run(circuits, shots=shots, **options).result()``, accounted to ``site``."""
+    site = site or _caller()
+    if transpile:
+        circuits = _transpile(circuits, backend, site)
+    if shots is None:
+        shots = getattr(getattr(backend, "options", None), "shots", 0) or 0
+    else:
+        options["shots"] = shots
+    batch = _circuits(circuits)
+    start = time.perf_counter()
+    with trace.span(site, "aer", shots=shots, circuits=len(batch)):
+        result = backend.run(circuits, **options).result()
+    record(site, batch, shots * len(batch), run_s=time.perf_counter() - start)
+    return result
+
+
+def _pub_shots(pub_result):
+    metadata = getattr(pub_result, "metadata", None) or {}
+    if metadata.get("shots"):
+        return metadata["shots"]
+    data = getattr(pub_result, "data", None)                # Sampler: one BitArray per register
+    for value in (data.values() if hasattr(data, "values") else ()):
+        if hasattr(value, "num_shots"):
+            return value.num_shots
+    return 0
+
+
+def run_primitive(primitive, pubs, site=None, **options):
+    """``primitive.run(pubs, **options).result()`` for a Sampler or Estimator, accounted to ``site``."""
+    site = site or _caller()
+    batch = [pub[0] if isinstance(pub, tuple) else pub for pub in pubs]
+    start = time.perf_counter()
+    with trace.span(site, "aer", primitive=type(primitive).__name__, pubs=len(batch)):
+        result = primitive.run(pubs, **options).result()
+    record(site, batch, sum(_pub_shots(r) for r in result), run_s=time.perf_counter() - start)
+    return result
+
+
+# ── reports ────────────────────────────────────────────────────────────
+def summary(by="time"):
+    """Rows as dicts, worst first: by run time (``"time"``) or by ``"shots"``."""
+    if by not in ("time", "shots"):
+        raise ValueError(f"unknown order {by!r} (time or shots)")
+    with _lock:
+        rows = [{name: getattr(s, name) for name in _Site.__slots__} for s in _sites.values()]
+    key = (lambda r: r["run_s"] + r["transpile_s"]) if by == "time" else (lambda r: r["shots"])
+    return sorted(rows, key=key, reverse=True)
+
+
+def totals():
+    """Jobs, shots and seconds (transpile + run) over every call site."""
+    rows = summary()
+    return {"jobs": sum(r["jobs"] for r in rows), "shots": sum(r["shots"] for r in rows),
+            "seconds": sum(r["run_s"] + r["transpile_s"] for r in rows)}
+
+
+def report(top=10, by="time"):
+    """The ``top`` call sites as a text table."""
+    rows = summary(by)
+    if not rows:
+        return "no quantum jobs"
+    t = totals()
+    lines = [f"{t['jobs']} quantum jobs, {t['shots']} shots, {t['seconds'] * 1000:.0f} ms "
+             f"over {len(rows)} call sites; top {min(top, len(rows))} by {by}:",
+             f"  {'call site':48s} {'jobs':>6s} {'shots':>9s} {'qubits':>6s} {'depth':>5s} "
+             f"{'gates':>5s} {'transpile':>10s} {'run':>9s} {'mean':>7s} {'max':>7s}"]
+    for r in rows[:top]:
+        mean = r["run_s"] / r["jobs"] if r["jobs"] else 0.0
+        lines.append(f"  {r['name'][-48:]:48s} {r['jobs']:6d} {r['shots']:9d} {r['qubits']:6d} "
+                     f"{r['depth']:5d} {r['gates']:5d} {r['transpile_s'] * 1000:8.1f}ms "
+                     f"{r['run_s'] * 1000:7.1f}ms {mean * 1000:5.1f}ms {r['max_run_s'] * 1000:5.1f}ms")
+    return "\n".join(lines)
+
+
+def reset():
+    with _lock:
+        _sites.clear()
+
+
+def report_at_exit(top=10, by="time"):
+    """Print ``report(top, by)`` when the process exits (once)."""
+    global _report_registered
+    if top and not _report_registered:
+        _report_registered = True
+        atexit.register(lambda: print(report(top, by)))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from super_quantum_party.core import jobs      # the instance the game code records into
+    from super_quantum_party.core.board import Board
+    from super_quantum_party.core.bots import bot_policy, make_bot
+    from super_quantum_party.core.engine import Engine, QuantumBackend, play
+    from super_quantum_party.maps import registry
+    from super_quantum_party.models.player import Player
+
+    ap = argparse.ArgumentParser(description="Play bot games on the Aer backend and "
+                                             "report the quantum jobs they ran.")
+    ap.add_argument("--map", default="new_map")
+    ap.add_argument("--games", type=int, default=1)
+    ap.add_argument("--turns", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--by", choices=("time", "shots"), default="time")
+    args = ap.parse_args()
+
+    board = Board.from_compiled(registry.get_map(args.map).load())
+    for game in range(args.games):
+        players = [Player(i) for i in range(4)]
+        for i, p in enumerate(players):
+            p.bot = make_bot("greedy", seed=game * 4 + i)
+        play(Engine(board, players, args.turns, backend=QuantumBackend(), seed=game), bot_policy)
+    print(jobs.report(args.top, args.by))
@@ -0,0 +1,404 @@
+"""
+Memory diagnostics across scene switches.
+
+With ``settings.MEMORY`` set (``SQP_MEMORY=1``) ``tracemalloc`` runs and
+every ``SceneManager.go_to`` calls ``transition(old, new)``, which
+
+* samples the Python heap (``tracemalloc``) and the live pygame surfaces
+  and sounds – these live in SDL's memory, out of ``tracemalloc``'s
+  sight – and adds the growth since the previous switch to the switch's
+  type (``"GameScene -> GateScene"``);
+* checks the scenes left earlier.  A left scene still alive once the game
+  is past it – not the current scene nor reachable from it – is flagged,
+  with what holds it.  Once a scene is collected, any surface or sound
+  it owned that is still alive is flagged too, unless it is one of
+  ``core.assets``' shared objects.
+
+``report()`` gives the growth per switch type, the flags and the source
+lines whose allocations grew most.  The game prints it on exit.
+
+``python -m super_quantum_party.core.memory`` plays bot games through
+menu, game, gate and winner scenes headlessly and exits with status 1 if
+the heap or the surfaces keep growing from one cycle to the next, or if
+anything was flagged:
+
+    python -m super_quantum_party.core.memory --cycles 8
+"""
+from __future__ import annotations
+import gc
+import sys
+import tracemalloc
+import types
+import weakref
+
+from super_quantum_party.core import assets
+
+TRACE_FRAMES = 1            # stack depth kept by tracemalloc (more slows the game down)
+REACH_LIMIT = 200_000       # objects visited when looking for a path to a scene
+
+active = False
+_verbose = True
+_tracing = False            # tracemalloc was started by start()
+_first = None               # _Sample at start()
+_baseline = None            # tracemalloc snapshot at start()
+_last = None                # _Sample at the latest switch
+_growth = {}                # "Old -> New" -> _Growth
+_departed = []              # _Departed scenes not yet collected
+_flags = []                 # messages
+_numbers = weakref.WeakKeyDictionary()     # scene -> its rank among the scenes of its type
+_counts = {}                # type name -> scenes of that type seen so far
+
+
+class _Sample:
+    __slots__ = ("traced", "surfaces", "surface_bytes", "sounds", "sound_bytes")
+
+    def __init__(self, traced, surfaces, surface_bytes, sounds, sound_bytes):
+        self.traced = traced
+        self.surfaces, self.surface_bytes = surfaces, surface_bytes
+        self.sounds, self.sound_bytes = sounds, sound_bytes
+
+    def __sub__(self, other):
+        return (self.traced - other.traced, self.surfaces - other.surfaces,
+                self.surface_bytes - other.surface_bytes, self.sounds - other.sounds,
+                self.sound_bytes - other.sound_bytes)
+
+
+class _Growth:
+    __slots__ = ("n", "traced", "surfaces", "surface_bytes", "sounds", "sound_bytes")
+
+    def __init__(self):
+        self.n = 0
+        self.traced = self.surfaces = self.surface_bytes = self.sounds = self.sound_bytes = 0
+
+    def add(self, delta):
+        self.n += 1
+        traced, surfaces, surface_bytes, sounds, sound_bytes = delta
+        self.traced += traced
+        self.surfaces += surfaces
+        self.surface_bytes += surface_bytes
+        self.sounds += sounds
+        self.sound_bytes += sound_bytes
+
+
+class _Departed:
+    """A scene that was switched away from, and the pygame objects it owned then."""
+    __slots__ = ("ref", "tag", "owned", "age", "flagged")
+
+    def __init__(self, scene):
+        self.ref = weakref.ref(scene)
+        self.tag = _tag(scene)
+        self.owned = [(weakref.ref(obj), name) for obj, name in _owned(scene)]
+        self.age = 0
+        self.flagged = False
+
+
+def _tag(scene):
+    """``GameScene#3``: the scene's type and its rank among the scenes of that type."""
+    name = type(scene).__name__
+    if scene not in _numbers:
+        _counts[name] = _numbers[scene] = _counts.get(name, 0) + 1
+    return f"{name}#{_numbers[scene]}"
+
+
+# ── pygame objects ─────────────────────────────────────────────────────
+def _pygame_types():
+    pygame = sys.modules.get("pygame")
+    if pygame is None:
+        return None, None
+    return pygame.Surface, pygame.mixer.Sound
+
+
+def _sound_bytes(sound):
+    init = sys.modules["pygame"].mixer.get_init()
+    if not init:
+        return 0
+    frequency, size, channels = init
+    return int(sound.get_length() * frequency) * channels * abs(size) // 8
+
+
+def _pygame_objects():
+    """Live surfaces and sounds referenced from Python objects, by ``id``.
+
+    Neither type is tracked by the garbage collector, so they are found
+    among the referents of the objects that are.
+    """
+    surface, sound = _pygame_types()
+    surfaces, sounds = {}, {}
+    if surface is None:
+        return surfaces, sounds
+    objects = gc.get_objects()
+    for i in range(0, len(objects), 4096):              # a batch per call: much faster
+        for ref in gc.get_referents(*objects[i:i + 4096]):
+            if isinstance(ref, surface):
+                surfaces[id(ref)] = ref
+            elif isinstance(ref, sound):
+                sounds[id(ref)] = ref
+    return surfaces, sounds
+
+
+def _owned(scene, depth=4):
+    """Surfaces and sounds in ``scene``'s attributes, with the path to them."""
+    surface, sound = _pygame_types()
+    if surface is None:
+        return []
+    out, seen = [], {id(scene)}
+    stack = [(value, f"{type(scene).__name__}.{key}", depth) for key, value in vars(scene).items()]
+    while stack:
+        obj, path, left = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (surface, sound)):
+            out.append((obj, path))
+        elif left <= 0 or _is_scene(obj) or isinstance(obj, _OPAQUE):
+            continue
+        elif isinstance(obj, dict):
+            stack.extend((v, f"{path}[{k!r}]", left - 1) for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend((v, f"{path}[{i}]", left - 1) for i, v in enumerate(obj))
+        elif hasattr(obj, "__dict__"):
+            stack.extend((v, f"{path}.{k}", left - 1) for k, v in vars(obj).items())
+    return out
+
+
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType,
+           weakref.ref, str, bytes, int, float)
+
+
+def _is_scene(obj):
+    from super_quantum_party.core.scene import Scene, SceneManager
+    return isinstance(obj, (Scene, SceneManager))
+
+
+# ── reachability and holders ───────────────────────────────────────────
+def _reachable(root, target):
+    """Whether ``target`` can be reached from ``root`` through ordinary objects."""
+    seen, frontier = {id(root)}, [root]
+    while frontier and len(seen) < REACH_LIMIT:
+        nxt = []
+        for ref in gc.get_referents(*frontier):
+            if ref is target:
+                return True
+            if id(ref) in seen or isinstance(ref, _OPAQUE) or isinstance(ref, types.FrameType):
+                continue
+            seen.add(id(ref))
+            nxt.append(ref)
+        frontier = nxt
+    return False
+
+
+def _holders(obj, limit=3):
+    """What refers to ``obj``: ``"GateScene.previous_scene"``, ``"list"``…"""
+    out = []
+    ignore = {id(_departed), id(sys._getframe())}
+    for ref in gc.get_referrers(obj):
+        if id(ref) in ignore or isinstance(ref, (types.FrameType, _Departed)):
+            continue
+        label = type(ref).__name__
+        if isinstance(ref, dict):
+            key = next((k for k, v in ref.items() if v is obj), "?")
+            owner = next((o for o in gc.get_referrers(ref) if getattr(o, "__dict__", None) is ref), None)
+            if owner is not None:
+                label = f"{type(owner).__name__}.{key}"
+            elif "__name__" in ref and "__builtins__" in ref:
+                label = f"{ref['__name__']}.{key}"
+            else:
+                label = f"dict[{key!r}]"
+        out.append(label)
+        if len(out) >= limit:
+            break
+    return ", ".join(out) or "nothing visible from Python"
+
+
+def _describe(obj):
+    surface, _ = _pygame_types()
+    if isinstance(obj, surface):
+        return f"surface {obj.get_width()}x{obj.get_height()}"
+    return f"sound {obj.get_length():.1f}s"
+
+
+def _flag(message):
+    _flags.append(message)
+    if _verbose:
+        print(f">>> memory: {message}")
+
+
+# ── sampling ───────────────────────────────────────────────────────────
+def sample():
+    """Collect garbage, then measure the heap and the live surfaces and sounds."""
+    gc.collect()
+    surfaces, sounds = _pygame_objects()
+    return _Sample(tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+                   len(surfaces), sum(s.get_pitch() * s.get_height() for s in surfaces.values()),
+                   len(sounds), sum(_sound_bytes(s) for s in sounds.values()))
+
+
+def start(verbose=True):
+    """Trace allocations and measure every scene switch from now on (fresh totals)."""
+    global active, _verbose, _tracing, _first, _last, _baseline
+    _growth.clear()
+    _departed.clear()
+    _flags.clear()
+    _numbers.clear()
+    _counts.clear()
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACE_FRAMES)
+        _tracing = True
+    _verbose = verbose
+    _first = _last = sample()
+    _baseline = tracemalloc.take_snapshot()
+    active = True
+
+
+def stop():
+    """Stop measuring; tracemalloc keeps running if someone else started it."""
+    global active, _tracing
+    active = False
+    if _tracing:
+        tracemalloc.stop()
+        _tracing = False
+
+
+def transition(old, new):
+    """Called by ``SceneManager.go_to`` when switching from ``old`` to ``new``."""
+    global _last
+    now = sample()
+    key = f"{type(old).__name__} -> {type(new).__name__}"
+    delta = now - _last
+    _growth.setdefault(key, _Growth()).add(delta)
+    _last = now
+    if _verbose:
+        print(f">>> memory {key}: {delta[0] / 1024:+.0f} KiB heap, {delta[1]:+d} surfaces "
+              f"({delta[2] / 1024:+.0f} KiB), {delta[3]:+d} sounds")
+    _check(new)
+    if old is not None and old is not new and not any(d.ref() is old for d in _departed):
+        _departed.append(_Departed(old))
+
+
+def _check(current):
+    shared = {id(value) for value in assets.cached()}
+    for d in list(_departed):
+        scene = d.ref()
+        if scene is current:                    # back to it (GateScene -> GameScene)
+            _departed.remove(d)
+        elif scene is None:
+            for ref, path in d.owned:
+                obj = ref()
+                if obj is not None and id(obj) not in shared:
+                    _flag(f"{_describe(obj)} {path} outlived {d.tag} (held by {_holders(obj)})")
+            _departed.remove(d)
+        else:
+            d.age += 1
+            if d.age > 1 and not d.flagged and not _reachable(current, scene):
+                d.flagged = True
+                _flag(f"{d.tag} still alive {d.age} switches after it was left "
+                      f"(held by {_holders(scene)})")
+        del scene
+
+
+# ── reports ────────────────────────────────────────────────────────────
+def growth():
+    """``{"Old -> New": (switches, heap, surfaces, surface bytes, sounds, sound bytes)}``, totals."""
+    return {key: (g.n, g.traced, g.surfaces, g.surface_bytes, g.sounds, g.sound_bytes)
+            for key, g in _growth.items()}
+
+
+def flags():
+    return list(_flags)
+
+
+def report(top=5):
+    """Lines: growth per switch type (mean per switch), flags, top growing lines."""
+    lines = ["memory growth per scene switch (mean):"]
+    for key, (n, traced, surfaces, surface_bytes, sounds, _) in sorted(growth().items()):
+        lines.append(f"  {key:28s} x{n:<4d} {traced / n / 1024:+8.0f} KiB heap "
+                     f"{surfaces / n:+6.1f} surfaces ({surface_bytes / n / 1024:+.0f} KiB) "
+                     f"{sounds / n:+5.1f} sounds")
+    lines += [f"  ! {message}" for message in _flags]
+    if _baseline is not None and tracemalloc.is_tracing():
+        lines.append("largest heap growth since start:")
+        for stat in tracemalloc.take_snapshot().compare_to(_baseline, "lineno")[:top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size_diff / 1024:+8.0f} KiB {stat.count_diff:+7d} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+    return lines
+
+
+# ── headless cycles ────────────────────────────────────────────────────
+def _cycle(manager, screen, bot, max_frames=20000):
+    """One menu -> game (-> gate ...) -> winner -> menu round, driven by UI events."""
+    import pygame
+    from super_quantum_party.scenes.winner import WinnerScene
+
+    menu = manager.scene
+    for _, _, ctrl in menu.players_ui:
+        ctrl.value = bot
+    manager.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=menu.play_btn.rect.center,
+                                            button=1))
+    del menu
+    for _ in range(max_frames):
+        manager.update(0.5)
+        manager.draw(screen)
+        if isinstance(manager.scene, WinnerScene):
+            break
+    else:
+        raise RuntimeError(f"the game did not end in {max_frames} frames")
+    manager.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE, mod=0, unicode=""))
+    manager.update(0.0)
+    manager.draw(screen)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+
+    from super_quantum_party.core import memory    # the instance SceneManager reports to
+    from super_quantum_party.core.scene import SceneManager
+    from super_quantum_party.scenes.menu import MenuScene
+    from super_quantum_party.settings import WIDTH, HEIGHT
+    from super_quantum_party.ui.widgets import init_fonts
+
+    ap = argparse.ArgumentParser(description="Play menu/game/gate/winner cycles headlessly "
+                                             "and check that memory stays bounded.")
+    ap.add_argument("--cycles", type=int, default=8)
+    ap.add_argument("--warm-up", type=int, default=2, help="cycles before the measured ones")
+    ap.add_argument("--bot", default="Greedy")
+    ap.add_argument("--heap-budget", type=int, default=256,
+                    help="KiB of heap growth allowed per measured cycle")
+    ap.add_argument("--verbose", action="store_true", help="print every switch")
+    args = ap.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    init_fonts(assets.font(None, 72), assets.font(None, 32), assets.font(None, 24))
+    manager = SceneManager(MenuScene(None))
+    manager.scene.manager = manager
+    memory.start(verbose=args.verbose)
+    samples = [memory.sample()]
+    for cycle in range(args.warm_up + args.cycles):
+        _cycle(manager, screen, args.bot)
+        now = memory.sample()
+        samples.append(now)
+        print(f"cycle {cycle + 1:3d}{' (warm-up)' if cycle < args.warm_up else '':10s} "
+              f"heap {now.traced / 2 ** 20:7.2f} MiB, {now.surfaces:4d} surfaces "
+              f"({now.surface_bytes / 2 ** 20:6.2f} MiB), {now.sounds} sounds")
+    print("\n".join(memory.report()))
+
+    base, end = samples[args.warm_up], samples[-1]
+    heap = (end.traced - base.traced) / args.cycles / 1024
+    problems = []
+    if heap > args.heap_budget:
+        problems.append(f"heap grows {heap:.0f} KiB per cycle (budget {args.heap_budget} KiB)")
+    if end.surfaces > base.surfaces or end.sounds > base.sounds:
+        problems.append(f"{end.surfaces - base.surfaces:+d} surfaces, "
+                        f"{end.sounds - base.sounds:+d} sounds over {args.cycles} cycles")
+    problems += memory.flags()
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print(f"OK: {heap:+.1f} KiB heap per cycle, surfaces and sounds steady")
+    sys.exit(1 if problems else 0)
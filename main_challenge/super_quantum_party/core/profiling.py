@@ -0,0 +1,206 @@
+"""
+On-demand profiles of the running game.
+
+``Profiler.start(scene, frames=N)`` profiles the next ``N`` frames;
+``frames=None`` profiles until the next scene switch.  In game, **F4**
+captures ``settings.PROFILE_FRAMES`` frames and **Shift+F4** runs until
+the scene changes; ``SQP_PROFILE=120`` or ``SQP_PROFILE=scene`` starts one
+at launch.  Two profilers are available (``SQP_PROFILER``):
+
+``cprofile``
+    deterministic, every call counted; slows Python code down noticeably.
+``sample``
+    a thread looks at the main thread's stack every millisecond; cheap
+    but statistical.  While the main thread runs Python code the sampler
+    only gets the GIL every ``sys.getswitchinterval()`` (5 ms), so each
+    stack is weighted by the time measured since the previous sample
+    rather than by the nominal interval.
+
+Each capture writes two files into ``settings.PROFILE_DIR``, named after
+the time, the active scene and the turns left in the game:
+
+``.pstats``
+    for ``python -m pstats`` or snakeviz;
+``.collapsed``
+    one ``frame;frame;frame weight`` line per stack, for flamegraph.pl,
+    speedscope or inferno.  The root frame carries the same tag.
+
+When no capture is running the main loop only checks ``active``.
+"""
+from __future__ import annotations
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = 0.001     # seconds between two stack samples
+
+
+def scene_tag(scene):
+    """``GameScene-7-turns-left``: the scene and, in a game, its turns left."""
+    tag = type(scene).__name__
+    engine = getattr(scene, "engine", None)
+    if engine is not None:
+        tag += f"-{engine.state.n_turns}-turns-left"
+    return tag
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == "~":                         # built-ins, e.g. <method 'blit' ...>
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+# ── sampling ───────────────────────────────────────────────────────────
+class _Sampler:
+    """Times the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()            # tuple of (file, line, name), root first -> samples
+        self.stacks = Counter()             # same key -> seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            dt, last = now - last, now
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                key = tuple(reversed(stack))
+                self.samples[key] += 1
+                self.stacks[key] += dt
+
+    def create_stats(self):
+        """``pstats`` view of the samples: counts as calls, sampled time as time."""
+        own, total, calls, callers = Counter(), Counter(), Counter(), {}
+        for stack, t in self.stacks.items():
+            n = self.samples[stack]
+            own[stack[-1]] += t
+            for func in set(stack):
+                total[func] += t
+                calls[func] += n
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges = callers.setdefault(callee, {})
+                k, ct = edges.get(caller, (0, 0.0))
+                edges[caller] = (k + n, ct + t)
+        self.stats = {
+            func: (calls[func], calls[func], own[func], t,
+                   {c: (k, k, 0.0, ct) for c, (k, ct) in callers.get(func, {}).items()})
+            for func, t in total.items()}
+
+
+def _collapse_samples(stacks):
+    """Collapsed stacks weighted by sampled time in µs, like ``_collapse_pstats``."""
+    return Counter({";".join(_label(f) for f in stack): round(t * 1e6)
+                    for stack, t in stacks.items()})
+
+
+def _collapse_pstats(stats, min_share=1e-4):
+    """Collapsed stacks from a call graph, own time in µs split over the callers."""
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    out = Counter()
+
+    def visit(func, path, share):
+        _, _, tt, ct, _ = stats[func]
+        if tt * share * 1e6 >= 1:
+            out[path] += round(tt * share * 1e6)
+        for callee, edge_ct in callees.get(func, ()):
+            callee_ct = stats[callee][3]
+            sub = share * edge_ct / callee_ct if callee_ct else 0.0
+            if sub >= min_share and _label(callee) not in path.split(";"):
+                visit(callee, f"{path};{_label(callee)}", sub)
+
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            visit(func, _label(func), 1.0)
+    return out
+
+
+# ── captures ───────────────────────────────────────────────────────────
+class Profiler:
+    def __init__(self, mode="cprofile", directory="profiles"):
+        if mode not in MODES:
+            raise ValueError(f"unknown profiler {mode!r} ({' or '.join(MODES)})")
+        self.mode = mode
+        self.directory = directory
+        self.active = False
+        self.last = None            # paths written by the latest capture
+        self._frames_left = None
+        self._scene = None
+        self._tag = ""
+        self._profile = None
+
+    def start(self, scene, frames=None):
+        """Profile the next ``frames`` frames, or until ``scene`` stops being current."""
+        if self.active:
+            return
+        self.active = True
+        self._frames_left = frames
+        self._scene = scene
+        self._tag = scene_tag(scene)
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._profile = _Sampler(threading.main_thread().ident)
+            self._profile.start()
+        print(f">>> profiling {self._tag} ({self.mode}, "
+              f"{f'{frames} frames' if frames else 'until the next scene'})")
+
+    def frame_done(self, scene):
+        """Call after each frame while ``active``; ``scene`` is the current one."""
+        if self._frames_left is not None:
+            self._frames_left -= 1
+            if self._frames_left > 0:
+                return
+        elif scene is self._scene:
+            return
+        self.finish()
+
+    def finish(self):
+        """Stop the capture and write its files; returns their paths."""
+        if not self.active:
+            return None
+        self.active = False
+        if self.mode == "cprofile":
+            self._profile.disable()
+            stats = pstats.Stats(self._profile)
+            collapsed = _collapse_pstats(stats.stats)
+        else:
+            self._profile.stop()
+            stats = pstats.Stats(self._profile)
+            collapsed = _collapse_samples(self._profile.stacks)
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{self._tag}-{self.mode}")
+        stats.dump_stats(base + ".pstats")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, weight in sorted(collapsed.items()):
+                f.write(f"{self._tag};{stack} {weight}\n")
+        self._profile = self._scene = None
+        self.last = (base + ".pstats", base + ".collapsed")
+        print(f">>> profile written to {base}.pstats / .collapsed")
+        return self.last
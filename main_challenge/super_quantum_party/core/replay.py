@@ -0,0 +1,495 @@
+"""
+Deterministic replay logs.
+
+A ``Recorder`` attached to an ``Engine`` logs everything that cannot be
+recomputed: every random outcome (dice, measurement results, gate rewards,
+star relocations) and every decision (branch choices, gate placements,
+skip/measure/continue).  Forced steps (rolling, walking) are not stored –
+replaying re-derives them from the rules.  Replays therefore do not depend
+on Aer, on seeds or on Python's RNG implementation.
+
+File layout (all integers are unsigned LEB128 varints):
+
+    header    MAGIC, version, map name + digest, seed, rules, players
+    events    tag [payload] ...   (about two bytes per event; a keyframe
+              is tag, round, length, state)
+    index     keyframe count, then (round, event offset) pairs
+    trailer   u32 little-endian offset of the index
+
+Every ``KEYFRAME_EVERY`` rounds a keyframe with the full game state is
+written into the event stream, so ``ReplayReader.engine_at(round)``
+restores the nearest keyframe and fast-forwards the headless rules from
+there instead of from the first turn.
+
+    $ python -m super_quantum_party.core.replay game.sqpr --seek 12
+"""
+from __future__ import annotations
+import argparse
+import os
+import struct
+import time
+
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.density import OUTCOMES
+from super_quantum_party.core.engine import (
+    ALL_GATES, BRANCH, GATES, PLACEABLE_GATES, ROLL,
+    CONTINUE, MEASURE, SKIP, Engine, RuleSet, branch, place,
+)
+from super_quantum_party.models.player import Player
+
+MAGIC = b"SQPRPL"
+FORMAT_VERSION = 2          # 2: keyframes carry the last roll; 1 is still read
+REPLAY_SUFFIX = ".sqpr"
+KEYFRAME_EVERY = 2          # rounds between two keyframes
+
+# event tags
+T_ROLL, T_MEASURED, T_PICK, T_INT = 0, 1, 2, 3            # random outcomes
+T_BRANCH, T_PLACE, T_SKIP, T_MEASURE, T_CONTINUE = 4, 5, 6, 7, 8  # decisions
+T_KEYFRAME = 9
+
+
+class ReplayError(Exception):
+    """The replay does not match the board or the rules it is played on."""
+
+
+# ── varints ────────────────────────────────────────────────────────────
+def write_varint(buf: bytearray, n: int):
+    while n >= 0x80:
+        buf.append(n & 0x7F | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def read_varint(buf, pos: int):
+    """Return ``(value, new_pos)``."""
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _write_str(buf, text):
+    raw = text.encode("utf-8")
+    write_varint(buf, len(raw))
+    buf += raw
+
+
+def _read_str(buf, pos):
+    n, pos = read_varint(buf, pos)
+    return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+
+
+# ── recording ──────────────────────────────────────────────────────────
+class _RecordingBackend:
+    def __init__(self, inner, recorder):
+        self.inner, self.recorder = inner, recorder
+
+    def roll(self):
+        value = self.inner.roll()
+        self.recorder.emit(T_ROLL, value)
+        return value
+
+    def measure(self, history, percent):
+        result = self.inner.measure(history, percent)
+        self.recorder.emit(T_MEASURED, OUTCOMES.index(result))
+        return result
+
+
+class _RecordingRandom:
+    """The parts of ``random.Random`` the engine uses, logging each draw."""
+
+    def __init__(self, inner, recorder):
+        self.inner, self.recorder = inner, recorder
+
+    def choice(self, seq):
+        i = self.inner.randrange(len(seq))
+        self.recorder.emit(T_PICK, i)
+        return seq[i]
+
+    def randint(self, a, b):
+        value = self.inner.randint(a, b)
+        self.recorder.emit(T_INT, value - a)
+        return value
+
+
+class Recorder:
+    """Records an engine's game from the moment it is attached."""
+
+    def __init__(self, engine: Engine, map_name: str = "", map_digest: bytes = b"",
+                 seed: int = 0, keyframe_every: int = KEYFRAME_EVERY):
+        self.engine = engine
+        self.keyframe_every = keyframe_every
+        self.header = _encode_header(engine, map_name, map_digest, seed)
+        self.events = bytearray()
+        self.keyframes = []                      # (round, offset in events)
+        self._index = engine.board.index
+        self.total_rounds = engine.state.n_turns
+        engine.backend = _RecordingBackend(engine.backend, self)
+        engine.rng = _RecordingRandom(engine.rng, self)
+        engine.recorder = self
+
+    def emit(self, tag, value=None):
+        self.events.append(tag)
+        if value is not None:
+            write_varint(self.events, value)
+
+    def on_action(self, engine, action):
+        """Called by ``Engine.step`` before ``action`` is applied."""
+        s = engine.state
+        kind = action[0]
+        if s.phase == ROLL:
+            if kind == "roll" and s.active == 0 and not s.dice:
+                rnd = self.total_rounds - s.n_turns
+                if rnd % self.keyframe_every == 0:
+                    self.keyframes.append((rnd, len(self.events)))
+                    self.emit(T_KEYFRAME, rnd)
+                    state = encode_state(engine, self._index)
+                    write_varint(self.events, len(state))
+                    self.events += state
+        elif s.phase == BRANCH and kind == "branch":
+            self.emit(T_BRANCH, s.branch_options.index(action[1]))
+        elif s.phase == GATES:
+            if kind == "place":
+                self.emit(T_PLACE, place_code(action[1], action[2]))
+            elif kind == "skip":
+                self.emit(T_SKIP)
+            elif kind == "measure":
+                self.emit(T_MEASURE)
+            elif kind == "continue":
+                self.emit(T_CONTINUE)
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(self.header)
+        body = len(out)
+        out += self.events
+        index = len(out)
+        write_varint(out, len(self.keyframes))
+        for rnd, offset in self.keyframes:
+            write_varint(out, rnd)
+            write_varint(out, body + offset)
+        out += struct.pack("<I", index)
+        return bytes(out)
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+
+def place_code(gate, qubit):
+    return PLACEABLE_GATES.index(gate) * 2 + qubit
+
+
+def _encode_header(engine, map_name, map_digest, seed):
+    buf = bytearray(MAGIC)
+    write_varint(buf, FORMAT_VERSION)
+    _write_str(buf, map_name)
+    write_varint(buf, len(map_digest))
+    buf += map_digest
+    write_varint(buf, seed)
+    rules = engine.ruleset
+    for n in (*rules.reward_range, rules.decoh_every, rules.decoh_percent, engine.state.n_turns):
+        write_varint(buf, n)
+    write_varint(buf, len(engine.players))
+    for p in engine.players:
+        _write_str(buf, p.name)
+        write_varint(buf, p.slot)
+        write_varint(buf, p.order)
+        bot = getattr(p, "bot", None)
+        _write_str(buf, bot.level if bot is not None else "")
+    return bytes(buf)
+
+
+# ── keyframe state ─────────────────────────────────────────────────────
+def encode_state(engine, index) -> bytearray:
+    """Round-start state: turns left, topology, star tiles, players, last roll."""
+    s = engine.state
+    buf = bytearray()
+    write_varint(buf, s.n_turns)
+    write_varint(buf, OUTCOMES.index(s.topology))
+    stars = [index[n] for n, t in s.types.items() if t == 4]
+    write_varint(buf, len(stars))
+    for i in stars:
+        write_varint(buf, i)
+    for p in s.players:
+        write_varint(buf, index[p.position])
+        write_varint(buf, p.stars)
+        present = sum(1 << i for i, g in enumerate(ALL_GATES) if g in p.gates)
+        write_varint(buf, present)
+        for g in ALL_GATES:
+            if g in p.gates:
+                write_varint(buf, p.gates[g])
+    if s.last_roll is None:                     # the HUD shows the previous turn's dice
+        write_varint(buf, 0)
+    else:
+        write_varint(buf, s.last_roll[0] + 1)
+        for v in s.last_roll[1:]:
+            write_varint(buf, v)
+    return buf
+
+
+def decode_state(engine, buf, pos, end):
+    """Restore a round-start state written by ``encode_state`` in ``buf[pos:end]``;
+    return the new pos.  Version 1 keyframes stop before the last roll."""
+    s = engine.state
+    ids = engine.board.ids
+    s.n_turns, pos = read_varint(buf, pos)
+    topo, pos = read_varint(buf, pos)
+    s.topology = OUTCOMES[topo]
+    s.types = {n: (1 if t == 4 else t) for n, t in engine.board.types.items()}
+    n_stars, pos = read_varint(buf, pos)
+    for _ in range(n_stars):
+        i, pos = read_varint(buf, pos)
+        s.types[ids[i]] = 4
+    for p in s.players:
+        i, pos = read_varint(buf, pos)
+        p.position = ids[i]
+        p.stars, pos = read_varint(buf, pos)
+        present, pos = read_varint(buf, pos)
+        p.gates = {}
+        for bit, g in enumerate(ALL_GATES):
+            if present >> bit & 1:
+                p.gates[g], pos = read_varint(buf, pos)
+    s.active, s.phase, s.dice, s.steps = 0, ROLL, [], 0
+    s.branch_options, s.round, s.last_roll = [], None, None
+    if pos < end:
+        roller, pos = read_varint(buf, pos)
+        if roller:
+            d1, pos = read_varint(buf, pos)
+            d2, pos = read_varint(buf, pos)
+            total, pos = read_varint(buf, pos)
+            s.last_roll = (roller - 1, d1, d2, total)
+    return pos
+
+
+# ── playback ───────────────────────────────────────────────────────────
+class EventCursor:
+    """Reads the event stream on behalf of the engine and the driver."""
+
+    def __init__(self, buf, pos, end):
+        self.buf, self.pos, self.end = buf, pos, end
+
+    def feed(self, data: bytes):
+        """Append events received later (``buf`` must be a ``bytearray``)."""
+        self.buf += data
+        self.end = len(self.buf)
+
+    def at_end(self):
+        return self.pos >= self.end
+
+    def peek(self):
+        return self.buf[self.pos] if self.pos < self.end else None
+
+    def read(self, *tags):
+        if self.pos >= self.end:
+            raise ReplayError("replay ended early")
+        tag = self.buf[self.pos]
+        if tag not in tags:
+            raise ReplayError(f"replay out of sync: event {tag} at byte {self.pos}, "
+                              f"expected one of {tags}")
+        self.pos += 1
+        if tag in (T_SKIP, T_MEASURE, T_CONTINUE):
+            return tag, None
+        value, self.pos = read_varint(self.buf, self.pos)
+        return tag, value
+
+    def skip_keyframes(self):
+        while self.peek() == T_KEYFRAME:
+            self.read(T_KEYFRAME)
+            length, self.pos = read_varint(self.buf, self.pos)
+            self.pos += length
+
+
+class ScriptedBackend:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def roll(self):
+        return self.cursor.read(T_ROLL)[1]
+
+    def measure(self, history, percent):
+        return OUTCOMES[self.cursor.read(T_MEASURED)[1]]
+
+
+class ScriptedRandom:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def choice(self, seq):
+        return seq[self.cursor.read(T_PICK)[1]]
+
+    def randint(self, a, b):
+        return a + self.cursor.read(T_INT)[1]
+
+
+def next_action(engine, cursor):
+    """The engine's next action according to the event stream.
+
+    ``None`` when it depends on an event the stream does not hold yet (a
+    decision, or a die roll); walking steps are forced and always returned.
+    """
+    s = engine.state
+    cursor.skip_keyframes()         # already in the state when played through
+    if s.phase == BRANCH:
+        if cursor.at_end():
+            return None
+        return branch(s.branch_options[cursor.read(T_BRANCH)[1]])
+    if s.phase == GATES:
+        if cursor.at_end():
+            return None
+        tag, value = cursor.read(T_PLACE, T_SKIP, T_MEASURE, T_CONTINUE)
+        if tag == T_PLACE:
+            return place(PLACEABLE_GATES[value // 2], value % 2)
+        return {T_SKIP: SKIP, T_MEASURE: MEASURE, T_CONTINUE: CONTINUE}[tag]
+    if s.phase == ROLL and cursor.at_end():
+        return None
+    actions = engine.legal_actions()            # rolling and walking are forced
+    return actions[0] if actions else None
+
+
+class ReplayReader:
+    """A loaded replay; builds engines positioned at any round."""
+
+    def __init__(self, data: bytes, board: Board | None = None, strict: bool = True):
+        self.data = memoryview(data)
+        buf = self.data
+        if bytes(buf[:len(MAGIC)]) != MAGIC:
+            raise ReplayError("not a replay file")
+        pos = len(MAGIC)
+        version, pos = read_varint(buf, pos)
+        if version not in (1, FORMAT_VERSION):
+            raise ReplayError(f"unsupported replay version {version}")
+        self.map_name, pos = _read_str(buf, pos)
+        n, pos = read_varint(buf, pos)
+        self.map_digest, pos = bytes(buf[pos:pos + n]), pos + n
+        self.seed, pos = read_varint(buf, pos)
+        vals = []
+        for _ in range(5):
+            v, pos = read_varint(buf, pos)
+            vals.append(v)
+        self.ruleset = RuleSet(vals[0:2], vals[2], vals[3])
+        self.n_turns = vals[4]
+        n_players, pos = read_varint(buf, pos)
+        self.players = []
+        for _ in range(n_players):
+            name, pos = _read_str(buf, pos)
+            slot, pos = read_varint(buf, pos)
+            order, pos = read_varint(buf, pos)
+            bot, pos = _read_str(buf, pos)
+            self.players.append((name, slot, order, bot))
+        self.events_start = pos
+        (index,) = struct.unpack_from("<I", buf, len(buf) - 4)
+        self.events_end = index
+        count, pos = read_varint(buf, index)
+        self.keyframes = []
+        for _ in range(count):
+            rnd, pos = read_varint(buf, pos)
+            offset, pos = read_varint(buf, pos)
+            self.keyframes.append((rnd, offset))
+        self.board = board if board is not None else self._load_board(strict)
+
+    @classmethod
+    def load(cls, path: str, board: Board | None = None, strict: bool = True):
+        with open(path, "rb") as f:
+            return cls(f.read(), board, strict)
+
+    def _load_board(self, strict):
+        from super_quantum_party.maps import registry
+        cmap = registry.get_map(self.map_name).load()
+        if strict and self.map_digest and cmap.digest != self.map_digest:
+            raise ReplayError(f"map {self.map_name!r} changed since the game was recorded")
+        return Board.from_compiled(cmap)
+
+    # ── engines ────────────────────────────────────────────────────────
+    def new_engine(self) -> Engine:
+        """Engine at the first turn, scripted by the recorded events."""
+        players = []
+        for name, slot, order, _ in self.players:
+            p = Player(slot)
+            p.set_name(name)
+            p.set_turn_priority(order)
+            players.append(p)
+        cursor = EventCursor(self.data, self.events_start, self.events_end)
+        engine = Engine(self.board, players, self.n_turns, backend=ScriptedBackend(cursor),
+                        ruleset=self.ruleset)
+        engine.rng = ScriptedRandom(cursor)
+        engine.replay_cursor = cursor
+        return engine
+
+    def step(self, engine):
+        """Apply the next recorded step to ``engine``; return its events."""
+        action = next_action(engine, engine.replay_cursor)
+        if action is None:
+            raise ReplayError("replay ended early")
+        return engine.step(action)
+
+    def steps(self, engine):
+        """Yield ``(events, state)`` for every remaining step of the game."""
+        while not engine.is_over():
+            try:
+                events = self.step(engine)
+            except ReplayError:
+                if engine.replay_cursor.at_end():
+                    return          # the recording stopped before the game did
+                raise
+            yield events, engine.state
+
+    def current_round(self, engine):
+        return self.n_turns - engine.state.n_turns
+
+    def engine_at(self, rnd: int) -> Engine:
+        """Engine at the start of round ``rnd`` (0 = first turn)."""
+        engine = self.new_engine()
+        cursor = engine.replay_cursor
+        keyframes = [offset for r, offset in self.keyframes if r <= rnd]
+        if keyframes:
+            cursor.pos = keyframes[-1]
+            cursor.read(T_KEYFRAME)
+            length, cursor.pos = read_varint(cursor.buf, cursor.pos)
+            cursor.pos = decode_state(engine, cursor.buf, cursor.pos, cursor.pos + length)
+        steps = self.steps(engine)
+        while not engine.is_over():
+            s = engine.state
+            at_start = s.phase == ROLL and s.active == 0 and not s.dice
+            if at_start and self.current_round(engine) >= rnd:
+                break
+            if next(steps, None) is None:
+                break
+        return engine
+
+
+def replay_to_end(reader: ReplayReader):
+    """Play the whole replay headlessly and return the final engine."""
+    engine = reader.new_engine()
+    for _ in reader.steps(engine):
+        pass
+    return engine
+
+
+if __name__ == "__main__":
+    from super_quantum_party.core.engine import final_ranking
+
+    parser = argparse.ArgumentParser(description="Inspect or fast-forward a replay.")
+    parser.add_argument("replay")
+    parser.add_argument("--seek", type=int, default=None, help="round to jump to")
+    args = parser.parse_args()
+
+    reader = ReplayReader.load(args.replay)
+    size = os.path.getsize(args.replay)
+    print(f"{args.replay}: {size} bytes, map {reader.map_name!r}, {reader.n_turns} rounds, "
+          f"{len(reader.players)} players, {len(reader.keyframes)} keyframes")
+    t0 = time.perf_counter()
+    if args.seek is None:
+        engine = replay_to_end(reader)
+    else:
+        engine = reader.engine_at(args.seek)
+    dt = (time.perf_counter() - t0) * 1000
+    where = "end of game" if engine.is_over() else f"round {reader.current_round(engine)}"
+    print(f"{where} reached in {dt:.2f} ms")
+    for p in final_ranking(engine.players):
+        print(f"  {p.name or p.slot}: {p.stars} stars, {sum(p.gates.values())} gates, on {p.position}")
@@ -1,10 +1,25 @@
 """
 Tiny scene framework – one active scene at a time.
 """
+import weakref
+
+from super_quantum_party.core import assets, memory, trace
+
 
 class Scene:
+    ASSETS = []                          # what the loading screen preloads for it
+
     def __init__(self, manager):
         self.manager = manager           # back-reference if the scene needs to switch
+        self._handles = []
+
+    def resource(self, asset):
+        """The shared ``asset`` (see ``core.assets``), held while this scene lives."""
+        if not self._handles:
+            weakref.finalize(self, assets.release_all, self._handles)
+        handle = assets.acquire(asset)
+        self._handles.append(handle)
+        return handle.value
 
     # The three standard callbacks every scene must implement
     def handle_event(self, event): pass
@@ -21,10 +36,21 @@ class SceneManager:
         self.scene = start_scene
 
     def go_to(self, scene):
-        self.scene = scene
+        old, self.scene = self.scene, scene
         print(f">>> switched to {scene.__class__.__name__}")
+        trace.instant(f"switch to {scene.__class__.__name__}")
+        if memory.active:
+            memory.transition(old, scene)
+
+    # Thin proxies used by the main loop, each timed by ``core.trace``
+    def handle_event(self, event):
+        with trace.span(f"{self.scene.__class__.__name__}.handle_event"):
+            self.scene.handle_event(event)
+
+    def update(self, dt):
+        with trace.span(f"{self.scene.__class__.__name__}.update"):
+            self.scene.update(dt)
 
-    # Thin proxies used by the main loop
-    def handle_event(self, event): self.scene.handle_event(event)
-    def update(self, dt):          self.scene.update(dt)
-    def draw(self, surface):       self.scene.draw(surface)
+    def draw(self, surface):
+        with trace.span(f"{self.scene.__class__.__name__}.draw"):
+            self.scene.draw(surface)
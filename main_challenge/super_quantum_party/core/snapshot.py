@@ -0,0 +1,292 @@
+"""
+Binary snapshots of a running game.
+
+``snapshot(engine)`` packs the whole ``GameState`` – phase, dice, walk,
+live tile types, players, the gate round in progress – into a small
+versioned blob, and ``restore(engine, blob)`` writes it back into an engine
+on the same board.  Nodes are stored as integer ids (``Board.index``) and
+gate inventories as their fixed-order count arrays, so both directions are
+a handful of ``struct`` calls and take microseconds.  Node ids are 32-bit,
+so generated boards of any size fit:
+
+    save games      ``save_game`` / ``load_game`` (map name + digest + snapshot)
+    autosave        ``GameScene`` saves after every turn (``SQP_AUTOSAVE``)
+    search          ``clone(engine)`` for an independent copy to play ahead on
+
+The engine's random streams are not part of a snapshot: a restored game
+continues with fresh randomness.
+
+Layout (little-endian):
+
+    head      magic, version, players, gates, phase, active, topology,
+              nodes, turns left, steps left
+    rules     reward range, DECOH every, DECOH percent
+    walk      dice, last roll, branch options
+    types     one byte per node
+    players   slot, order, stars, node, bot level, gate counts, name
+    round     flag [current, skipped mask, result, placed entries]
+"""
+from __future__ import annotations
+import os
+import struct
+import sys
+import time
+from array import array
+
+from super_quantum_party.core import bots
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.density import OUTCOMES
+from super_quantum_party.core.engine import (
+    ALL_GATES, BRANCH, GATES, INITIAL_HISTORY, MOVE, OVER, PLACEABLE_GATES, ROLL,
+    Engine, GateRound, RuleSet, gate_entry,
+)
+from super_quantum_party.models.player import GateInventory, Player
+
+MAGIC = b"SQPS"
+FORMAT_VERSION = 2                  # 2: node indices are 32-bit (boards of any size)
+SAVE_MAGIC = b"SQPSAVE"
+SAVE_SUFFIX = ".sqps"
+
+PHASES = (ROLL, MOVE, BRANCH, GATES, OVER)
+LEVELS = (None,) + tuple(bots.BOT_LEVELS)                 # bot level codes
+ENTRIES = tuple(dict.fromkeys(                            # circuit entry codes
+    [gate_entry(g, q) for g in PLACEABLE_GATES for q in (0, 1)] + [("DECOH", None)]))
+_ENTRY_CODE = {e: i for i, e in enumerate(ENTRIES)}
+_PHASE_CODE = {p: i for i, p in enumerate(PHASES)}
+_TOPO_CODE = {o: i for i, o in enumerate(OUTCOMES)}
+_LEVEL_CODE = {lv: i for i, lv in enumerate(LEVELS)}
+_GATES_SIZE = 2 * len(ALL_GATES)
+_NO_RESULT = 0xFF
+_BIG_ENDIAN = sys.byteorder == "big"       # gate count arrays are stored little-endian
+
+_HEAD = struct.Struct("<4sBBBBBBIHH")
+_RULES = struct.Struct("<BBBB")
+_ROLL = struct.Struct("<BBBH")
+_PLAYER = struct.Struct("<BBHIB")
+_ROUND = struct.Struct("<BBBH")
+_NODE = struct.Struct("<I")
+
+
+class SnapshotError(Exception):
+    """The blob is not a snapshot, or does not fit the board it is restored on."""
+
+
+# ── encoding ───────────────────────────────────────────────────────────
+def snapshot(engine: Engine) -> bytes:
+    """The engine's game state as a versioned binary blob."""
+    s = engine.state
+    board = engine.board
+    index = board.index
+    rules = engine.ruleset
+    out = [
+        _HEAD.pack(MAGIC, FORMAT_VERSION, len(s.players), len(ALL_GATES),
+                   _PHASE_CODE[s.phase], s.active, _TOPO_CODE[s.topology],
+                   len(board.ids), s.n_turns, s.steps),
+        _RULES.pack(*rules.reward_range, rules.decoh_every, rules.decoh_percent),
+        bytes((len(s.dice), *s.dice)),
+    ]
+    if s.last_roll is None:
+        out.append(b"\x00")
+    else:
+        out += (b"\x01", _ROLL.pack(*s.last_roll))
+    out.append(bytes((len(s.branch_options),)))
+    out += [_NODE.pack(index[n]) for n in s.branch_options]
+    out.append(bytes(map(s.types.__getitem__, board.ids)))
+    for p in s.players:
+        name = p.name.encode("utf-8")
+        counts = p.gates.counts
+        if _BIG_ENDIAN:
+            counts = array("H", counts)
+            counts.byteswap()
+        out += (_PLAYER.pack(p.slot, p.order, p.stars, index[p.position],
+                             _LEVEL_CODE.get(getattr(p.bot, "level", None), 0)),
+                counts.tobytes(), bytes((len(name),)), name)
+    r = s.round
+    if r is None:
+        out.append(b"\x00")
+    else:
+        if tuple(r.history[:len(INITIAL_HISTORY)]) != INITIAL_HISTORY:
+            raise SnapshotError("gate round does not start from the initial circuit")
+        placed = r.history[len(INITIAL_HISTORY):]
+        out += (b"\x01",
+                _ROUND.pack(r.current, sum(1 << i for i in r.skipped),
+                            _NO_RESULT if r.result is None else _TOPO_CODE[r.result],
+                            len(placed)),
+                bytes(map(_ENTRY_CODE.__getitem__, placed)))
+    return b"".join(out)
+
+
+# ── decoding ───────────────────────────────────────────────────────────
+def _decode(blob, board, players):
+    """Read ``blob`` into ``players`` (by slot; created if ``None``).
+
+    Returns ``(fields, ruleset, players)`` where ``fields`` are the
+    ``GameState`` attributes.
+    """
+    buf = memoryview(blob)
+    try:
+        (magic, version, n_players, n_gates, phase, active, topology,
+         n_nodes, n_turns, steps) = _HEAD.unpack_from(buf, 0)
+    except struct.error:
+        raise SnapshotError("not a game snapshot") from None
+    if magic != MAGIC:
+        raise SnapshotError("not a game snapshot")
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version}")
+    if n_nodes != len(board.ids) or n_gates != len(ALL_GATES):
+        raise SnapshotError("snapshot was taken on a different board")
+    pos = _HEAD.size
+    lo, hi, every, percent = _RULES.unpack_from(buf, pos)
+    pos += _RULES.size
+    n = buf[pos]
+    dice = list(buf[pos + 1:pos + 1 + n])
+    pos += 1 + n
+    last_roll = None
+    if buf[pos]:
+        last_roll = _ROLL.unpack_from(buf, pos + 1)
+        pos += _ROLL.size
+    pos += 1
+    ids = board.ids
+    n = buf[pos]
+    pos += 1
+    options = [ids[_NODE.unpack_from(buf, pos + _NODE.size * k)[0]] for k in range(n)]
+    pos += _NODE.size * n
+    types = dict(zip(ids, buf[pos:pos + n_nodes]))
+    pos += n_nodes
+
+    by_slot = {p.slot: p for p in players} if players is not None else {}
+    if players is not None and len(by_slot) != n_players:
+        raise SnapshotError(f"snapshot has {n_players} players, the game {len(by_slot)}")
+    ordered = []
+    for _ in range(n_players):
+        slot, order, stars, node, level = _PLAYER.unpack_from(buf, pos)
+        pos += _PLAYER.size
+        p = by_slot.get(slot) if players is not None else None
+        if p is None:
+            if players is not None:
+                raise SnapshotError(f"no player in slot {slot}")
+            p = Player(slot)
+            p.bot = bots.make_bot(LEVELS[level])
+        inv = GateInventory.__new__(GateInventory)
+        inv.counts = array("H", bytes(buf[pos:pos + _GATES_SIZE]))
+        if _BIG_ENDIAN:
+            inv.counts.byteswap()
+        pos += _GATES_SIZE
+        n = buf[pos]
+        p.name = bytes(buf[pos + 1:pos + 1 + n]).decode("utf-8")
+        pos += 1 + n
+        p.order, p.stars, p.position, p.gates = order, stars, ids[node], inv
+        ordered.append(p)
+
+    ruleset = RuleSet((lo, hi), every, percent)
+    rnd = None
+    if buf[pos]:
+        current, skipped, result, n = _ROUND.unpack_from(buf, pos + 1)
+        pos += 1 + _ROUND.size
+        rnd = GateRound(n_players, ruleset)
+        rnd.history += [ENTRIES[c] for c in buf[pos:pos + n]]
+        rnd.current = current
+        rnd.skipped = {i for i in range(n_players) if skipped >> i & 1}
+        rnd.result = None if result == _NO_RESULT else OUTCOMES[result]
+    fields = dict(players=ordered, n_turns=n_turns, types=types, active=active,
+                  phase=PHASES[phase], dice=dice, last_roll=last_roll, steps=steps,
+                  branch_options=options, topology=OUTCOMES[topology], round=rnd)
+    return fields, ruleset, ordered
+
+
+def restore(engine: Engine, blob: bytes) -> Engine:
+    """Put ``engine`` back in the state saved in ``blob`` (same board, same players)."""
+    fields, ruleset, _ = _decode(blob, engine.board, engine.state.players)
+    engine.state.__dict__.update(fields)
+    engine.ruleset = ruleset
+    return engine
+
+
+def clone(engine: Engine, backend=None, seed=None) -> Engine:
+    """Independent copy of ``engine`` (players included) to play ahead on."""
+    players = []
+    for p in engine.state.players:
+        q = Player.__new__(Player)
+        q.slot, q.order, q.bot, q.sprite, q.color = p.slot, p.order, p.bot, p.sprite, p.color
+        players.append(q)
+    twin = Engine(engine.board, players, engine.state.n_turns, backend=backend,
+                  seed=seed, ruleset=engine.ruleset)
+    return restore(twin, snapshot(engine))
+
+
+def from_snapshot(blob: bytes, board: Board, backend=None, seed=None) -> Engine:
+    """New engine (with new players and their bots) in the state saved in ``blob``."""
+    _, ruleset, players = _decode(blob, board, None)
+    engine = Engine(board, players, 1, backend=backend, seed=seed, ruleset=ruleset)
+    return restore(engine, blob)       # the constructor put everybody on the start tile
+
+
+# ── save files ─────────────────────────────────────────────────────────
+def save_game(path: str, engine: Engine, map_name: str, map_digest: bytes = b""):
+    """Write a save file: map name and digest, then the snapshot."""
+    name = map_name.encode("utf-8")
+    data = b"".join((SAVE_MAGIC, bytes((FORMAT_VERSION, len(name))), name,
+                     bytes((len(map_digest),)), map_digest, snapshot(engine)))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def read_save(path: str):
+    """``(map_name, map_digest, snapshot)`` of a save file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(SAVE_MAGIC):
+        raise SnapshotError(f"{path} is not a save file")
+    pos = len(SAVE_MAGIC)
+    version, n = data[pos], data[pos + 1]
+    if version != FORMAT_VERSION:
+        raise SnapshotError(f"unsupported save version {version}")
+    pos += 2
+    map_name = data[pos:pos + n].decode("utf-8")
+    pos += n
+    n = data[pos]
+    digest = data[pos + 1:pos + 1 + n]
+    return map_name, digest, data[pos + 1 + n:]
+
+
+def load_game(path: str, board: Board | None = None, backend=None, strict: bool = True):
+    """Engine resumed from a save file (the board comes from ``maps.registry``)."""
+    map_name, digest, blob = read_save(path)
+    if board is None:
+        from super_quantum_party.maps import registry
+        cmap = registry.get_map(map_name).load()
+        if strict and digest and cmap.digest != digest:
+            raise SnapshotError(f"map {map_name!r} changed since the game was saved")
+        board = Board.from_compiled(cmap)
+    return from_snapshot(blob, board, backend)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from super_quantum_party.core.engine import random_policy
+    from super_quantum_party.maps import registry
+
+    ap = argparse.ArgumentParser(description="Time snapshot/restore on a random game.")
+    ap.add_argument("--map", default="new_map")
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("-n", type=int, default=20000, help="repetitions")
+    args = ap.parse_args()
+
+    board = Board.from_compiled(registry.get_map(args.map).load())
+    engine = Engine(board, [Player(i) for i in range(4)], args.turns, seed=1)
+    for _ in range(200):          # somewhere in the middle of the game
+        actions = engine.legal_actions()
+        engine.step(actions[0] if len(actions) == 1 else random_policy(engine, actions))
+    blob = snapshot(engine)
+    for name, fn in (("snapshot", lambda: snapshot(engine)),
+                     ("restore", lambda: restore(engine, blob)),
+                     ("clone", lambda: clone(engine))):
+        fn()                      # warm-up (first-use imports)
+        t = time.perf_counter()
+        for _ in range(args.n):
+            fn()
+        print(f"{name:9s} {(time.perf_counter() - t) / args.n * 1e6:7.1f} µs")
+    print(f"snapshot size: {len(blob)} bytes")
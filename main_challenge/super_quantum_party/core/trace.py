@@ -0,0 +1,150 @@
+"""
+Low-overhead timers for frames, scene callbacks and quantum jobs.
+
+``span(name, cat)`` is a context manager timing one piece of work with
+``perf_counter_ns``.  ``SceneManager`` wraps every ``handle_event`` /
+``update`` / ``draw`` in one (category ``"scene"``), the main loop reports
+each frame with ``frame()``, and the quantum backends wrap their dice
+rolls and measurements (``"sim"``) and every Aer job behind them
+(``"aer"``).  Recent frame times and the last simulation latency are kept
+in memory for ``ui.overlay.PerfOverlay`` (``stats()``).
+
+With ``settings.TRACE_DIR`` set (``SQP_TRACE_DIR=traces``) every launch
+also streams its events to a file in that directory: a Chrome trace
+(``SQP_TRACE_FORMAT=chrome``, the default – open it in ``chrome://tracing``
+or https://ui.perfetto.dev) or one JSON object per line
+(``SQP_TRACE_FORMAT=jsonl``).  Both hold the same events, in the Chrome
+trace event format, with times in microseconds since the launch.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from collections import deque
+
+FRAME_WINDOW = 600          # frames kept for the percentiles (20 s at 30 FPS)
+
+_frames = deque(maxlen=FRAME_WINDOW)    # (start, end) in ns, work time of each frame
+_last_sim = None            # (name, seconds) of the latest "sim" span
+_out = None                 # open trace file, if exporting
+_chrome = True
+_lock = threading.Lock()
+_threads = set()            # thread ids already named in the trace
+_t0 = time.perf_counter_ns()
+_pid = os.getpid()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.cat == "sim":
+            global _last_sim
+            _last_sim = (self.name, (end - self.start) / 1e9)
+        if _out is not None:
+            _complete(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+def span(name, cat="scene", **args):
+    """Time the ``with`` block as one ``cat`` event called ``name``."""
+    return _Span(name, cat, args)
+
+
+def frame(start, end):
+    """Report one frame's work, from ``start`` to ``end`` (``perf_counter_ns``)."""
+    _frames.append((start, end))
+    if _out is not None:
+        _complete("frame", "frame", start, end, None)
+
+
+def instant(name, cat="scene", **args):
+    """Mark a moment, such as a scene switch."""
+    if _out is not None:
+        _emit({"name": name, "cat": cat, "ph": "i", "s": "g",
+               "ts": (time.perf_counter_ns() - _t0) / 1000, "args": args})
+
+
+# ── statistics ─────────────────────────────────────────────────────────
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def stats():
+    """FPS, frame time percentiles (ms) and the last simulation latency."""
+    frames = list(_frames)
+    out = {"fps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "sim": _last_sim}
+    if len(frames) > 1:
+        recent = [f for f in frames if f[0] >= frames[-1][0] - 2_000_000_000]   # last 2 s
+        if len(recent) > 1:
+            out["fps"] = (len(recent) - 1) * 1e9 / (recent[-1][0] - recent[0][0])
+    if frames:
+        ordered = sorted((end - start) / 1e6 for start, end in frames)
+        for q in (50, 95, 99):
+            out[f"p{q}"] = _percentile(ordered, q / 100)
+    return out
+
+
+# ── export ─────────────────────────────────────────────────────────────
+def _complete(name, cat, start, end, args):
+    event = {"name": name, "cat": cat, "ph": "X", "ts": (start - _t0) / 1000,
+             "dur": (end - start) / 1000}
+    if args:
+        event["args"] = args
+    _emit(event)
+
+
+def _emit(event):
+    tid = threading.get_ident()
+    event["pid"], event["tid"] = _pid, tid
+    with _lock:
+        if _out is None:
+            return
+        if tid not in _threads:
+            _threads.add(tid)
+            _write({"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid,
+                    "args": {"name": threading.current_thread().name}})
+        _write(event)
+
+
+def _write(event):
+    line = json.dumps(event, separators=(",", ":"))
+    _out.write(line + (",\n" if _chrome else "\n"))
+
+
+def start(directory, fmt="chrome"):
+    """Stream this session's events into a new file in ``directory``; return its path."""
+    global _out, _chrome
+    if fmt not in ("chrome", "jsonl"):
+        raise ValueError(f"unknown trace format {fmt!r} (chrome or jsonl)")
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"{stamp}-{_pid}" + (".trace.json" if fmt == "chrome" else ".jsonl"))
+    f = open(path, "w", encoding="utf-8", buffering=1 << 16)
+    if fmt == "chrome":
+        f.write("[\n")          # the array format: a missing "]" is tolerated after a crash
+    with _lock:
+        _out, _chrome = f, fmt == "chrome"
+        _threads.clear()
+    return path
+
+
+def stop():
+    """Finish and close the trace file, if one is open."""
+    global _out
+    with _lock:
+        f, _out = _out, None
+    if f is not None:
+        if _chrome:                 # a last event without the trailing comma
+            f.write(json.dumps({"name": "end", "ph": "i", "s": "g", "pid": _pid, "tid": 0,
+                                "ts": (time.perf_counter_ns() - _t0) / 1000}) + "]\n")
+        f.close()
@@ -0,0 +1,275 @@
+"""Map compiler: parse a YAML board once, load a binary artifact afterwards.
+
+``build_graph_from_yaml`` parses YAML, builds the graph node by node and may
+run a layout.  That is far too slow to redo every time a ``GameScene`` is
+created, so each ``*.yml`` map is compiled into a compact ``.qmap`` artifact
+stored next to it.  The artifact holds node ids, tile types, positions, the
+base edge array and the four precomputed topology variants produced by the
+gate minigame measurement.  It is invalidated by the SHA-256 of the YAML
+content and memory-mapped when loaded.
+
+Layout of a ``.qmap`` file (little endian)::
+
+    header   magic, format version, yaml sha256, node/edge counts
+    ids      int32[n + 1] utf-8 offsets, then the utf-8 blob
+    types    int8[n]
+    pos      float64[n, 2]
+    edges    int32[e, 2]                  base (outcome "00") topology
+    variant  int32 count + int32[k, 2]    for "01", "10" and "11"
+    attrs    utf-8 JSON of the extra node attributes (usually ``{}``)
+
+Every section starts on an 8-byte boundary so the arrays can be viewed
+in place with ``numpy.frombuffer``.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Sequence, Tuple
+
+import networkx as nx
+import numpy as np
+
+from super_quantum_party.maps.new_map import build_graph_from_yaml
+
+MAGIC = b"SQPMAP\x00\x00"
+FORMAT_VERSION = 1
+ARTIFACT_SUFFIX = ".qmap"
+
+# Measurement outcomes of the gate minigame, in artifact order.
+OUTCOMES = ("00", "01", "10", "11")
+
+_HEADER = struct.Struct("<8sI32sII")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def yaml_digest(yaml_path: str) -> bytes:
+    """Return the SHA-256 digest of the raw YAML file content."""
+    with open(yaml_path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def artifact_path_for(yaml_path: str) -> str:
+    """Return the path of the compiled artifact stored next to ``yaml_path``."""
+    return os.path.splitext(yaml_path)[0] + ARTIFACT_SUFFIX
+
+
+def topology_variants(g: nx.DiGraph) -> Dict[str, List[Tuple[str, str]]]:
+    """Return the edge list of the board for every measurement outcome.
+
+    ``00`` keeps the base edges, ``11`` reverses every edge and ``01``/``10``
+    close the first/second (sorted) outgoing path of every type-3
+    intersection that has at least two successors.
+    """
+    base = list(g.edges())
+    variants = {"00": base, "11": [(v, u) for u, v in base]}
+    for result in ("01", "10"):
+        restrict_first = result == "01"
+        closed = set()
+        for n, data in g.nodes(data=True):
+            if data.get("type") == 3:
+                succ = sorted(g.successors(n))
+                if len(succ) >= 2:
+                    closed.add((n, succ[0] if restrict_first else succ[1]))
+        variants[result] = [e for e in base if e not in closed]
+    return variants
+
+
+class CompiledMap:
+    """Read-only, array based view of a board.
+
+    Node ``i`` has id ``ids[i]``, tile type ``types[i]`` and position
+    ``pos[i]``.  ``variants[outcome]`` is an ``int32[k, 2]`` array of
+    ``(source, target)`` node indices.
+    """
+
+    def __init__(self, name: str, digest: bytes, ids: Sequence[str],
+                 types: np.ndarray, pos: np.ndarray,
+                 variants: Dict[str, np.ndarray], attrs: Dict[str, dict],
+                 buffer=None):
+        self.name = name
+        self.digest = digest
+        self.ids: List[str] = list(ids)
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.ids)}
+        self.types = types
+        self.pos = pos
+        self.variants = variants
+        self.attrs = attrs
+        self._buffer = buffer          # keeps the memory map alive
+
+    @property
+    def edges(self) -> np.ndarray:
+        return self.variants["00"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def edge_list(self, outcome: str = "00") -> List[Tuple[str, str]]:
+        """Return the edges of ``outcome`` as ``(id, id)`` tuples."""
+        ids = self.ids
+        return [(ids[u], ids[v]) for u, v in self.variants[outcome].tolist()]
+
+    def topologies(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Return the edge lists of every measurement outcome."""
+        return {o: self.edge_list(o) for o in OUTCOMES}
+
+    def to_graph(self) -> nx.DiGraph:
+        """Rebuild the attributed graph ``build_graph_from_yaml`` returns."""
+        g = nx.DiGraph()
+        types = self.types.tolist()
+        pos = self.pos.tolist()
+        for i, n in enumerate(self.ids):
+            attrs = dict(self.attrs.get(n, {}))
+            attrs["type"] = types[i]
+            attrs["pos"] = tuple(pos[i])
+            g.add_node(n, **attrs)
+        g.add_edges_from(self.edge_list("00"))
+        return g
+
+    def close(self):
+        """Release the underlying memory map, if any."""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+
+
+# ── compile ────────────────────────────────────────────────────────────
+def compile_graph(g: nx.DiGraph, name: str = "", digest: bytes = b"\x00" * 32) -> CompiledMap:
+    """Convert an attributed board graph into a :class:`CompiledMap`."""
+    ids = list(g.nodes)
+    index = {n: i for i, n in enumerate(ids)}
+    types = np.array([g.nodes[n].get("type", 1) for n in ids], dtype=np.int8)
+    pos = np.array([g.nodes[n].get("pos", (0, 0)) for n in ids],
+                   dtype=np.float64).reshape(len(ids), 2)
+    attrs = {}
+    for n in ids:
+        extra = {k: v for k, v in g.nodes[n].items() if k not in ("type", "pos")}
+        if extra:
+            attrs[n] = extra
+    variants = {
+        o: np.array([(index[u], index[v]) for u, v in edges],
+                    dtype=np.int32).reshape(len(edges), 2)
+        for o, edges in topology_variants(g).items()
+    }
+    return CompiledMap(name, digest, ids, types, pos, variants, attrs)
+
+
+def compile_yaml(yaml_path: str) -> CompiledMap:
+    """Parse ``yaml_path`` and compile it in memory (no artifact written)."""
+    name = os.path.splitext(os.path.basename(yaml_path))[0]
+    g = build_graph_from_yaml(yaml_path)
+    return compile_graph(g, name, yaml_digest(yaml_path))
+
+
+def dumps(cmap: CompiledMap) -> bytes:
+    """Serialise ``cmap`` to the ``.qmap`` binary format."""
+    n, e = len(cmap.ids), len(cmap.edges)
+    blob = b"".join(i.encode("utf-8") for i in cmap.ids)
+    offsets = np.zeros(n + 1, dtype="<i4")
+    np.cumsum([len(i.encode("utf-8")) for i in cmap.ids], out=offsets[1:])
+
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, cmap.digest, n, e)]
+    size = _HEADER.size
+
+    def put(data: bytes):
+        nonlocal size
+        pad = _align(size) - size
+        parts.append(b"\x00" * pad + data)
+        size += pad + len(data)
+
+    put(offsets.tobytes() + blob)
+    put(np.ascontiguousarray(cmap.types, dtype="<i1").tobytes())
+    put(np.ascontiguousarray(cmap.pos, dtype="<f8").tobytes())
+    put(np.ascontiguousarray(cmap.edges, dtype="<i4").tobytes())
+    for o in OUTCOMES[1:]:
+        arr = np.ascontiguousarray(cmap.variants[o], dtype="<i4")
+        put(struct.pack("<I", len(arr)) + b"\x00" * 4 + arr.tobytes())
+    put(json.dumps(cmap.attrs, separators=(",", ":")).encode("utf-8"))
+    return b"".join(parts)
+
+
+def write_artifact(cmap: CompiledMap, path: str):
+    """Atomically write ``cmap`` to ``path``."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(cmap))
+    os.replace(tmp, path)
+
+
+# ── load ───────────────────────────────────────────────────────────────
+def read_digest(path: str) -> bytes | None:
+    """Return the YAML digest recorded in an artifact, or ``None`` if stale."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(head) < _HEADER.size:
+        return None
+    magic, version, digest, _, _ = _HEADER.unpack(head)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return digest
+
+
+def loads(buf, name: str = "") -> CompiledMap:
+    """Build a :class:`CompiledMap` viewing ``buf`` (bytes or mmap) in place."""
+    magic, version, digest, n, e = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a compiled map (or outdated format)")
+    off = _align(_HEADER.size)
+
+    offsets = np.frombuffer(buf, dtype="<i4", count=n + 1, offset=off).tolist()
+    start = off + (n + 1) * 4
+    raw = bytes(buf[start:start + offsets[-1]])
+    ids = [raw[a:b].decode("utf-8") for a, b in zip(offsets, offsets[1:])]
+    off = _align(start + offsets[-1])
+
+    types = np.frombuffer(buf, dtype="<i1", count=n, offset=off)
+    off = _align(off + n)
+    pos = np.frombuffer(buf, dtype="<f8", count=2 * n, offset=off).reshape(n, 2)
+    off = _align(off + 16 * n)
+    variants = {"00": np.frombuffer(buf, dtype="<i4", count=2 * e, offset=off).reshape(e, 2)}
+    off = _align(off + 8 * e)
+    for o in OUTCOMES[1:]:
+        (k,) = struct.unpack_from("<I", buf, off)
+        variants[o] = np.frombuffer(buf, dtype="<i4", count=2 * k, offset=off + 8).reshape(k, 2)
+        off = _align(off + 8 + 8 * k)
+    attrs = json.loads(bytes(buf[off:]).decode("utf-8"))
+    return CompiledMap(name, digest, ids, types, pos, variants, attrs,
+                       buffer=buf if isinstance(buf, mmap.mmap) else None)
+
+
+def load_artifact(path: str, name: str = "") -> CompiledMap:
+    """Memory-map the artifact at ``path``."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads(mm, name)
+
+
+def load_or_compile(yaml_path: str) -> CompiledMap:
+    """Return the compiled map for ``yaml_path``, recompiling when stale.
+
+    The artifact is rebuilt whenever the YAML content hash changes.  When it
+    cannot be written (read-only install) the map is compiled in memory.
+    """
+    name = os.path.splitext(os.path.basename(yaml_path))[0]
+    path = artifact_path_for(yaml_path)
+    digest = yaml_digest(yaml_path)
+    if read_digest(path) == digest:
+        try:
+            return load_artifact(path, name)
+        except (OSError, ValueError):
+            pass
+    cmap = compile_yaml(yaml_path)
+    try:
+        write_artifact(cmap, path)
+    except OSError:
+        return cmap
+    return load_artifact(path, name)
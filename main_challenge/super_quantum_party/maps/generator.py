@@ -0,0 +1,164 @@
+"""Procedural board generator for scale and balance testing.
+
+Produces boards in the YAML schema ``build_graph_from_yaml`` reads: a main
+loop starting at the red start tile ``'0'``, detour/shortcut branches that
+fork at type-3 intersections and rejoin the loop further ahead, stars on
+blue tiles and a configurable blue/red ratio for the remaining tiles.
+The same ``seed`` and arguments always give the same board.
+
+    $ python -m super_quantum_party.maps.generator --size 5000 --seed 7 -o big.yml
+
+Every generated board is valid under all four measurement topologies: the
+graph is strongly connected, and when an intersection path is closed or the
+board is reversed every tile still has a way back to the start.
+"""
+
+from __future__ import annotations
+import argparse
+import random
+from typing import Dict, List, Mapping, Tuple
+
+import networkx as nx
+
+from super_quantum_party.maps import layout
+
+# Default share of ordinary tiles: 1 = blue (gate reward), 2 = red.
+DEFAULT_RATIOS = {1: 0.8, 2: 0.2}
+MIN_SIZE = 8
+
+
+def generate_board(size: int, seed: int = 0, *, branch_fraction: float = 0.3,
+                   branch_length: Tuple[int, int] = (3, 8),
+                   ratios: Mapping[int, float] | None = None, stars: int = 1,
+                   layout_iterations: int = 40) -> dict:
+    """Return a ``{"nodes", "edges", "pos"}`` board with ``size`` tiles.
+
+    ``branch_fraction`` of the tiles sit on branches whose length is drawn
+    from ``branch_length``.  ``ratios`` weights the types of ordinary tiles.
+    ``layout_iterations=0`` skips the layout and omits ``pos``.
+    """
+    if size < MIN_SIZE:
+        raise ValueError(f"boards need at least {MIN_SIZE} tiles")
+    rng = random.Random(seed)
+    ratios = dict(ratios or DEFAULT_RATIOS)
+    lo, hi = branch_length
+
+    loop_len = max(MIN_SIZE, size - int(size * branch_fraction))
+    remaining = size - loop_len
+    edges: List[Tuple[int, int]] = [(i, (i + 1) % loop_len) for i in range(loop_len)]
+    types: Dict[int, int] = {}
+
+    # branch lengths first, then spread their forks evenly around the loop
+    lengths = []
+    while remaining >= 1:
+        length = min(rng.randint(lo, hi), remaining)
+        lengths.append(length)
+        remaining -= length
+    n_forks = min(len(lengths), loop_len // 2 - 1)
+    lengths, leftover = lengths[:n_forks], sum(lengths[n_forks:])
+    if leftover and lengths:
+        lengths[-1] += leftover
+    gap = loop_len / max(n_forks, 1)
+
+    next_id = loop_len
+    for k, length in enumerate(lengths):
+        # one fork per stretch of ``gap`` loop tiles, so forks never collide
+        fork = 1 + int(k * gap + rng.random() * (gap - 1))
+        # rejoin further ahead but never past the start tile
+        span = rng.randint(2, max(2, min(2 * length, loop_len - 2)))
+        join = min(fork + span, loop_len) % loop_len
+        chain = list(range(next_id, next_id + length))
+        next_id += length
+        edges.append((fork, chain[0]))
+        edges.extend(zip(chain, chain[1:]))
+        edges.append((chain[-1], join))
+        types[fork] = 3
+
+    n = next_id
+    types[0] = 2
+    kinds, weights = zip(*sorted(ratios.items()))
+    for i in range(n):
+        if i not in types:
+            types[i] = rng.choices(kinds, weights)[0]
+
+    blue = [i for i in range(n) if types[i] == 1 and i != 0]
+    step = max(1, len(blue) // max(stars, 1))
+    for i in blue[rng.randrange(step)::step][:stars]:
+        types[i] = 4
+
+    board = {
+        "nodes": {str(i): {"type": types[i]} for i in range(n)},
+        "edges": [[str(u), str(v)] for u, v in edges],
+    }
+    if layout_iterations > 0:
+        pos = layout.layout(n, edges, seed=seed, iterations=layout_iterations, mode="board")
+        pos -= pos.min(axis=0)
+        board["pos"] = {str(i): (int(round(x)), int(round(y)))
+                        for i, (x, y) in enumerate(pos.tolist())}
+    return board
+
+
+def validate_board(board: dict) -> List[str]:
+    """Return a list of problems with ``board`` (empty when it is playable)."""
+    from super_quantum_party.maps.compiler import topology_variants
+
+    g = nx.DiGraph()
+    for n, attrs in board["nodes"].items():
+        g.add_node(n, **(attrs or {}))
+    g.add_edges_from(tuple(e) for e in board["edges"])
+    start = next(iter(board["nodes"]))
+    problems = []
+    if set(g.nodes) != set(board["nodes"]):
+        problems.append("edges reference unknown nodes")
+    if not any(d.get("type") == 4 for _, d in g.nodes(data=True)):
+        problems.append("no star tile")
+    for outcome, edges in topology_variants(g).items():
+        h = nx.DiGraph(edges)
+        h.add_nodes_from(g.nodes)
+        dead = [n for n in h if h.out_degree(n) == 0]
+        if dead:
+            problems.append(f"{outcome}: {len(dead)} dead-end tiles")
+        elif outcome in ("00", "11") and not nx.is_strongly_connected(h):
+            problems.append(f"{outcome}: board is not strongly connected")
+        elif len(nx.ancestors(h, start)) + 1 < len(h):
+            # closed paths may cut a branch off, but nobody may get trapped
+            problems.append(f"{outcome}: some tiles cannot get back to the start")
+    return problems
+
+
+def write_yaml(board: dict, path: str):
+    """Write ``board`` in the same layout as the hand-made map files.
+
+    ``yaml.safe_dump`` takes minutes on 100k-tile boards; this writer is a
+    plain formatter of the fixed schema.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("nodes:\n")
+        f.writelines(f"  '{n}': {{ type: {a['type']} }}\n" for n, a in board["nodes"].items())
+        f.write("\nedges:\n")
+        f.writelines(f"  - ['{u}', '{v}']\n" for u, v in board["edges"])
+        if "pos" in board:
+            f.write("\npos:\n")
+            f.writelines(f"  '{n}': [{x}, {y}]\n" for n, (x, y) in board["pos"].items())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a random board YAML.")
+    parser.add_argument("--size", type=int, default=60, help="number of tiles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--branch-fraction", type=float, default=0.3)
+    parser.add_argument("--stars", type=int, default=1)
+    parser.add_argument("--red", type=float, default=DEFAULT_RATIOS[2],
+                        help="share of red tiles among ordinary tiles")
+    parser.add_argument("--layout-iterations", type=int, default=40,
+                        help="0 leaves positions to the map loader")
+    parser.add_argument("-o", "--output", required=True, help="YAML file to write")
+    args = parser.parse_args()
+    board = generate_board(args.size, args.seed, branch_fraction=args.branch_fraction,
+                           ratios={1: 1 - args.red, 2: args.red}, stars=args.stars,
+                           layout_iterations=args.layout_iterations)
+    problems = validate_board(board)
+    if problems:
+        raise SystemExit("generated board is invalid: " + "; ".join(problems))
+    write_yaml(board, args.output)
+    print(f"{len(board['nodes'])} tiles, {len(board['edges'])} edges written to {args.output}")
@@ -0,0 +1,176 @@
+"""Live map hot-reload: patch YAML edits into a running ``GameScene``.
+
+Enable it with ``SQP_WATCH_MAPS=1``.  While a game is running the map's YAML
+file is polled; when its content changes the new board is diffed against
+the live ``GameScene.g`` and only the differences are applied.  Players keep
+their tile (unless it was deleted), their stars and their gates, and the
+star stays where the game moved it.
+
+Tile type 4 (star) is treated as game state rather than map data: a node
+that is a star in the live game but plain blue in the YAML, or the other way
+round, is not considered changed.
+"""
+
+from __future__ import annotations
+import os
+import random
+from typing import Dict, Iterable, List, Set, Tuple
+
+import networkx as nx
+
+Edge = Tuple[str, str]
+
+
+def _static_type(t):
+    """Tile type with the star folded into the blue tile it sits on."""
+    return 1 if t == 4 else t
+
+
+class MapDiff:
+    """Node, edge and position differences between two versions of a board."""
+
+    def __init__(self):
+        self.added_nodes: Dict[str, dict] = {}
+        self.removed_nodes: List[str] = []
+        self.changed_nodes: Dict[str, dict] = {}    # node -> changed attributes
+        self.added_edges: List[Edge] = []
+        self.removed_edges: List[Edge] = []
+
+    def __bool__(self):
+        return bool(self.added_nodes or self.removed_nodes or self.changed_nodes
+                    or self.added_edges or self.removed_edges)
+
+    def __repr__(self):
+        return (f"MapDiff(+{len(self.added_nodes)}/-{len(self.removed_nodes)} nodes, "
+                f"~{len(self.changed_nodes)} changed, "
+                f"+{len(self.added_edges)}/-{len(self.removed_edges)} edges)")
+
+    @property
+    def affected(self) -> Set[str]:
+        """Nodes whose attributes or outgoing edges changed."""
+        nodes = set(self.added_nodes) | set(self.removed_nodes) | set(self.changed_nodes)
+        nodes.update(u for u, _ in self.added_edges)
+        nodes.update(u for u, _ in self.removed_edges)
+        return nodes
+
+
+def diff_graph(live: nx.DiGraph, base_edges: Iterable[Edge], new: nx.DiGraph) -> MapDiff:
+    """Diff the freshly loaded ``new`` board against the ``live`` one.
+
+    Edges are compared with ``base_edges`` (the un-measured topology) since
+    the live graph may currently show a measurement variant.
+    """
+    diff = MapDiff()
+    for n, attrs in new.nodes(data=True):
+        if n not in live:
+            diff.added_nodes[n] = dict(attrs)
+            continue
+        old = live.nodes[n]
+        changed = {k: v for k, v in attrs.items() if k != "type" and old.get(k) != v}
+        if _static_type(old.get("type")) != _static_type(attrs.get("type")):
+            changed["type"] = attrs.get("type")
+        if changed:
+            diff.changed_nodes[n] = changed
+    diff.removed_nodes = [n for n in live if n not in new]
+
+    old_edges = list(base_edges)
+    old_set, new_set = set(old_edges), set(new.edges())
+    diff.added_edges = [e for e in new.edges() if e not in old_set]
+    diff.removed_edges = [e for e in old_edges if e not in new_set]
+    return diff
+
+
+def refresh_topologies(g: nx.DiGraph, old_base: List[Edge], new_base: List[Edge],
+                       topologies: Dict[str, List[Edge]], affected: Set[str]) -> Dict[str, List[Edge]]:
+    """Recompute the measurement variants, re-deriving only ``affected`` nodes.
+
+    ``01``/``10`` close one outgoing path per intersection.  Closures of
+    untouched intersections are carried over from the previous variants;
+    only intersections in ``affected`` are evaluated again.
+    """
+    new_set = set(new_base)
+    result = {"00": list(new_base), "11": [(v, u) for u, v in new_base]}
+    succ: Dict[str, List[str]] = {n: [] for n in affected}
+    for u, v in new_base:
+        if u in succ:
+            succ[u].append(v)
+    for outcome, index in (("01", 0), ("10", 1)):
+        kept = set(topologies.get(outcome, old_base))
+        closed = {e for e in old_base if e not in kept and e[0] not in affected and e in new_set}
+        for n, options in succ.items():
+            if len(options) >= 2 and n in g and g.nodes[n].get("type") == 3:
+                closed.add((n, sorted(options)[index]))
+        result[outcome] = [e for e in new_base if e not in closed]
+    return result
+
+
+def apply_diff(scene, diff: MapDiff, rng=random):
+    """Patch ``diff`` into a live ``GameScene`` graph in place.
+
+    The scene then hands the patched board to its rules engine.
+    """
+    g: nx.DiGraph = scene.g
+    old_base = list(scene._base_edges)
+
+    lost_star = any(g.nodes[n].get("type") == 4 for n in diff.removed_nodes) or any(
+        "type" in attrs and g.nodes[n].get("type") == 4 for n, attrs in diff.changed_nodes.items())
+    for n, attrs in diff.added_nodes.items():
+        g.add_node(n, **attrs)
+    for n, attrs in diff.changed_nodes.items():
+        g.nodes[n].update(attrs)
+    g.remove_nodes_from(diff.removed_nodes)
+
+    removed = set(diff.removed_edges)
+    new_base = [e for e in old_base if e not in removed and e[0] in g and e[1] in g]
+    new_base += diff.added_edges
+    scene._base_edges = new_base
+    scene._topologies = refresh_topologies(g, old_base, new_base, scene._topologies, diff.affected)
+    g.remove_edges_from(list(g.edges()))
+    g.add_edges_from(scene._topologies[scene.topology])
+
+    if scene.start_node not in g:
+        scene.start_node = next(iter(g.nodes))
+    for p in scene.players:
+        if p.position not in g:
+            p.position = scene.start_node
+    if lost_star:
+        candidates = [n for n, d in g.nodes(data=True) if d.get("type") == 1]
+        if candidates:
+            g.nodes[rng.choice(candidates)]["type"] = 4
+
+
+class MapWatcher:
+    """Polls a registry map's YAML file and reports new versions of the board."""
+
+    def __init__(self, map_entry, interval: float = 0.5):
+        self.entry = map_entry
+        self.interval = interval
+        self._timer = 0.0
+        self._stamp = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.entry.yaml_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self, dt: float) -> nx.DiGraph | None:
+        """Return the reloaded board if the YAML changed, otherwise ``None``.
+
+        A YAML file that is half-written or invalid is reported and skipped;
+        the live board is left untouched until the next good save.
+        """
+        self._timer += dt
+        if self._timer < self.interval:
+            return None
+        self._timer = 0.0
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            return self.entry.build_graph()
+        except Exception as e:     # yaml.YAMLError, KeyError, ValueError...
+            print(f">>> map reload failed: {e}")
+            return None
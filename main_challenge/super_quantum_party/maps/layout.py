@@ -0,0 +1,297 @@
+"""Force-directed layout for board graphs that scales to thousands of tiles.
+
+``nx.spring_layout`` evaluates every pair of nodes on each iteration, which
+is hopeless for large generated maps.  This engine is a Fruchterman-Reingold
+variant whose repulsion is computed only between nodes sharing or touching a
+cell of a uniform grid (cell size = cut-off radius), so one iteration costs
+roughly O(n + e).  Results are deterministic for a given ``seed``.
+
+Two modes are available:
+
+``"force"``  plain force-directed layout from a seeded random start.
+``"board"``  finds the directed main loop of the board, lays it out as a
+             ring in travel order (clockwise) and keeps it softly anchored
+             there while branches settle around it.
+
+Positions are returned in YAML ``pos`` units (before ``_POS_SCALE``) and can
+be written back with :func:`write_positions` so the layout is computed once::
+
+    $ python -m super_quantum_party.maps.layout super_quantum_party/maps/my_map.yml
+"""
+
+from __future__ import annotations
+import argparse
+import math
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+# Typical distance between neighbouring tiles in YAML units; matches the
+# spacing of the hand-made maps.
+DEFAULT_SPACING = 50.0
+DEFAULT_ITERATIONS = 60
+# Spring constant pulling main-loop tiles back onto their ring in board mode.
+_ANCHOR = 0.5
+
+
+def main_loop(n: int, edges: np.ndarray, start: int = 0) -> List[int]:
+    """Return a directed cycle of the board, in travel order.
+
+    Follows the first successor of every node from ``start`` until a node
+    repeats; the repeated stretch is the loop players keep running around.
+    Returns an empty list if the walk reaches a dead end.
+    """
+    succ = [-1] * n
+    for u, v in edges.tolist():
+        if succ[u] < 0:
+            succ[u] = v
+    seen: Dict[int, int] = {}
+    path = []
+    node = start
+    while node >= 0 and node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = succ[node]
+    return path[seen[node]:] if node >= 0 else []
+
+
+def _neighbour_pairs(pos: np.ndarray, cell: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return index arrays ``(i, j)`` of all pairs in the same/adjacent cells."""
+    cells = np.floor(pos / cell).astype(np.int64)
+    cells -= cells.min(axis=0)
+    width = int(cells[:, 1].max()) + 3
+    key = (cells[:, 0] + 1) * width + (cells[:, 1] + 1)
+    order = np.argsort(key, kind="stable")
+    uniq, start, count = np.unique(key[order], return_index=True, return_counts=True)
+
+    ii, jj = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            nkey = key + dx * width + dy
+            slot = np.searchsorted(uniq, nkey)
+            slot[slot >= len(uniq)] = 0
+            hit = np.nonzero(uniq[slot] == nkey)[0]
+            cnt = count[slot[hit]]
+            first = start[slot[hit]]
+            rep_i = np.repeat(hit, cnt)
+            within = np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            rep_j = order[np.repeat(first, cnt) + within]
+            keep = rep_i < rep_j
+            ii.append(rep_i[keep])
+            jj.append(rep_j[keep])
+    return np.concatenate(ii), np.concatenate(jj)
+
+
+def _scatter_add(disp: np.ndarray, idx: np.ndarray, force: np.ndarray, sign: float):
+    """``disp[idx] += sign * force`` with repeated indices (faster than add.at)."""
+    n = len(disp)
+    disp[:, 0] += sign * np.bincount(idx, force[:, 0], n)
+    disp[:, 1] += sign * np.bincount(idx, force[:, 1], n)
+
+
+def _seed_from_neighbours(pos: np.ndarray, placed: np.ndarray, n: int,
+                          edges: np.ndarray, rng: np.random.Generator, k: float):
+    """Place unplaced nodes next to already placed neighbours (BFS order)."""
+    adj: List[List[int]] = [[] for _ in range(n)]
+    for u, v in edges.tolist():
+        adj[u].append(v)
+        adj[v].append(u)
+    frontier = [i for i in range(n) if placed[i]]
+    while frontier:
+        nxt = []
+        for u in frontier:
+            for v in adj[u]:
+                if not placed[v]:
+                    pos[v] = pos[u] + rng.normal(0.0, k, 2)
+                    placed[v] = True
+                    nxt.append(v)
+        frontier = nxt
+    # disconnected leftovers: scatter them inside the current bounding box
+    rest = np.nonzero(~placed)[0]
+    if len(rest):
+        lo = pos[placed].min(axis=0) if placed.any() else np.zeros(2)
+        hi = pos[placed].max(axis=0) if placed.any() else np.full(2, k * math.sqrt(n))
+        pos[rest] = lo + rng.random((len(rest), 2)) * np.maximum(hi - lo, k)
+
+
+def layout(n: int, edges: Iterable[Tuple[int, int]], *, seed: int = 0,
+           iterations: int = DEFAULT_ITERATIONS, mode: str = "board",
+           spacing: float = DEFAULT_SPACING,
+           fixed: Mapping[int, Tuple[float, float]] | None = None,
+           start: int = 0) -> np.ndarray:
+    """Compute ``float64[n, 2]`` positions for a board graph.
+
+    ``edges`` are ``(source, target)`` node indices.  Nodes listed in
+    ``fixed`` keep the given position.  ``iterations`` is the budget of
+    force steps; the step size cools linearly to zero over that budget.
+    """
+    if mode not in ("board", "force"):
+        raise ValueError(f"unknown layout mode {mode!r}")
+    edges = np.asarray(list(edges) if not isinstance(edges, np.ndarray) else edges,
+                       dtype=np.int64).reshape(-1, 2)
+    rng = np.random.default_rng(seed)
+    k = float(spacing)
+    pos = np.zeros((n, 2))
+    placed = np.zeros(n, dtype=bool)
+    pinned = np.zeros(n, dtype=bool)
+    for i, p in (fixed or {}).items():
+        pos[i] = p
+        placed[i] = pinned[i] = True
+
+    anchor_idx = np.zeros(0, dtype=np.int64)
+    anchor_pos = np.zeros((0, 2))
+    if mode == "board" and n:
+        loop = [i for i in main_loop(n, edges, start) if not pinned[i]]
+        if len(loop) >= 3:
+            radius = k * len(loop) / (2 * math.pi)
+            centre = pos[pinned].mean(axis=0) if pinned.any() else np.full(2, radius + k)
+            angle = -np.arange(len(loop)) * 2 * math.pi / len(loop)   # clockwise
+            anchor_idx = np.array(loop, dtype=np.int64)
+            anchor_pos = centre + radius * np.column_stack((np.cos(angle), np.sin(angle)))
+            pos[anchor_idx] = anchor_pos
+            placed[anchor_idx] = True
+    if not placed.any() and n:
+        pos[:] = rng.random((n, 2)) * k * math.sqrt(n)
+        placed[:] = True
+    _seed_from_neighbours(pos, placed, n, edges, rng, k)
+
+    movable = ~pinned
+    if n < 2 or not movable.any():
+        return pos
+    src, dst = edges[:, 0], edges[:, 1]
+    cutoff = 2.0 * k
+    temperature = k
+    for it in range(iterations):
+        disp = np.zeros_like(pos)
+
+        # repulsion k^2/d between nodes closer than the grid cut-off
+        i, j = _neighbour_pairs(pos, cutoff)
+        delta = pos[i] - pos[j]
+        dist2 = np.einsum("ij,ij->i", delta, delta)
+        near = dist2 < cutoff * cutoff
+        i, j, delta, dist2 = i[near], j[near], delta[near], dist2[near]
+        coincident = dist2 < 1e-9
+        if coincident.any():
+            delta[coincident] = rng.normal(0.0, 1e-3 * k, (int(coincident.sum()), 2))
+            dist2[coincident] = np.einsum("ij,ij->i", delta[coincident], delta[coincident])
+        force = (k * k / dist2)[:, None] * delta
+        _scatter_add(disp, i, force, 1.0)
+        _scatter_add(disp, j, force, -1.0)
+
+        # attraction d^2/k along edges (direction ignored)
+        if len(edges):
+            delta = pos[src] - pos[dst]
+            dist = np.sqrt(np.einsum("ij,ij->i", delta, delta)) + 1e-9
+            force = (dist / k)[:, None] * delta
+            _scatter_add(disp, src, force, -1.0)
+            _scatter_add(disp, dst, force, 1.0)
+
+        # keep the main loop close to its ring
+        if len(anchor_idx):
+            disp[anchor_idx] += (anchor_pos - pos[anchor_idx]) * _ANCHOR
+
+        length = np.sqrt(np.einsum("ij,ij->i", disp, disp)) + 1e-9
+        step = (np.minimum(length, temperature) / length)[:, None] * disp
+        pos[movable] += step[movable]
+        temperature = k * (1.0 - (it + 1) / iterations)
+    return pos
+
+
+def layout_ids(ids: Sequence[str], edges: Iterable[Tuple[str, str]],
+               fixed: Mapping[str, Tuple[float, float]] | None = None,
+               **kwargs) -> Dict[str, Tuple[int, int]]:
+    """Same as :func:`layout` but keyed by node id.
+
+    Computed positions are rounded to integers; ``fixed`` ones are returned
+    unchanged.
+    """
+    index = {n: i for i, n in enumerate(ids)}
+    idx_edges = [(index[u], index[v]) for u, v in edges]
+    idx_fixed = {index[n]: p for n, p in (fixed or {}).items() if n in index}
+    pos = layout(len(ids), idx_edges, fixed=idx_fixed, **kwargs)
+    if len(ids) and not idx_fixed:
+        pos -= pos.min(axis=0)
+    fixed = fixed or {}
+    return {n: tuple(fixed[n]) if n in fixed else (int(round(x)), int(round(y)))
+            for n, (x, y) in zip(ids, pos.tolist())}
+
+
+# ── persistence ───────────────────────────────────────────────────────
+def _yaml_key(n) -> str:
+    """Quote string ids so ``'12'`` does not come back as the integer 12."""
+    if isinstance(n, int):
+        return str(n)
+    return "'" + str(n).replace("'", "''") + "'"
+
+
+def _format_pos(positions: Mapping[str, Tuple[int, int]]) -> List[str]:
+    return ["pos:\n"] + [f"  {_yaml_key(n)}: [{x}, {y}]\n" for n, (x, y) in positions.items()]
+
+
+def write_positions(yaml_path: str, positions: Mapping[str, Tuple[int, int]]):
+    """Write ``positions`` into the ``pos`` section of ``yaml_path``.
+
+    Only the ``pos`` section is rewritten (or appended if absent), so the
+    hand-written ``nodes`` and ``edges`` sections keep their formatting.  The
+    file is replaced in one step: readers see the old or the new map, never
+    a half-written one.
+    """
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    top_level = re.compile(r"^[^\s#][^:]*:")
+    start = next((i for i, l in enumerate(lines) if l.startswith("pos:")), None)
+    if start is None:
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        lines += ["\n"] + _format_pos(positions)
+    else:
+        end = next((i for i in range(start + 1, len(lines)) if top_level.match(lines[i])),
+                   len(lines))
+        lines[start:end] = _format_pos(positions) + (["\n"] if end < len(lines) else [])
+    tmp = f"{yaml_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, yaml_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def layout_yaml(yaml_path: str, *, overwrite: bool = False, persist: bool = False,
+                **kwargs) -> Dict[str, Tuple[int, int]]:
+    """Lay out the nodes of ``yaml_path`` missing from its ``pos`` section.
+
+    Existing positions are kept fixed unless ``overwrite`` is set.  With
+    ``persist`` the complete ``pos`` section is written back to the file.
+    """
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    ids = list((data.get("nodes") or {}).keys())
+    edges = [tuple(e) for e in data.get("edges") or []]
+    fixed = {} if overwrite else {n: tuple(p) for n, p in (data.get("pos") or {}).items()}
+    if all(n in fixed for n in ids):
+        return {n: fixed[n] for n in ids}
+    positions = layout_ids(ids, edges, fixed=fixed, **kwargs)
+    if persist:
+        write_positions(yaml_path, positions)
+    return positions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute and store board positions.")
+    parser.add_argument("yaml", help="map YAML file to lay out")
+    parser.add_argument("--mode", choices=("board", "force"), default="board")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spacing", type=float, default=DEFAULT_SPACING)
+    parser.add_argument("--overwrite", action="store_true",
+                        help="discard existing positions instead of keeping them fixed")
+    args = parser.parse_args()
+    pos = layout_yaml(args.yaml, overwrite=args.overwrite, persist=True, mode=args.mode,
+                      iterations=args.iterations, seed=args.seed, spacing=args.spacing)
+    print(f"{len(pos)} positions written to {args.yaml}")
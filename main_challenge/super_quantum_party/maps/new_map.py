@@ -12,19 +12,25 @@ from typing import Iterable, Mapping, Tuple
 import networkx as nx
 import yaml
 
-_DEF_LAYOUT_SCALE = 500
+from super_quantum_party.maps.layout import layout_ids, write_positions
+
 # Factor applied to all node positions loaded from YAML to allow easy
 # adjustment of spacing without modifying the YAML file itself.
 _POS_SCALE = 1.5
+# libyaml's C loader is an order of magnitude faster on generated maps.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def build_graph_from_yaml(path: str) -> nx.DiGraph:
+def build_graph_from_yaml(path: str, persist_layout: bool = False) -> nx.DiGraph:
     """Create a directed graph from a YAML description.
 
     The YAML file should contain ``nodes`` and ``edges`` sections. ``pos`` is
-    optional; if omitted, a spring layout is computed automatically.
+    optional; nodes without a position are laid out automatically by
+    ``maps.layout``.  Loading never edits the map unless ``persist_layout``
+    is set, in which case the result is written back into the ``pos``
+    section so the layout only ever runs once.
     """
     with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_Loader)
 
     nodes: Mapping[str, Mapping] = data.get("nodes", {})
     edges: Iterable[Tuple[str, str]] = data.get("edges", [])
@@ -40,19 +46,27 @@ def build_graph_from_yaml(path: str) -> nx.DiGraph:
 
     g.add_edges_from(edges)
 
-    # Compute positions if none supplied
-    if not pos:
-        layout = nx.spring_layout(g, seed=0)
-        scale = _DEF_LAYOUT_SCALE * _POS_SCALE
-        for n, (x, y) in layout.items():
-            g.nodes[n]["pos"] = (
-                int(x * scale + scale),
-                int(y * scale + scale / 2),
-            )
+    # Compute positions for the nodes that have none
+    missing = [n for n in g.nodes if "pos" not in g.nodes[n]]
+    if missing:
+        fixed = {n: tuple(pos[n]) for n in g.nodes if pos and n in pos}
+        computed = layout_ids(list(g.nodes), list(g.edges()), fixed=fixed)
+        for n in missing:
+            x, y = computed[n]
+            g.nodes[n]["pos"] = (x * _POS_SCALE, y * _POS_SCALE)
+        if persist_layout:
+            try:
+                write_positions(path, computed)
+            except OSError:
+                pass  # read-only install: lay out again next time
 
     return g
 
 def build_graph() -> nx.DiGraph:
-    """Return a fully attributed NetworkX graph ready for the GameScene."""
-    yaml_path = os.path.join(os.path.dirname(__file__), "new_map.yml")
-    return build_graph_from_yaml(yaml_path)
+    """Return a fully attributed NetworkX graph ready for the GameScene.
+
+    The graph comes from the compiled ``new_map.qmap`` artifact, which is
+    rebuilt automatically whenever ``new_map.yml`` changes.
+    """
+    from super_quantum_party.maps.registry import get_map
+    return get_map("new_map").build_graph()
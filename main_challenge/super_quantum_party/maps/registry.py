@@ -0,0 +1,105 @@
+"""Registry of every ``*.yml`` board shipped in the ``maps`` package.
+
+Each map is exposed as a :class:`MapEntry`.  Entries quack like the old
+per-map modules (``entry.build_graph()``) so scenes do not care whether
+they were handed a module or an entry, but they load the compiled
+``.qmap`` artifact instead of re-parsing YAML.  When the asset bundle
+(``core.bundle``) holds a map's artifact and the YAML is not newer, the
+map is viewed straight from the bundle and the YAML is not read at all.
+
+    >>> from super_quantum_party.maps import registry
+    >>> registry.get_map("new_map").build_graph()
+"""
+
+from __future__ import annotations
+import glob
+import os
+from typing import Dict, List, Tuple
+
+import networkx as nx
+
+from super_quantum_party.core import bundle
+from super_quantum_party.maps import compiler
+
+MAP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class MapEntry:
+    """A discovered map; compiles/loads its artifact lazily and caches it."""
+
+    def __init__(self, yaml_path: str):
+        self.yaml_path = yaml_path
+        self.name = os.path.splitext(os.path.basename(yaml_path))[0]
+        self.artifact_path = compiler.artifact_path_for(yaml_path)
+        self._compiled: compiler.CompiledMap | None = None
+        self._bundled = False
+
+    def __repr__(self):
+        return f"MapEntry({self.name!r})"
+
+    def load(self) -> compiler.CompiledMap:
+        """Return the compiled map, recompiling if the YAML has changed."""
+        buf = bundle.lookup(self.artifact_path, source=self.yaml_path)
+        if buf is not None:
+            if not self._bundled:
+                self._compiled, self._bundled = compiler.loads(buf, self.name), True
+            return self._compiled
+        if self._bundled or self._compiled is None or \
+                self._compiled.digest != compiler.yaml_digest(self.yaml_path):
+            self._compiled, self._bundled = compiler.load_or_compile(self.yaml_path), False
+        return self._compiled
+
+    def build_graph(self) -> nx.DiGraph:
+        """Return a fully attributed NetworkX graph ready for the GameScene."""
+        return self.load().to_graph()
+
+    def topologies(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Return the precomputed edge list for every measurement outcome."""
+        return self.load().topologies()
+
+
+_REGISTRY: Dict[str, MapEntry] = {}
+
+
+def discover_maps(directory: str = MAP_DIR) -> Dict[str, MapEntry]:
+    """Register and return every ``*.yml`` map found in ``directory``."""
+    found = {}
+    paths = set(glob.glob(os.path.join(directory, "*.yml")))
+    if os.path.abspath(directory) == MAP_DIR:                   # boards shipped only in the bundle
+        for name in bundle.names("maps/"):
+            if name.endswith(compiler.ARTIFACT_SUFFIX):
+                paths.add(os.path.join(MAP_DIR, os.path.basename(name)[:-len(compiler.ARTIFACT_SUFFIX)] + ".yml"))
+    for path in sorted(paths):
+        entry = _REGISTRY.get(os.path.splitext(os.path.basename(path))[0])
+        if entry is None or entry.yaml_path != path:
+            entry = MapEntry(path)
+            _REGISTRY[entry.name] = entry
+        found[entry.name] = entry
+    return found
+
+
+def get_map(name: str) -> MapEntry:
+    """Return the registered map called ``name`` (the YAML file stem)."""
+    if name not in _REGISTRY:
+        discover_maps()
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"unknown map {name!r}; available: {sorted(_REGISTRY)}") from None
+
+
+def compile_all(directory: str = MAP_DIR) -> List[str]:
+    """(Re)compile every stale map in ``directory``; return their names."""
+    rebuilt = []
+    for name, entry in discover_maps(directory).items():
+        if not os.path.isfile(entry.yaml_path):
+            continue                                            # bundled only
+        if compiler.read_digest(entry.artifact_path) != compiler.yaml_digest(entry.yaml_path):
+            entry.load()
+            rebuilt.append(name)
+    return rebuilt
+
+
+if __name__ == "__main__":
+    names = compile_all()
+    print("compiled:", ", ".join(names) if names else "(all up to date)")
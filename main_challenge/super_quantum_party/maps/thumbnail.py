@@ -0,0 +1,45 @@
+"""Menu thumbnails drawn straight from a compiled map.
+
+Used for maps that have no picture in ``settings.MAP_THUMBS``: the tiles
+are drawn as coloured dots over the base topology's edges, fitted into the
+thumbnail with a small margin.
+
+    >>> from super_quantum_party.maps import registry, thumbnail
+    >>> surf = thumbnail.render(registry.get_map("new_map").load(), (150, 150))
+"""
+
+from __future__ import annotations
+from typing import Tuple
+
+import pygame
+
+from super_quantum_party.maps.compiler import CompiledMap
+from super_quantum_party.settings import BLACK, WHITE, TYPE_COLOUR
+
+MARGIN = 0.08           # share of the thumbnail left empty around the map
+SUPERSAMPLE = 2         # drawn this many times larger, then smoothly scaled down
+
+
+def render(cmap: CompiledMap, size: Tuple[int, int]) -> pygame.Surface:
+    """Return a ``size`` surface showing ``cmap``'s tiles and base edges."""
+    w, h = size[0] * SUPERSAMPLE, size[1] * SUPERSAMPLE
+    surf = pygame.Surface((w, h))
+    surf.fill(WHITE)
+    if len(cmap) == 0:
+        return pygame.transform.smoothscale(surf, size)
+    lo = cmap.pos.min(axis=0)
+    span = cmap.pos.max(axis=0) - lo
+    scale = min((w * (1 - 2 * MARGIN)) / max(span[0], 1.0),
+                (h * (1 - 2 * MARGIN)) / max(span[1], 1.0))
+    offset = ((w - span[0] * scale) / 2, (h - span[1] * scale) / 2)
+    pts = [(offset[0] + (x - lo[0]) * scale, offset[1] + (y - lo[1]) * scale)
+           for x, y in cmap.pos.tolist()]
+
+    line = max(1, round(scale * 3))
+    for u, v in cmap.edges.tolist():
+        pygame.draw.line(surf, BLACK, pts[u], pts[v], line)
+    radius = max(2 * SUPERSAMPLE, round(scale * 20))       # GameScene's BASE_NODE_RADIUS
+    for i, t in enumerate(cmap.types.tolist()):
+        pygame.draw.circle(surf, TYPE_COLOUR.get(t, WHITE), pts[i], radius)
+        pygame.draw.circle(surf, BLACK, pts[i], radius, max(1, radius // 4))
+    return pygame.transform.smoothscale(surf, size)
@@ -1,10 +1,76 @@
+from array import array
+
+from super_quantum_party.core.engine import ALL_GATES
+
+GATE_INDEX = {g: i for i, g in enumerate(ALL_GATES)}
+
+
+class GateInventory:
+    """
+    Gate counts stored as a fixed-order ``array`` (one unsigned 16-bit slot
+    per gate of ``engine.ALL_GATES``) behind a dict-like interface: every
+    gate is always present, with a count of 0 when the player has none.
+    """
+    __slots__ = ("counts",)
+
+    def __init__(self, gates=None):
+        self.counts = array("H", bytes(2 * len(ALL_GATES)))
+        if gates:
+            for gate, n in dict(gates).items():
+                self[gate] = n
+
+    def __getitem__(self, gate):
+        return self.counts[GATE_INDEX[gate]]
+
+    def __setitem__(self, gate, n):
+        self.counts[GATE_INDEX[gate]] = n
+
+    def get(self, gate, default=0):
+        i = GATE_INDEX.get(gate)
+        return default if i is None else self.counts[i]
+
+    def setdefault(self, gate, default=0):
+        return self[gate]
+
+    def __contains__(self, gate):
+        return gate in GATE_INDEX
+
+    def __iter__(self):
+        return iter(ALL_GATES)
+
+    def __len__(self):
+        return len(ALL_GATES)
+
+    def keys(self):     return list(ALL_GATES)
+    def values(self):   return self.counts.tolist()
+    def items(self):    return list(zip(ALL_GATES, self.counts))
+
+    def copy(self):
+        inv = GateInventory.__new__(GateInventory)
+        inv.counts = array("H", self.counts)
+        return inv
+
+    def __eq__(self, other):
+        if isinstance(other, GateInventory):
+            return self.counts == other.counts
+        if isinstance(other, dict):
+            return all(self.get(g, -1) == n for g, n in other.items()) and \
+                sum(self.counts) == sum(other.values())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"GateInventory({dict((g, n) for g, n in self.items() if n)})"
+
+
 class Player:
+    __slots__ = ("stars", "name", "position", "_gates", "slot", "order",
+                 "sprite", "color", "bot")
 
     # ---- getters / setters ----
     def get_gates(self):      return self.gates
     def add_gates(self, gate: str, n: int = 1):
         """Add ``n`` of the specified ``gate`` to the player's inventory."""
-        self.gates[gate] = self.gates.get(gate, 0) + n
+        self._gates[gate] += n
     def set_gates(self, new_gates:dict):
         self.gates = new_gates
     def set_name(self, new):  self.name = new
@@ -16,18 +82,28 @@ class Player:
     def add_stars(self, n:int=1):   self.stars += n
     def set_stars(self, n:int):     self.stars = n
     def set_sprite(self, surf): self.sprite = surf
+
+    @property
+    def gates(self) -> GateInventory:
+        return self._gates
+
+    @gates.setter
+    def gates(self, new_gates):
+        self._gates = new_gates if isinstance(new_gates, GateInventory) else GateInventory(new_gates)
+
     def __init__(self, slot):
         self.stars: int = 0                         # star count
         self.name: str = ""
-        self.position: int = 0                      # Space ID
+        self.position = 0                           # Space ID (a board node)
         # Players start with a basic set of Pauli gates so they can
         # immediately interact with the quantum board mechanics.
-        self.gates: dict = {'H':0, 'X':1, 'Y':1, 'Z':1}  # starting gate counts
+        self.gates = {'X':1, 'Y':1, 'Z':1}          # starting gate counts
         self.slot = slot
         self.name = ""
         self.order = slot + 1
         self.sprite = None           # pygame Surface used when drawing
         self.color  = (0,0,0)        # fallback colour for pawn
+        self.bot    = None           # core.bots.Bot, None for a human player
 
     # ---- movement ----
     def move(self, steps:int, board:'Board'):
@@ -37,9 +113,9 @@ class Player:
         decide which way to go (could be AI, user input, or quantum).
         """
         current = self.position
-        for _ in range(steps):
-            next_options = board.spaces[current].next_spaces
+        for left in range(steps, 0, -1):
+            next_options = board.get_next_spaces(current)
             if not next_options:           # dead end
                 break
-            current = board.choose_branch(current, next_options, self)
+            current = board.choose_branch(current, next_options, self, left)
         self.position = current
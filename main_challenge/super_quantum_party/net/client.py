@@ -0,0 +1,200 @@
+"""
+LAN game client.
+
+A client keeps a *mirror* of the server's game: an ``Engine`` restored from
+the START snapshot whose dice, measurements and classical draws are read
+from the DELTA stream (``replay.ScriptedBackend``), and whose decisions are
+replayed from the same stream.  Walking steps are not sent at all – the
+mirror plays them itself, at whatever pace the view animates them.
+
+``NetClient`` runs the connection on a background asyncio thread for the
+pygame scenes (``scenes.network``); ``play_headless`` is a pure asyncio
+client that plays its seat with a bot, used by ``net.server --selftest``.
+
+    $ python -m super_quantum_party.net.client --headless --host 192.168.1.20
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import queue
+import sys
+import threading
+
+from super_quantum_party.core import bots, snapshot
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.engine import BRANCH, GATES, MOVE, ROLL
+from super_quantum_party.core.replay import EventCursor, ScriptedBackend, ScriptedRandom, next_action
+from super_quantum_party.maps import registry
+from super_quantum_party.net import protocol as proto
+
+
+class Mirror:
+    """Client-side copy of the server's engine, advanced by DELTA messages."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.cursor = EventCursor(bytearray(), 0, 0)
+        engine.backend = ScriptedBackend(self.cursor)
+        engine.rng = ScriptedRandom(self.cursor)
+
+    @classmethod
+    def from_snapshot(cls, board, blob):
+        return cls(snapshot.from_snapshot(blob, board))
+
+    def feed(self, delta: bytes):
+        self.cursor.feed(delta)
+
+    def seat_to_bot(self, payload: bytes):
+        """Apply a SEAT message: the server's bot now plays that seat."""
+        seat, level = proto.unpack(payload, "is")
+        for p in self.engine.players:
+            if p.slot == seat:
+                p.bot = bots.make_bot(level)
+
+    def next_action(self):
+        """Next step the server has already played (``None``: wait for it)."""
+        if self.engine.is_over():
+            return None
+        return next_action(self.engine, self.cursor)
+
+    def step(self):
+        """Play the next step; ``None`` when nothing is ready."""
+        action = self.next_action()
+        return None if action is None else self.engine.step(action)
+
+    def caught_up(self):
+        """No buffered step left: the game waits for somebody's decision."""
+        return self.cursor.at_end() and self.engine.state.phase != MOVE
+
+    def waiting_for(self, seat):
+        """Whether the game waits for a decision of ``seat``."""
+        engine = self.engine
+        if engine.is_over() or not self.caught_up():
+            return False
+        s = engine.state
+        if s.phase == GATES and s.round.current in s.round.skipped:
+            # everybody passed: the first human measures and moves on
+            return seat == min(p.slot for p in s.players if p.bot is None)
+        return s.phase in (ROLL, BRANCH, GATES) and bots.acting_player(engine).slot == seat
+
+
+def load_board(map_name, digest):
+    cmap = registry.get_map(map_name).load()
+    if digest and cmap.digest != digest:
+        raise proto.ProtocolError(f"map {map_name!r} differs from the server's")
+    return registry.get_map(map_name), Board.from_compiled(cmap)
+
+
+# ── threaded client (pygame) ───────────────────────────────────────────
+class NetClient:
+    """Connection on a background thread; ``poll()`` returns received messages."""
+
+    def __init__(self, host, port=proto.DEFAULT_PORT, name=""):
+        self.host, self.port, self.name = host, port, name
+        self.inbox = queue.SimpleQueue()
+        self._loop = asyncio.new_event_loop()
+        self._writer = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        try:
+            reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        except OSError as err:
+            self.inbox.put((proto.ERROR, proto.pack(f"cannot connect: {err}")))
+            return
+        self._writer.write(proto.frame(proto.HELLO, proto.pack(self.name)))
+        while True:
+            kind, payload = await proto.read_frame(reader)
+            if kind is None:
+                self.inbox.put((None, b""))
+                self._writer.close()
+                await self._writer.wait_closed()
+                return
+            self.inbox.put((kind, payload))
+
+    def send(self, kind, payload=b""):
+        data = proto.frame(kind, payload)
+        self._loop.call_soon_threadsafe(lambda: self._writer and self._writer.write(data))
+
+    def send_action(self, state, action):
+        self.send(proto.ACTION, proto.encode_action(state, action))
+
+    def poll(self):
+        """Messages received since the last call, as ``(kind, payload)``."""
+        out = []
+        while True:
+            try:
+                out.append(self.inbox.get_nowait())
+            except queue.Empty:
+                return out
+
+    def close(self):
+        if self._writer is not None:
+            self._loop.call_soon_threadsafe(self._writer.close)
+
+
+# ── headless client ────────────────────────────────────────────────────
+async def play_headless(host, port, name="", level="greedy", verbose=True):
+    """Play one seat with a ``level`` bot; True if the mirror ended in sync."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(proto.frame(proto.HELLO, proto.pack(name)))
+    seat = board = mirror = None
+    bot = bots.make_bot(level)
+    sent = False                          # a decision is on its way
+    received = 0
+    while True:
+        kind, payload = await proto.read_frame(reader)
+        if kind is None:
+            print(f"{name}: server closed the connection")
+            return False
+        received += len(payload) + 3
+        if kind == proto.WELCOME:
+            seat, map_name, digest = proto.unpack(payload, "isb")
+            _, board = load_board(map_name, digest)
+        elif kind == proto.START:
+            mirror = Mirror.from_snapshot(board, payload)
+        elif kind == proto.DELTA:
+            mirror.feed(payload)
+            sent = False
+        elif kind == proto.SEAT:
+            mirror.seat_to_bot(payload)
+        elif kind == proto.END:
+            while mirror.step() is not None:
+                pass
+            ok = snapshot.snapshot(mirror.engine) == payload
+            if verbose:
+                print(f"{name} (seat {seat + 1}): game over, {received} bytes received, "
+                      f"mirror {'in sync' if ok else 'OUT OF SYNC'}")
+            writer.close()
+            return ok
+        elif kind == proto.ERROR:
+            (reason,) = proto.unpack(payload, "s")
+            print(f"{name}: server says: {reason}")
+            sent = False
+        if mirror is None:
+            continue
+        while mirror.step() is not None:
+            pass
+        if not sent and mirror.waiting_for(seat):
+            engine = mirror.engine
+            action = bot.act(engine, engine.legal_actions())
+            writer.write(proto.frame(proto.ACTION, proto.encode_action(engine.state, action)))
+            await writer.drain()
+            sent = True
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Join a LAN game.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=proto.DEFAULT_PORT)
+    ap.add_argument("--name", default="")
+    ap.add_argument("--headless", action="store_true", help="play the seat with a bot, no window")
+    ap.add_argument("--bot", default="greedy", choices=sorted(bots.BOT_LEVELS))
+    args = ap.parse_args()
+    if not args.headless:
+        sys.exit("use `python -m super_quantum_party --join HOST` for the windowed client")
+    sys.exit(0 if asyncio.run(play_headless(args.host, args.port, args.name, args.bot)) else 1)
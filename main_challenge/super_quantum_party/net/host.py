@@ -0,0 +1,428 @@
+"""
+Multi-session game host: many headless matches in one process.
+
+Every match is a ``Session`` – an ``Engine`` whose seats are all bots –
+driven by a coroutine on one asyncio loop.  What is expensive to build
+or to run is shared by all sessions instead of being paid per game:
+
+    MapCache         one parsed ``Board`` per map (boards are immutable)
+    SimulatorPool    a few worker threads, each with its own ``AerSimulator``
+                     (one qiskit import for the whole process); at most
+                     ``capacity`` jobs are in flight, further callers wait
+    QuantumEntropy   random bytes measured in bulk on the pool (one 8-qubit
+                     Hadamard circuit, thousands of shots per job), refilled
+                     in the background once half a job's worth is left
+
+Dice are sampled from the measured roll distribution
+(``quantum_dice.ROLL_DISTRIBUTION``) and, by default, measurements from
+their exact distributions (``core.density``), with uniforms drawn from
+that quantum byte stream, so a session costs no circuit run of its own.  ``measure="aer"`` runs every gate-minigame
+measurement as its noisy circuit on the pool instead, like the GUI does.
+
+Backpressure: a session that needs an outcome awaits it, so when the pool
+is saturated the sessions stall rather than queueing unbounded work, and
+``GameHost`` stops admitting new matches while more than ``queue_limit``
+jobs are waiting for a worker.
+
+Each session's memory (engine state, players, bots, random streams) is
+measured at every turn change, leaving out what the sessions share; a
+session over ``session_budget`` bytes is stopped.
+
+    $ python -m super_quantum_party.net.host --matches 500 --concurrency 200
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import bisect
+import gc
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from super_quantum_party.core import bots, density, jobs
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.engine import ADVANCE, MEASURE, MOVE, ROLL_DIE, Engine, final_ranking
+from super_quantum_party.maps import registry
+from super_quantum_party.models.player import Player
+from super_quantum_party.quantum_dice import ROLL_DISTRIBUTION
+
+
+# ── shared maps ────────────────────────────────────────────────────────
+class MapCache:
+    """Compiled maps and their boards, parsed once per process."""
+
+    def __init__(self):
+        self._boards = {}
+        self.shared = set()              # ids of every object the boards hold
+
+    def board(self, map_name):
+        board = self._boards.get(map_name)
+        if board is None:
+            board = self._boards[map_name] = Board.from_compiled(registry.get_map(map_name).load())
+            stack = [board]
+            while stack:
+                obj = stack.pop()
+                if id(obj) not in self.shared and not isinstance(obj, type):
+                    self.shared.add(id(obj))
+                    stack.extend(gc.get_referents(obj))
+        return board
+
+
+# ── simulator pool ─────────────────────────────────────────────────────
+_local = threading.local()
+
+
+def _simulator():
+    """This worker thread's ``AerSimulator``."""
+    sim = getattr(_local, "sim", None)
+    if sim is None:
+        from qiskit_aer import AerSimulator
+        sim = _local.sim = AerSimulator()
+    return sim
+
+
+def harvest_bytes(n):
+    """``n`` random bytes: ``n`` shots of eight qubits in equal superposition."""
+    from qiskit import QuantumCircuit
+    qc = QuantumCircuit(8, 8)
+    qc.h(range(8))
+    qc.measure(range(8), range(8))
+    memory = jobs.run(_simulator(), qc, shots=n, memory=True).get_memory()
+    return bytes(int(bits, 2) for bits in memory)
+
+
+def aer_measure(history, percent):
+    """One noisy run of the gate-minigame circuit (``QuantumBackend.measure``)."""
+    from super_quantum_party.scenes.gateGame.CircuitSimulator import CircuitSimulator
+    noise_model = CircuitSimulator.apply_decoherence_noise(None, percent)
+    return CircuitSimulator.apply_circuit(None, noise_model=noise_model, gate_history=list(history))
+
+
+class SimulatorPool:
+    """Worker threads running simulator jobs; at most ``capacity`` in flight."""
+
+    def __init__(self, workers=2, capacity=None):
+        self.workers = workers
+        self.capacity = capacity or 2 * workers
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="sqp-sim")
+        self._slots = asyncio.Semaphore(self.capacity)
+        self.waiting = 0                 # callers blocked on a free slot
+        self.jobs = 0
+        self.waited = 0                  # jobs that had to wait for a slot
+        self.wait_time = 0.0
+        self.busy_time = 0.0
+
+    @property
+    def saturated(self):
+        return self.waiting > 0
+
+    async def run(self, fn, *args):
+        """Result of ``fn(*args)`` on a worker thread."""
+        if self._slots.locked():
+            self.waited += 1
+        t0 = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        t1 = time.perf_counter()
+        self.wait_time += t1 - t0
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.jobs += 1
+            self.busy_time += time.perf_counter() - t1
+            self._slots.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+# ── quantum randomness ─────────────────────────────────────────────────
+class QuantumEntropy:
+    """Buffered quantum random bytes, refilled on the pool ahead of demand."""
+
+    MAX_CHUNK = 1 << 17
+
+    def __init__(self, pool, chunk=8192, source=harvest_bytes):
+        self.pool = pool
+        self.chunk = chunk               # bytes per job; doubles when demand outruns it
+        self.source = source
+        self._buf = bytearray()
+        self._pos = 0
+        self._refill = None              # task filling the buffer, if any
+        self.produced = 0
+        self.consumed = 0
+        self.stalls = 0                  # takes that found the buffer empty
+        self._stalled = False
+        self._faces = list(ROLL_DISTRIBUTION)
+        total = sum(ROLL_DISTRIBUTION.values())
+        self._die_cdf = _cdf([w / total for w in ROLL_DISTRIBUTION.values()])
+
+    @property
+    def available(self):
+        return len(self._buf) - self._pos
+
+    def _start_refill(self):
+        if self._refill is None or self._refill.done():
+            self._refill = asyncio.ensure_future(self._fill())
+
+    async def _fill(self):
+        if self._stalled:
+            self.chunk = min(2 * self.chunk, self.MAX_CHUNK)
+            self._stalled = False
+        data = await self.pool.run(self.source, self.chunk)
+        del self._buf[:self._pos]
+        self._pos = 0
+        self._buf += data
+        self.produced += len(data)
+
+    async def take(self, n):
+        """``n`` bytes of the stream."""
+        if self.available < n:
+            self.stalls += 1
+            self._stalled = True
+            while self.available < n:
+                self._start_refill()
+                await asyncio.shield(self._refill)
+        out = bytes(self._buf[self._pos:self._pos + n])
+        self._pos += n
+        self.consumed += n
+        if self.available < self.chunk // 2:
+            self._start_refill()
+        return out
+
+    async def uniform(self):
+        """A float in [0, 1) with 32 random bits."""
+        return int.from_bytes(await self.take(4), "little") / 2 ** 32
+
+    async def roll(self):
+        """One die, distributed like ``quantum_dice.quantum_walk_roll``."""
+        return self._faces[bisect.bisect_right(self._die_cdf, await self.uniform())]
+
+    async def measure(self, history, percent):
+        """Outcome of the noisy minigame circuit, from its exact distribution."""
+        probs = density.outcome_probabilities(history, percent)
+        cdf = _cdf([probs[o] for o in density.OUTCOMES])
+        return density.OUTCOMES[bisect.bisect_right(cdf, await self.uniform())]
+
+
+def _cdf(weights):
+    """Upper bounds of each outcome's slice of [0, 1) (the last one open)."""
+    out, acc = [], 0.0
+    for w in weights[:-1]:
+        acc += w
+        out.append(acc)
+    return out
+
+
+# ── memory accounting ──────────────────────────────────────────────────
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def deep_size(root, shared=frozenset()):
+    """Bytes reachable from ``root``, not counting objects whose id is in ``shared``."""
+    seen = set()
+    stack, total = [root], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or id(obj) in shared or isinstance(obj, _SKIP):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+# ── sessions ───────────────────────────────────────────────────────────
+class PrefetchedBackend:
+    """Engine backend handing out outcomes the session awaited beforehand."""
+    __slots__ = ("die", "outcome")
+
+    def __init__(self):
+        self.die = self.outcome = None
+
+    def roll(self):
+        return self.die
+
+    def measure(self, history, percent):
+        return self.outcome
+
+
+class Session:
+    """One headless match played by bots."""
+
+    def __init__(self, host, sid, map_name, seats=4, n_turns=10, bot_level="greedy", seed=None):
+        self.host, self.id, self.map_name = host, sid, map_name
+        players = []
+        for i in range(seats):
+            p = Player(i)
+            p.bot = bots.make_bot(bot_level, None if seed is None else seed * 8 + i)
+            p.set_name(f"{bot_level} bot {i + 1}")
+            players.append(p)
+        self.backend = PrefetchedBackend()
+        self.engine = Engine(host.maps.board(map_name), players, n_turns,
+                             backend=self.backend, seed=seed)
+        self.status = "waiting"
+        self.steps = 0
+        self.memory = self.peak_memory = 0
+        self.started = self.finished = None
+
+    def account(self):
+        """Refresh ``memory`` / ``peak_memory``; False when over the budget."""
+        old, self.memory = self.memory, deep_size(self.engine, self.host.shared)
+        self.peak_memory = max(self.peak_memory, self.memory)
+        self.host.note_memory(self.memory - old)
+        budget = self.host.session_budget
+        return not budget or self.memory <= budget
+
+    async def run(self):
+        host, engine, backend = self.host, self.engine, self.backend
+        s = engine.state
+        self.status, self.started = "running", time.perf_counter()
+        turns_left = s.n_turns
+        self.account()
+        while not engine.is_over():
+            if s.phase == MOVE:
+                engine.step(ADVANCE)
+                self.steps += 1
+                continue
+            actions = engine.legal_actions()
+            action = bots.acting_player(engine).bot.act(engine, actions)
+            if action == ROLL_DIE:
+                backend.die = await host.entropy.roll()
+            elif action == MEASURE:
+                backend.outcome = await host.measure(s.round.history, s.round.decoherence_percent)
+            engine.step(action)
+            self.steps += 1
+            if s.n_turns != turns_left:
+                turns_left = s.n_turns
+                if not self.account():
+                    self.status = "over memory budget"
+                    break
+            await asyncio.sleep(0)           # let the other sessions play
+        else:
+            self.status = "done"
+        self.account()
+        self.finished = time.perf_counter()
+        return self
+
+    def ranking(self):
+        return final_ranking(self.engine.players)
+
+
+class GameHost:
+    """Runs sessions concurrently on the running loop, sharing maps and simulators."""
+
+    def __init__(self, workers=2, capacity=None, max_sessions=256, queue_limit=None,
+                 session_budget=0, measure="exact", entropy_chunk=8192):
+        if measure not in ("exact", "aer"):
+            raise ValueError(f"unknown measure mode {measure!r}")
+        self.maps = MapCache()
+        self.pool = SimulatorPool(workers, capacity)
+        self.entropy = QuantumEntropy(self.pool, entropy_chunk)
+        self.measure_mode = measure
+        self.session_budget = session_budget
+        self.queue_limit = self.pool.capacity if queue_limit is None else queue_limit
+        self._admission = asyncio.Semaphore(max_sessions)
+        self.sessions = {}               # id -> running Session
+        self._next_id = 0
+        self.completed = []
+        self.deferred = 0                # admissions delayed by a saturated pool
+        self.running_memory = 0          # bytes of the running sessions
+        self.peak_memory = 0             # highest running_memory so far
+
+    @property
+    def shared(self):
+        """Ids of the objects sessions reference but do not own."""
+        return self.maps.shared
+
+    async def measure(self, history, percent):
+        if self.measure_mode == "aer":
+            return await self.pool.run(aer_measure, tuple(history), percent)
+        return await self.entropy.measure(history, percent)
+
+    async def play(self, map_name="new_map", **kwargs):
+        """Play one match to the end (waiting for admission) and return its session."""
+        async with self._admission:
+            if self.pool.waiting > self.queue_limit:
+                self.deferred += 1
+                while self.pool.waiting > self.queue_limit:
+                    await asyncio.sleep(0.005)
+            sid = self._next_id
+            self._next_id += 1
+            session = self.sessions[sid] = Session(self, sid, map_name, **kwargs)
+            try:
+                await session.run()
+            finally:
+                del self.sessions[sid]
+                self.note_memory(-session.memory)
+                self.completed.append(session)
+        return session
+
+    def note_memory(self, delta):
+        """A running session's size changed by ``delta`` bytes (``Session.account``)."""
+        self.running_memory += delta
+        self.peak_memory = max(self.peak_memory, self.running_memory)
+
+    def memory_report(self):
+        """Total / peak bytes of the running sessions."""
+        sizes = [s.memory for s in self.sessions.values()]
+        return sum(sizes), max(sizes, default=0)
+
+    def close(self):
+        self.pool.close()
+
+
+# ── command line ───────────────────────────────────────────────────────
+async def _main(args):
+    host = GameHost(args.workers, args.capacity, args.concurrency,
+                    session_budget=args.budget, measure=args.measure)
+    host.maps.board(args.map)
+    await host.entropy.take(1)           # first circuit run: qiskit import and Aer start-up
+    t0 = time.perf_counter()
+    seeds = range(args.seed, args.seed + args.matches)
+    sessions = await asyncio.gather(*(host.play(args.map, seats=args.seats, n_turns=args.turns,
+                                                bot_level=args.bots, seed=seed) for seed in seeds))
+    dt = time.perf_counter() - t0
+    host.close()
+
+    done = [s for s in sessions if s.status == "done"]
+    steps = sum(s.steps for s in sessions)
+    peaks = sorted(s.peak_memory for s in sessions)
+    pool, ent = host.pool, host.entropy
+    print(f"{len(done)}/{len(sessions)} matches finished in {dt:.2f}s "
+          f"({len(sessions) / dt:.1f} matches/s, {steps / dt:,.0f} steps/s)")
+    print(f"session memory: median {peaks[len(peaks) // 2] / 1024:.1f} KiB, "
+          f"max {peaks[-1] / 1024:.1f} KiB; peak of all running {host.peak_memory / 2 ** 20:.1f} MiB")
+    print(f"simulator pool: {pool.jobs} jobs on {pool.workers} workers, busy {pool.busy_time:.2f}s; "
+          f"{pool.waited} waited for a slot ({pool.wait_time:.2f}s), "
+          f"{host.deferred} admissions deferred")
+    print(f"quantum entropy: {ent.consumed:,} of {ent.produced:,} bytes used, "
+          f"{ent.stalls} stalls on an empty buffer")
+    print(jobs.report(5))
+    for s in sessions:
+        if s.status != "done":
+            print(f"  session {s.id}: {s.status} ({s.memory} bytes)")
+    return len(done) == len(sessions)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run many headless bot matches in one process.")
+    ap.add_argument("--matches", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=200, help="matches running at once")
+    ap.add_argument("--map", default="new_map")
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("--seats", type=int, default=4)
+    ap.add_argument("--bots", default="greedy", choices=sorted(bots.BOT_LEVELS))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=2, help="simulator threads")
+    ap.add_argument("--capacity", type=int, default=None, help="simulator jobs in flight")
+    ap.add_argument("--measure", default="exact", choices=("exact", "aer"),
+                    help="minigame measurements from the exact distribution or noisy Aer runs")
+    ap.add_argument("--budget", type=int, default=0, metavar="BYTES",
+                    help="stop sessions using more memory than this")
+    sys.exit(0 if asyncio.run(_main(ap.parse_args())) else 1)
@@ -0,0 +1,135 @@
+"""
+Wire format of LAN games.
+
+Every message is a frame: ``u16`` little-endian payload length, ``u8``
+message kind, payload.  Integers inside payloads are LEB128 varints and
+strings are a varint length followed by UTF-8 bytes.
+
+    client -> server
+        HELLO     name
+        ACTION    action code [varint]       a decision of the client's seat
+
+    server -> client
+        WELCOME   seat, map name, map digest
+        LOBBY     network seats, then the name of each ("" = free)
+        START     ``core.snapshot`` of the first turn
+        DELTA     ``core.replay`` events: random outcomes and decisions
+        END       ``core.snapshot`` of the final state (clients check sync)
+        ERROR     reason
+        SEAT      seat, bot level              a client left: a bot plays its seat
+
+The game itself only ever travels as DELTA messages: the server runs the
+rules and broadcasts what its ``replay.Recorder`` logged – about two bytes
+per die, measurement, branch choice or gate placement – and each client
+replays them into a mirror ``Engine``.  Walking steps are never sent.
+"""
+from __future__ import annotations
+import asyncio
+import struct
+
+from super_quantum_party.core.engine import (
+    BRANCH, CONTINUE, MEASURE, PLACEABLE_GATES, ROLL_DIE, SKIP, branch, place,
+)
+from super_quantum_party.core.replay import read_varint, write_varint
+
+DEFAULT_PORT = 47_100
+MAX_FRAME = 0xFFFF
+
+# message kinds
+HELLO, ACTION = 1, 2
+WELCOME, LOBBY, START, DELTA, END, ERROR, SEAT = 10, 11, 12, 13, 14, 15, 16
+
+# action codes
+A_ROLL, A_BRANCH, A_PLACE, A_SKIP, A_MEASURE, A_CONTINUE = range(6)
+_SIMPLE = {ROLL_DIE: A_ROLL, SKIP: A_SKIP, MEASURE: A_MEASURE, CONTINUE: A_CONTINUE}
+_SIMPLE_BACK = {code: action for action, code in _SIMPLE.items()}
+
+_FRAME = struct.Struct("<HB")
+
+
+class ProtocolError(Exception):
+    """A peer sent something that is not a valid message."""
+
+
+# ── framing ────────────────────────────────────────────────────────────
+def frame(kind: int, payload: bytes = b"") -> bytes:
+    if len(payload) > MAX_FRAME:
+        raise ProtocolError(f"message too large ({len(payload)} bytes)")
+    return _FRAME.pack(len(payload), kind) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    """``(kind, payload)`` of the next message; ``(None, b"")`` on disconnect."""
+    try:
+        length, kind = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+        return kind, await reader.readexactly(length)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None, b""
+
+
+def pack(*fields) -> bytes:
+    """Payload of varints (``int``), strings (``str``) and blobs (``bytes``)."""
+    buf = bytearray()
+    for f in fields:
+        if isinstance(f, int):
+            write_varint(buf, f)
+        else:
+            raw = f.encode("utf-8") if isinstance(f, str) else f
+            write_varint(buf, len(raw))
+            buf += raw
+    return bytes(buf)
+
+
+def unpack(payload: bytes, spec: str):
+    """Fields of ``payload`` by ``spec``: ``i`` varint, ``s`` string, ``b`` blob."""
+    out, pos = [], 0
+    try:
+        for c in spec:
+            value, pos = read_varint(payload, pos)
+            if c != "i":
+                raw = bytes(payload[pos:pos + value])
+                if len(raw) != value:
+                    raise ProtocolError("truncated message")
+                pos += value
+                value = raw.decode("utf-8") if c == "s" else raw
+            out.append(value)
+    except IndexError:
+        raise ProtocolError("truncated message") from None
+    return out
+
+
+def lobby(names) -> bytes:
+    return pack(len(names), *names)
+
+
+def read_lobby(payload: bytes):
+    n, _ = read_varint(payload, 0)
+    return unpack(payload, "i" + "s" * n)[1:]
+
+
+# ── actions ────────────────────────────────────────────────────────────
+def encode_action(state, action) -> bytes:
+    """ACTION payload for ``action`` in the sender's view of the game."""
+    if action in _SIMPLE:
+        return pack(_SIMPLE[action])
+    if action[0] == "branch":
+        return pack(A_BRANCH, state.branch_options.index(action[1]))
+    if action[0] == "place":
+        return pack(A_PLACE, PLACEABLE_GATES.index(action[1]) * 2 + action[2])
+    raise ProtocolError(f"cannot send action {action!r}")
+
+
+def decode_action(state, payload: bytes):
+    """The action of an ACTION payload, against the server's state."""
+    try:
+        code, pos = read_varint(payload, 0)
+        if code in _SIMPLE_BACK:
+            return _SIMPLE_BACK[code]
+        value, _ = read_varint(payload, pos)
+    except IndexError:
+        raise ProtocolError("truncated action") from None
+    if code == A_BRANCH and state.phase == BRANCH and value < len(state.branch_options):
+        return branch(state.branch_options[value])
+    if code == A_PLACE and value < 2 * len(PLACEABLE_GATES):
+        return place(PLACEABLE_GATES[value // 2], value % 2)
+    raise ProtocolError(f"bad action code {code}/{value}")
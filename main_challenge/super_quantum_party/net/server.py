@@ -0,0 +1,253 @@
+"""
+Authoritative LAN game server.
+
+The server owns the only real ``Engine``: it seats the clients, runs the
+rules, rolls the dice, plays the bot seats and broadcasts what happened as
+DELTA messages (see ``net.protocol``).  Clients send nothing but their own
+decisions; an action that is not legal for the sender right now is
+refused.  A client that leaves mid-game is replaced by a bot.
+
+    $ python -m super_quantum_party.net.server --humans 2 --bots greedy
+    $ python -m super_quantum_party.net.server --selftest 3     # localhost check
+
+``--selftest N`` starts a server for N players plus N headless client
+processes (``net.client --headless``) that play their seat with a bot and
+check that their mirror of the game ends identical to the server's.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from super_quantum_party.core import bots, snapshot
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.engine import (
+    CONTINUE, GATES, MEASURE, MOVE, ADVANCE, Engine, QuantumBackend, final_ranking,
+)
+from super_quantum_party.core.replay import Recorder
+from super_quantum_party.maps import registry
+from super_quantum_party.models.player import Player
+from super_quantum_party.net import protocol as proto
+
+
+class GameServer:
+    """One game for ``humans`` network players; the other seats are bots."""
+
+    def __init__(self, map_name="new_map", seats=4, humans=2, n_turns=10,
+                 bot_level="greedy", seed=None, backend=None, record=None):
+        if not 1 <= humans <= seats <= 4:
+            raise ValueError("need 1 <= humans <= seats <= 4")
+        cmap = registry.get_map(map_name).load()
+        self.board = Board.from_compiled(cmap)
+        self.map_name, self.digest = map_name, cmap.digest
+        self.seats, self.humans, self.n_turns = seats, humans, n_turns
+        self.bot_level, self.seed, self.backend = bot_level, seed, backend
+        self.record = record
+        self.names = [""] * humans
+        self.clients = {}                 # seat -> StreamWriter
+        self.engine = None
+        self.recorder = None
+        self._sent = 0                    # recorder events already broadcast
+        self.finished = asyncio.Event()
+        self._handlers = set()            # connection tasks, awaited on shutdown
+        self.bytes_out = 0
+
+    # ── connections ────────────────────────────────────────────────────
+    async def serve(self, host="0.0.0.0", port=proto.DEFAULT_PORT, ready=None):
+        """Accept clients until the game is over."""
+        server = await asyncio.start_server(self._client, host, port)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        async with server:
+            await self.finished.wait()
+        for w in list(self.clients.values()):
+            w.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    async def _client(self, reader, writer):
+        self._handlers.add(asyncio.current_task())
+        kind, payload = await proto.read_frame(reader)
+        free = [s for s in range(self.humans) if s not in self.clients]
+        if kind != proto.HELLO or self.engine is not None or not free:
+            writer.write(proto.frame(proto.ERROR, proto.pack(
+                "game already started" if self.engine is not None else "game is full")))
+            writer.close()
+            return
+        seat = free[0]
+        try:
+            (name,) = proto.unpack(payload, "s")
+        except proto.ProtocolError:
+            name = ""
+        self.names[seat] = name or f"Player {seat + 1}"
+        self.clients[seat] = writer
+        writer.write(proto.frame(proto.WELCOME, proto.pack(seat, self.map_name, self.digest)))
+        await self._lobby()
+        if len(self.clients) == self.humans:
+            await self._start()
+        try:
+            while not self.finished.is_set():
+                kind, payload = await proto.read_frame(reader)
+                if kind is None:
+                    break
+                if kind == proto.ACTION and self.engine is not None:
+                    await self._on_action(seat, payload)
+        finally:
+            self.clients.pop(seat, None)
+            writer.close()
+            if self.engine is None:
+                await self._lobby()
+            elif not self.engine.is_over():
+                # keep the game going for everybody else
+                player = next(p for p in self.engine.players if p.slot == seat)
+                player.bot = bots.make_bot(self.bot_level)
+                await self._broadcast(proto.SEAT, proto.pack(seat, self.bot_level))
+                self._run_automatic()
+                await self._flush()
+
+    async def _lobby(self):
+        await self._broadcast(proto.LOBBY, proto.lobby(
+            [self.names[s] if s in self.clients else "" for s in range(self.humans)]))
+
+    async def _broadcast(self, kind, payload=b""):
+        data = proto.frame(kind, payload)
+        for w in list(self.clients.values()):
+            w.write(data)
+            self.bytes_out += len(data)
+        for w in list(self.clients.values()):
+            try:
+                await w.drain()
+            except ConnectionError:
+                pass
+
+    # ── game ───────────────────────────────────────────────────────────
+    async def _start(self):
+        players = [Player(i) for i in range(self.seats)]
+        for p in players:
+            if p.slot < self.humans:
+                p.set_name(self.names[p.slot])
+            else:
+                p.bot = bots.make_bot(self.bot_level, None if self.seed is None else self.seed + p.slot)
+                p.set_name(f"{self.bot_level} bot {p.slot + 1}")
+        self.engine = Engine(self.board, players, self.n_turns, backend=self.backend, seed=self.seed)
+        # the recorder's event log is exactly what the clients need
+        self.recorder = Recorder(self.engine, self.map_name, self.digest, self.seed or 0,
+                                 keyframe_every=self.n_turns + 1)
+        await self._broadcast(proto.START, snapshot.snapshot(self.engine))
+        self._run_automatic()
+        await self._flush()
+
+    def _bot_to_act(self):
+        """Bot making the next decision; ``None`` when a client has to."""
+        s = self.engine.state
+        player = bots.acting_player(self.engine)
+        if s.phase == GATES and s.round.current in s.round.skipped:
+            # measuring and continuing are up to the people still connected
+            if any(p.slot in self.clients and p.bot is None for p in s.players):
+                return None
+        return player.bot
+
+    def _run_automatic(self):
+        """Play forced steps and bot decisions up to the next client decision."""
+        engine = self.engine
+        while not engine.is_over():
+            if engine.state.phase == MOVE:
+                engine.step(ADVANCE)
+                continue
+            bot = self._bot_to_act()
+            if bot is None:
+                break
+            engine.step(bot.act(engine, engine.legal_actions()))
+
+    def _allowed(self, seat, action):
+        s = self.engine.state
+        if action not in self.engine.legal_actions():
+            return False
+        if s.phase == GATES and action in (MEASURE, CONTINUE):
+            return True                       # any player may measure / move on
+        player = bots.acting_player(self.engine)
+        return player.slot == seat and player.bot is None
+
+    async def _on_action(self, seat, payload):
+        try:
+            action = proto.decode_action(self.engine.state, payload)
+        except proto.ProtocolError as err:
+            action, reason = None, str(err)
+        else:
+            reason = f"{action!r} is not yours to play now"
+        if action is None or not self._allowed(seat, action):
+            w = self.clients.get(seat)
+            if w is not None:
+                w.write(proto.frame(proto.ERROR, proto.pack(reason)))
+            return
+        self.engine.step(action)
+        self._run_automatic()
+        await self._flush()
+
+    async def _flush(self):
+        events = self.recorder.events
+        while self._sent < len(events):
+            chunk = bytes(events[self._sent:self._sent + proto.MAX_FRAME])
+            self._sent += len(chunk)
+            await self._broadcast(proto.DELTA, chunk)
+        if self.engine.is_over() and not self.finished.is_set():
+            await self._broadcast(proto.END, snapshot.snapshot(self.engine))
+            if self.record:
+                self.recorder.save(self.record)
+            self.finished.set()
+
+
+# ── command line ───────────────────────────────────────────────────────
+def selftest(n_clients, args):
+    """Server plus ``n_clients`` headless client processes on localhost."""
+    async def main():
+        server = GameServer(args.map, seats=max(args.seats, n_clients), humans=n_clients,
+                            n_turns=args.turns, bot_level=args.bots, seed=args.seed)
+        ready = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(server.serve("127.0.0.1", 0, ready))
+        port = await ready
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+        t0 = time.perf_counter()
+        procs = [await asyncio.create_subprocess_exec(
+                     sys.executable, "-m", "super_quantum_party.net.client", "--headless",
+                     "--port", str(port), "--name", f"client{i + 1}", "--bot", args.client_bot,
+                     env=env)
+                 for i in range(n_clients)]
+        codes = [await p.wait() for p in procs]
+        await task
+        dt = time.perf_counter() - t0
+        print(f"server: game over in {dt:.1f}s, {server.bytes_out} bytes sent "
+              f"({len(server.recorder.events)} bytes of events)")
+        for p in final_ranking(server.engine.players):
+            print(f"  {p.name}: {p.stars} stars, {sum(p.gates.values())} gates")
+        return all(c == 0 for c in codes)
+    ok = asyncio.run(main())
+    print("selftest", "passed" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Host a LAN game of Super Quantum Party.")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=proto.DEFAULT_PORT)
+    ap.add_argument("--map", default="new_map")
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("--humans", type=int, default=2, help="network players to wait for")
+    ap.add_argument("--seats", type=int, default=4, help="players in the game (rest are bots)")
+    ap.add_argument("--bots", default="greedy", choices=sorted(bots.BOT_LEVELS))
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--quantum", action="store_true", help="roll with the Aer circuits")
+    ap.add_argument("--record", default=None, help="save a replay of the game here")
+    ap.add_argument("--selftest", type=int, default=0, metavar="N",
+                    help="run N headless clients against a local server and check sync")
+    ap.add_argument("--client-bot", default="greedy", choices=sorted(bots.BOT_LEVELS))
+    args = ap.parse_args()
+
+    if args.selftest:
+        sys.exit(0 if selftest(args.selftest, args) else 1)
+    server = GameServer(args.map, args.seats, args.humans, args.turns, args.bots, args.seed,
+                        QuantumBackend() if args.quantum else None, args.record)
+    print(f"waiting for {args.humans} player(s) on {args.host}:{args.port} ...")
+    asyncio.run(server.serve(args.host, args.port))
+    print("game over:", ", ".join(f"{p.name} {p.stars}*" for p in final_ranking(server.engine.players)))
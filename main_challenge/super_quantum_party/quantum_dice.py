@@ -1,7 +1,34 @@
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
+import threading
 
-_simulator = AerSimulator()
+from super_quantum_party.core import jobs
+
+# qiskit and Aer take most of a second to import, so they are loaded on the
+# first roll (or by ``start_warm_up`` while the menu is on screen) rather
+# than when this module is imported for ``ROLL_DISTRIBUTION``.
+_simulator = None
+_lock = threading.Lock()
+
+def get_simulator():
+    """The shared ``AerSimulator``, created on first use."""
+    global _simulator
+    with _lock:
+        if _simulator is None:
+            from qiskit_aer import AerSimulator
+            _simulator = AerSimulator()
+        return _simulator
+
+def warm_up():
+    """Import the quantum stack and run each circuit once (first runs are slow)."""
+    with jobs.labelled("warm-up"):
+        quantum_walk_roll()
+        from super_quantum_party.scenes.gateGame.CircuitSimulator import CircuitSimulator
+        CircuitSimulator.apply_circuit(None, CircuitSimulator.apply_decoherence_noise(None, 10), [("H", 0)])
+
+def start_warm_up():
+    """Run ``warm_up`` on a daemon thread; returns the thread."""
+    thread = threading.Thread(target=warm_up, name="quantum-warm-up", daemon=True)
+    thread.start()
+    return thread
 
 def controlled_displacement(qc):
         qc.mcx([0,1,2], 3, ctrl_state=None, mode='noancilla')
@@ -12,6 +39,8 @@ def controlled_displacement(qc):
 def quantum_walk_roll(step=6):
     """Return a dice roll using a quantum walk.
     """
+    from qiskit import QuantumCircuit
+    simulator = get_simulator()
     get_out = 0
     while get_out <= 1000:
         qc = QuantumCircuit(4, 3)
@@ -22,7 +51,7 @@ def quantum_walk_roll(step=6):
             qc = controlled_displacement(qc)
             qc.h(0)
         qc.measure([1, 2, 3], [0, 1, 2])
-        result = _simulator.run(qc, shots=1000).result()
+        result = jobs.run(simulator, qc, shots=1000)
         counts = result.get_counts()
         outcome = list(counts.keys())[0]
         value = int(outcome, 2)
@@ -32,3 +61,17 @@ def quantum_walk_roll(step=6):
         if value < 6: # s'assure qu'on reste entre 0 et 6
             return value + 1
 
+
+# Empirical outcome frequencies of ``quantum_walk_roll`` (10 000 rolls on
+# qiskit-aer 0.16).  The roll keeps the first key of a 1000-shot counts
+# dict, whose order is not the walk's Born distribution, so the frequencies
+# are measured rather than derived.  Regenerate with
+# ``measure_roll_distribution()`` after touching the circuit.
+ROLL_DISTRIBUTION = {1: 3702, 2: 1764, 3: 742, 4: 2646, 5: 1011, 6: 135}
+
+def measure_roll_distribution(samples=10000):
+    """Roll ``samples`` times and return the outcome counts."""
+    counts = {face: 0 for face in range(1, 7)}
+    for _ in range(samples):
+        counts[quantum_walk_roll()] += 1
+    return counts
@@ -1,29 +1,44 @@
-import pygame, sys, random
-from super_quantum_party.quantum_dice import quantum_walk_roll
+import os
+import pygame, sys, time
+from collections import deque
 import networkx as nx
-from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK, GREEN
+from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK, GREEN, TYPE_COLOUR, WATCH_MAPS, RECORD_DIR, AUTOSAVE, TURBO
 from super_quantum_party.core.scene import Scene
+from super_quantum_party.core.board import Board
+from super_quantum_party.core import assets, bots, engine as rules
 from super_quantum_party.ui.widgets import Button
+from super_quantum_party.maps.compiler import topology_variants
+from super_quantum_party.maps import hotreload
 
 # Default radius used when drawing nodes at a zoom level of 1.0.  Smaller
 # nodes make crowded maps easier to read.
 BASE_NODE_RADIUS = 20
 
-# colour palette for node types
-TYPE_COLOUR = {
-    1: ( 50, 140, 255),   # blue
-    2: (255, 70,  70 ),   # red
-    3: (255, 200,  40),   # yellow
-    4: (255, 210,   0),   # gold
-}
-
 class GameScene(Scene):
     """
-    Renders a directed graph.  Players can walk along outgoing edges
-    with left/right arrows (cycle) and Enter (confirm) for demo purposes.
+    Renders the board and feeds player input to the rules engine.
+
+    All game rules live in ``core.engine``; this scene only turns key
+    presses into engine actions, paces the forced ``ADVANCE`` steps so the
+    walk is animated, and reacts to the events the engine returns.
+
+    In turbo mode (``T`` key, or ``SQP_TURBO=1``) walks resolve at once,
+    bots decide without delay and only end-of-turn states are drawn; when
+    every player is a bot the gate rounds are played on the board and as
+    many turns as fit in ``TURBO_FRAME`` are played between two frames.
     """
     CAM_SPEED = 400  # pixels per second
     MOVE_DELAY = 0.4  # seconds between steps when walking
+    BOT_DELAY = 0.6   # seconds a bot "thinks" before rolling or turning
+    TURBO_FRAME = 0.025  # seconds of play per frame in turbo mode
+    AUTOSAVES = True     # written to settings.AUTOSAVE between turns
+
+    BACKGROUND = "super_quantum_party/resources/boardgame_background.png"
+    DICE_SOUND = "super_quantum_party/resources/audio/dice_roll.mp3"
+    FONT = assets.font_asset(None, 28)
+    BIG_FONT = assets.font_asset(None, 42)
+    ASSETS = [assets.image_asset(BACKGROUND, alpha=True), assets.sound_asset(DICE_SOUND),
+              FONT, BIG_FONT]
 
     ZOOM_STEP = 0.1
 
@@ -32,47 +47,78 @@ class GameScene(Scene):
         return max(0.2, min(zoom, 3.0))
 
 
-    def __init__(self, manager, players, n_turns, map_module):
+    def __init__(self, manager, players, n_turns, map_module, backend=None, resume=None,
+                 engine=None):
         super().__init__(manager)
-        self.players = sorted(players, key=lambda p: p.order)
-        self.n_turns = n_turns  # remaining turns
         self.map_module = map_module
 
         # ── build graph ────────────────────────────────────────────────
         self.g: nx.DiGraph = map_module.build_graph()
-        # remember original edge directions so the board can be reset
+        # remember original edge directions so the board can be reset, and
+        # the edge list of every measurement outcome (precomputed by the map
+        # compiler when the map comes from the registry)
         self._base_edges = list(self.g.edges())
+        if hasattr(map_module, "topologies"):
+            self._topologies = map_module.topologies()
+        else:
+            self._topologies = topology_variants(self.g)
+        self.topology = "00"             # last measurement outcome applied
         self.start_node = list(self.g.nodes)[0]
-
-        # assign basic sprites/colours and starting positions
+        # live map reload while tuning a map (SQP_WATCH_MAPS=1)
+        self.map_watcher = None
+        if WATCH_MAPS and hasattr(map_module, "yaml_path"):
+            self.map_watcher = hotreload.MapWatcher(map_module)
+
+        # ── rules engine (real quantum circuits unless told otherwise) ──
+        if engine is None:
+            self.engine = rules.Engine(
+                Board.from_graph(self.g, self._topologies), players, n_turns,
+                backend=backend if backend is not None else rules.QuantumBackend(),
+            )
+        else:
+            self.engine = engine         # a game played elsewhere (replays, videos)
+        self.players = self.engine.players
+        if resume is not None:
+            # continue a saved game (``core.snapshot`` blob)
+            from super_quantum_party.core import snapshot
+            snapshot.restore(self.engine, resume)
+        if resume is not None or engine is not None:
+            for n, t in self.state.types.items():
+                self.g.nodes[n]["type"] = t
+            self.apply_measurement(self.state.topology)
+        # replay log of the whole game (SQP_RECORD_DIR=<dir>)
+        self.recorder = None
+        if RECORD_DIR and resume is None and engine is None and hasattr(map_module, "load"):
+            from super_quantum_party.core import replay
+            self.recorder = replay.Recorder(self.engine, map_module.name,
+                                            map_module.load().digest)
+
+        # assign basic sprites/colours
         colours = [
             (60,120,240), (230,60,60),
             (60,180,80), (190,80,200)
         ]
         for idx,p in enumerate(self.players):
-            p.position = self.start_node
             col = colours[idx % len(colours)]
             p.color = col
             surf = pygame.Surface((24,24), pygame.SRCALPHA)
             pygame.draw.circle(surf, col, (12,12), 12)
             p.set_sprite(surf)
 
-        self.active_idx = 0
         self.last_roll = None
-        self.pending_rolls = []          # store dice rolled so far
+        if self.state.last_roll is not None:        # resumed or restored from a keyframe
+            self._show_roll()
 
-        self.font = pygame.font.SysFont(None, 28)
-        self.big  = pygame.font.SysFont(None, 42)
+        self.font = self.resource(self.FONT)
+        self.big  = self.resource(self.BIG_FONT)
 
         # background image for the board
-        self.background = pygame.image.load(
-            "super_quantum_party/resources/boardgame_background.png"
-        ).convert_alpha()
+        self.background = self.resource(assets.image_asset(self.BACKGROUND, alpha=True))
 
         # button used to roll the dice one at a time
         self.roll_button = Button("Roll", (WIDTH - 80, HEIGHT - 40))
         # load dice roll sound
-        self.dice_sound = pygame.mixer.Sound("super_quantum_party/resources/audio/dice_roll.mp3")
+        self.dice_sound = self.resource(assets.sound_asset(self.DICE_SOUND))
 
         # Camera offset when drawing large maps
         self.cam_x = 0
@@ -80,113 +126,186 @@ class GameScene(Scene):
         self.zoom = 1.0
 
         # movement animation state
-        self.moving_player = None
-        self.steps_remaining = 0
         self.move_timer = 0
-        self.awaiting_choice = False
-        self.branch_options = []
         self.branch_index = 0
+        self.bot_timer = self.BOT_DELAY
+        self.local_bots = True           # bots are played by this process
+
+        # turbo mode and its turns-per-second counter
+        self.turbo = TURBO
+        self.turn_times = deque()        # when each recent turn ended
+        self._turns_seen = self.state.n_turns
+
+    # ── views on the engine state ─────────────────────────────────────
+    @property
+    def state(self):
+        return self.engine.state
+
+    @property
+    def n_turns(self):
+        return self.state.n_turns
+
+    @property
+    def active_idx(self):
+        return self.state.active
+
+    @property
+    def moving_player(self):
+        """Player currently walking, or ``None`` while waiting for dice."""
+        if self.state.phase in (rules.MOVE, rules.BRANCH):
+            return self.state.players[self.state.active]
+        return None
+
+    @property
+    def active_bot(self):
+        """Bot of the player whose turn it is (``None`` for humans)."""
+        return self.state.players[self.state.active].bot
+
+    @property
+    def awaiting_choice(self):
+        return self.state.phase == rules.BRANCH
+
+    @property
+    def branch_options(self):
+        return self.state.branch_options
+
+    def is_local(self, player):
+        """Whether this screen's keyboard and mouse play for ``player``."""
+        return player.bot is None
+
+    @property
+    def all_bots(self):
+        """Every seat is a bot played by this process (a demo game)."""
+        return self.local_bots and all(p.bot is not None for p in self.players)
+
+    def turns_per_second(self):
+        times = self.turn_times
+        now = time.perf_counter()
+        while times and now - times[0] > 2.0:
+            times.popleft()
+        return len(times) / max(now - times[0], 0.5) if times else 0.0
+
+    # ── engine plumbing ───────────────────────────────────────────────
+    def submit(self, action):
+        """A decision taken on this screen (the network client sends it instead)."""
+        return self._step(action)
+
+    def sync(self, dt):
+        """Bring the engine up to date with the outside world (network games)."""
+
+    def _step(self, action):
+        """Send ``action`` to the engine and react to the resulting events."""
+        events = self.engine.step(action)
+        if self.state.phase == rules.ROLL and not self.state.dice:
+            self.autosave()                 # a turn (or a gate round) just ended
+        if self.state.n_turns != self._turns_seen:
+            self._turns_seen = self.state.n_turns
+            self.turn_times.append(time.perf_counter())
+        return self.react(events)
+
+    def _show_roll(self):
+        """Put the engine's last roll in the HUD."""
+        index, d1, d2, total = self.state.last_roll
+        player = self.state.players[index]
+        self.last_roll = (player.name or f"P{player.slot+1}", d1, d2, total)
+
+    def react(self, events):
+        """Update the view (and switch scenes) for the events of a step."""
+        for event in events:
+            kind = event[0]
+            if kind == "dice":
+                # play dice roll sound
+                if not self.turbo:
+                    self.dice_sound.play()
+                if len(self.state.dice) == 2:
+                    self._show_roll()
+                    self.move_timer = 0
+            elif kind == "move":
+                self.move_timer = self.MOVE_DELAY
+            elif kind == "star":
+                # keep the drawn board in sync with the star's new tile
+                _, _, old, new = event
+                self.g.nodes[old]["type"] = 1
+                if new is not None:
+                    self.g.nodes[new]["type"] = 4
+            elif kind == "game_over":
+                self._save_replay()
+                self._clear_autosave()
+                from super_quantum_party.scenes.winner import WinnerScene
+                self.manager.go_to(WinnerScene(self.manager, self.players))
+            elif kind == "topology":
+                # the gate round is over: back to the board
+                self.apply_measurement(event[1])
+                if self.manager.scene is not self:
+                    self.manager.go_to(self)
+            elif kind == "gate_round" and not (self.turbo and self.all_bots):
+                from super_quantum_party.scenes.gate import GateScene
+                # Passe la liste des joueurs telle quelle, sans tri supplémentaire
+                self.manager.go_to(GateScene(
+                    self.manager, self.players, self.n_turns, self.map_module,
+                    previous_scene=self
+                ))
+        return events
+
+    def _save_replay(self):
+        if self.recorder is None:
+            return
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        from super_quantum_party.core.replay import REPLAY_SUFFIX
+        path = os.path.join(RECORD_DIR, time.strftime("%Y%m%d-%H%M%S") + REPLAY_SUFFIX)
+        self.recorder.save(path)
+        print(f"replay saved to {path}")
+
+    def autosave(self):
+        """Save the game to ``settings.AUTOSAVE`` (between two turns)."""
+        if not AUTOSAVE or not self.AUTOSAVES or not hasattr(self.map_module, "load"):
+            return
+        from super_quantum_party.core import snapshot
+        snapshot.save_game(AUTOSAVE, self.engine, self.map_module.name,
+                           self.map_module.load().digest)
 
-    # ── simple navigation demo ─────────────────────────────────────────
-    def _start_move(self, player, steps):
-        """Begin walking ``steps`` spaces with animation."""
-        self.moving_player = player
-        self.steps_remaining = steps
-        self.move_timer = 0
-        self.awaiting_choice = False
-        self.branch_options = []
-        self.branch_index = 0
+    def _clear_autosave(self):
+        """A finished game is not resumable: drop its save."""
+        if AUTOSAVE and self.AUTOSAVES and os.path.exists(AUTOSAVE):
+            os.remove(AUTOSAVE)
 
-    def _check_star(self, node_id, player):
-        """Handle star collection when ``player`` lands on ``node_id``."""
-        if self.g.nodes[node_id].get("type") == 4:
-            player.add_stars(1)
-            self.g.nodes[node_id]["type"] = 1
-            candidates = [
-                n for n, d in self.g.nodes(data=True)
-                if d.get("type") == 1 and n != node_id
-            ]
-            if candidates:
-                new_star = random.choice(candidates)
-                self.g.nodes[new_star]["type"] = 4
+    def _roll_one_die(self):
+        """Roll a single die; the second one starts the walk."""
+        if self.state.phase == rules.ROLL:
+            self.submit(rules.ROLL_DIE)
 
     # ── board manipulation based on minigame results ────────────────
     def apply_measurement(self, result: str | None):
-        """Apply measurement outcome from the gate minigame to the board."""
-        # reset edges to their original configuration
-        self.g.remove_edges_from(list(self.g.edges()))
-        self.g.add_edges_from(self._base_edges)
+        """Apply measurement outcome from the gate minigame to the board.
 
-        if not result or result == "00":
-            return
-
-        if result == "11":
-            reversed_edges = [(v, u) for u, v in self._base_edges]
-            self.g.remove_edges_from(list(self.g.edges()))
-            self.g.add_edges_from(reversed_edges)
-            return
-
-        # result is 01 or 10
-        restrict_first = result == "01"
-        for n, data in list(self.g.nodes(data=True)):
-            if data.get("type") == 3:
-                succ = sorted(self.g.successors(n))
-                if len(succ) >= 2:
-                    edge_to_remove = succ[0] if restrict_first else succ[1]
-                    if self.g.has_edge(n, edge_to_remove):
-                        self.g.remove_edge(n, edge_to_remove)
-
-    def _end_move(self):
-        current = self.moving_player.position
-        node_type = self.g.nodes[current].get("type")
-        if node_type == 1:
-            available = ["X", "Y", "Z", "SX", "H", "SWAP", "CNOT"]
-            for _ in range(random.randint(1, 4)):
-                gate = random.choice(available)
-                self.moving_player.add_gates(gate)
-        self.moving_player = None
-        self.steps_remaining = 0
-        self.pending_rolls.clear()
-        self.active_idx = (self.active_idx + 1) % len(self.players)
-        if self.active_idx == 0:
-            self.n_turns -= 1
-            if self.n_turns <= 0:
-                from super_quantum_party.scenes.winner import WinnerScene
-                self.manager.go_to(WinnerScene(self.manager, self.players))
-            else:
-                try:
-                    from super_quantum_party.scenes.gate import GateScene
-                    # Passe la liste des joueurs telle quelle, sans tri supplémentaire
-                    self.manager.go_to(GateScene(
-                        self.manager, self.players, self.n_turns, self.map_module,
-                        previous_scene=self
-                    ))
-                except Exception as e:
-                    print(f"Erreur lors de la transition vers GateScene : {e}")
-                    raise
+        ``00`` keeps the original edges, ``11`` reverses them all and
+        ``01``/``10`` close one path at every intersection.
+        """
+        self.topology = result if result in self._topologies else "00"
+        self.g.remove_edges_from(list(self.g.edges()))
+        self.g.add_edges_from(self._topologies[self.topology])
 
-    def _roll_one_die(self):
-        """Roll a single die and store the result."""
-        value = quantum_walk_roll()
-        # play dice roll sound
-        self.dice_sound.play()
-        self.pending_rolls.append(value)
-
-        # When both dice are rolled, start walking animation
-        if len(self.pending_rolls) == 2 and self.moving_player is None:
-            player = self.players[self.active_idx]
-            d1, d2 = self.pending_rolls
-            steps = d1 + d2
-            self.last_roll = (
-                player.name or f"P{player.slot+1}", d1, d2, steps
-            )
-            self._start_move(player, steps)
+    def reload_map(self, new_graph: nx.DiGraph):
+        """Patch an edited version of the board into the running game."""
+        diff = hotreload.diff_graph(self.g, self._base_edges, new_graph)
+        if diff:
+            hotreload.apply_diff(self, diff)
+            self.engine.set_board(Board.from_graph(self.g, self._topologies))
+            self.branch_index = 0
+            print(f">>> map reloaded: {diff}")
 
     def handle_event(self, e):
+        if e.type == pygame.QUIT:
+            pygame.quit(); sys.exit()
+
         if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
             from super_quantum_party.scenes.menu import MenuScene
             self.manager.go_to(MenuScene(self.manager))
-        elif self.moving_player is None:
+        elif e.type == pygame.KEYDOWN and e.key == pygame.K_t and self.local_bots:
+            self.turbo = not self.turbo
+        elif not self.is_local(self.state.players[self.state.active]):
+            pass  # bots (or remote players) play their own turn
+        elif self.state.phase == rules.ROLL:
             roll_keys = (pygame.K_SPACE, pygame.K_RETURN, pygame.K_r)
             if self.roll_button.handle_event(e) or (e.type == pygame.KEYDOWN and e.key in roll_keys):
                 self._roll_one_die()
@@ -197,31 +316,16 @@ class GameScene(Scene):
                 self.branch_index = (self.branch_index + 1) % len(self.branch_options)
             elif e.key in (pygame.K_RETURN, pygame.K_SPACE):
                 next_node = self.branch_options[self.branch_index]
-                self.moving_player.position = next_node
-                self._check_star(next_node, self.moving_player)
-                self.steps_remaining -= 1
-                self.awaiting_choice = False
-                self.move_timer = self.MOVE_DELAY
-                if self.steps_remaining <= 0:
-                    self._end_move()
-            return
-
-        if self.moving_player is None:
-            if e.type == pygame.KEYDOWN and e.key in (pygame.K_SPACE, pygame.K_RETURN):
-                self._roll_one_die()
-            if self.roll_button.handle_event(e):
-                self._roll_one_die()
-
-
-        if self.roll_button.handle_event(e):
-            self._roll_one_die()
-
-        if e.type == pygame.QUIT:
-            pygame.quit(); sys.exit()
-
-        
+                self.branch_index = 0
+                self.submit(rules.branch(next_node))
 
     def update(self, dt):
+        if self.map_watcher is not None:
+            new_graph = self.map_watcher.poll(dt)
+            if new_graph is not None:
+                self.reload_map(new_graph)
+
+        self.sync(dt)
         keys = pygame.key.get_pressed()
         spd = self.CAM_SPEED * dt / self.zoom
         if keys[pygame.K_LEFT]:  self.cam_x += spd
@@ -229,24 +333,38 @@ class GameScene(Scene):
         if keys[pygame.K_UP]:    self.cam_y += spd
         if keys[pygame.K_DOWN]:  self.cam_y -= spd
 
-        if self.moving_player and not self.awaiting_choice:
+        if self.turbo:
+            self._update_turbo()
+        elif self.state.phase == rules.MOVE:
             self.move_timer -= dt
             if self.move_timer <= 0:
-                current = self.moving_player.position
-                succ = list(self.g.successors(current))
-                if not succ:
-                    self._end_move()
-                elif len(succ) > 1:
-                    self.awaiting_choice = True
-                    self.branch_options = succ
-                    self.branch_index = 0
-                else:
-                    self.moving_player.position = succ[0]
-                    self._check_star(succ[0], self.moving_player)
-                    self.steps_remaining -= 1
-                    self.move_timer = self.MOVE_DELAY
-                    if self.steps_remaining <= 0:
-                        self._end_move()
+                self._step(rules.ADVANCE)
+        elif self.local_bots and self.active_bot is not None and \
+                self.state.phase in (rules.ROLL, rules.BRANCH):
+            self.bot_timer -= dt
+            if self.bot_timer <= 0:
+                self.bot_timer = self.BOT_DELAY
+                self._step(self.active_bot.act(self.engine, self.engine.legal_actions()))
+
+    def _update_turbo(self):
+        """Play forced steps and bot decisions at once, stopping between turns."""
+        deadline = time.perf_counter() + self.TURBO_FRAME
+        while self.manager.scene is self and not self.engine.is_over():
+            s = self.state
+            if s.phase == rules.MOVE:
+                self._step(rules.ADVANCE)
+                continue
+            bot = None
+            if s.phase == rules.GATES:
+                bot = bots.acting_player(self.engine).bot if self.all_bots else None
+            elif self.local_bots:
+                bot = self.active_bot
+            if bot is None:
+                return                      # a human decides
+            self._step(bot.act(self.engine, self.engine.legal_actions()))
+            if s.phase == rules.ROLL and not s.dice and \
+                    (not self.all_bots or time.perf_counter() > deadline):
+                return
 
     # ── drawing helpers ────────────────────────────────────────────────
     def _draw_edges(self, s):
@@ -302,10 +420,14 @@ class GameScene(Scene):
         # draw players on top of nodes
         self._draw_players(s)
 
+    def _pawn_pos(self, p):
+        """Board coordinates at which ``p`` is drawn."""
+        return self.g.nodes[p.position]["pos"]
+
     def _draw_players(self, s):
         # Draw each player centred on their current node
         for idx, p in enumerate(self.players):
-            x, y = self.g.nodes[p.position]["pos"]
+            x, y = self._pawn_pos(p)
             x = x * self.zoom + self.cam_x
             y = y * self.zoom + self.cam_y
             if p.sprite:
@@ -331,6 +453,8 @@ class GameScene(Scene):
         # HUD showing whose turn and last roll
         turn_name = self.players[self.active_idx].name or f"P{self.players[self.active_idx].slot+1}"
         hud = f"Turn: {turn_name}"
+        if self.active_bot is not None:
+            hud += f" ({self.active_bot.level} bot)"
         if self.last_roll:
             name,d1,d2,total = self.last_roll
             hud += f"  |  {name} rolled {d1}+{d2}->{total}"  # replaced Unicode arrow
@@ -341,19 +465,23 @@ class GameScene(Scene):
 
         zoom_txt = self.font.render(f"Zoom: {self.zoom:.1f}x", True, BLACK)
         s.blit(zoom_txt, (WIDTH - zoom_txt.get_width() - 10, 30))
+        if self.turbo:
+            tps = self.font.render(f"Turbo: {self.turns_per_second():.1f} turns/s", True, BLACK)
+            s.blit(tps, (WIDTH - tps.get_width() - 10, 50))
 
         # Display stars and gate counts for each player
         for i, p in enumerate(self.players):
-            gates = ", ".join(f"{g}:{c}" for g,c in p.gates.items())
+            gates = ", ".join(f"{g}:{c}" for g,c in p.gates.items() if c)
             text = f"{p.name}: {p.stars}* | {gates}"  # replaced Unicode star
             info = self.font.render(text, True, BLACK)
             s.blit(info, (10, 40 + i*20))
 
-        # Roll button only when not walking
-        if self.moving_player is None:
+        # Roll button only when not walking (and a human is to roll)
+        local = self.is_local(self.state.players[self.active_idx])
+        if self.moving_player is None and local and self.state.phase == rules.ROLL:
             self.roll_button.draw(s)
 
-        if self.awaiting_choice:
+        if self.awaiting_choice and local:
             opts = [
                 ("["+n+"]" if i==self.branch_index else n)
                 for i,n in enumerate(self.branch_options)
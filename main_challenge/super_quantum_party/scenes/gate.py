@@ -1,63 +1,105 @@
 import pygame
 import sys
-from .gateGame.CircuitSimulator import CircuitSimulator
 from .gateGame.GameUI import GameUI
-from qiskit import QuantumCircuit
-from qiskit_aer.noise import NoiseModel, depolarizing_error
 
 from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK, GREEN
 from super_quantum_party.core.scene import Scene
+from super_quantum_party.core import assets, density
+from super_quantum_party.core import engine as rules
 from super_quantum_party.ui.widgets import Button
 
 class GateScene(Scene):
+    """
+    View of the gate minigame round run by the ``GameScene``'s rules engine.
+    Mouse input is translated into ``place``/``skip``/``measure``/``continue``
+    engine actions.
+    """
     GATE_COLORS = {"H": (200,200,255),"Z": (255,200,200),"Y": (200,255,200),"X": (255,255,200),"CNOT": (200,255,255),"SWAP": (255,200,255), "DECOH": (120,120,120)}
-    GATE_LIST = ["H","Z","Y","X","CNOT","SWAP"]
+    GATE_LIST = list(rules.PLACEABLE_GATES)
     MAX_GATES = 20
+    BOT_DELAY = 0.8   # seconds between two bot moves
+    FONT = assets.font_asset(None, 32)
+    SMALL_FONT = assets.font_asset(None, 24)   # CNOT and SWAP labels
+    ASSETS = [FONT, SMALL_FONT]
 
     def __init__(self, manager, players, n_turns, map_module, previous_scene=None):
         super().__init__(manager)
-        self.players = players
+        if previous_scene is None:
+            from super_quantum_party.scenes.game import GameScene
+            previous_scene = GameScene(manager, players, n_turns, map_module)
+        # reference to the GameScene to return to, and its rules engine
+        self.previous_scene = previous_scene
+        self.engine = previous_scene.engine
+        if self.engine.state.phase != rules.GATES:
+            self.engine.start_gate_round()
+        self.players = self.engine.players
         self.n_turns = n_turns
         self.map_module = map_module
-        # reference to the GameScene to return to
-        self.previous_scene = previous_scene
-        # Always ensure all gates are present for each player
-        for p in self.players:
-            if not hasattr(p, "gates") or not isinstance(p.gates, dict):
-                p.gates = {gate: 2 for gate in self.GATE_LIST}
-            else:
-                # Add missing gates with value 0
-                for gate in self.GATE_LIST:
-                    if gate not in p.gates:
-                        p.gates[gate] = 0
-        self.current_player = 0
-        self.skipped_players = set()
         self.gate_rects = {}
         for i, gate in enumerate(self.GATE_LIST):
             self.gate_rects[gate] = pygame.Rect(30, 50 + i*60, 80, 40)
-        self.qiskit_circuit = CircuitSimulator.create_empty_circuit()
-        self.gate_history = [("H", 0), ("H", 1, "layer0")]
         self.dragging_gate = None
         self.drag_offset = (0,0)
         self.drag_pos = (0,0)
-        self.measurement_result = None
         self.measurement_probs = None
-        self.font = pygame.font.SysFont(None, 32)
+        self.font = self.resource(self.FONT)
+        self.resource(self.SMALL_FONT)
         self.WIDTH = WIDTH
         self.HEIGHT = HEIGHT
         self.continue_button = Button("Continue", (self.WIDTH - 180, 30))
+        self.bot_timer = self.BOT_DELAY
+        self._shown_history = None
+        self._refresh_probs()
+
+    # ── views on the engine's gate round ──────────────────────────────
+    @property
+    def round(self):
+        return self.engine.state.round
+
+    @property
+    def gate_history(self):
+        return self.round.history
+
+    @property
+    def current_player(self):
+        return self.round.current
+
+    @property
+    def measurement_result(self):
+        return self.round.result
 
     def get_decoherence_percent(self):
-        decoh_gates = [g for g in self.gate_history if g[0] == "DECOH"]
-        percent = min(100, len(decoh_gates) * 20)
-        return percent
-
-    def next_player(self):
-        n = len(self.players)
-        for _ in range(n):
-            self.current_player = (self.current_player + 1) % n
-            if self.current_player not in self.skipped_players:
-                return
+        return self.round.decoherence_percent
+
+    def _legal(self, action):
+        return action in self.engine.legal_actions()
+
+    def _apply(self, action):
+        """Send a minigame action to the rules (the board scene switches back
+        on ``continue``)."""
+        self.previous_scene.submit(action)
+
+    def _refresh_probs(self):
+        # Met à jour les probabilités après chaque placement de porte
+        if self.round is not None and len(self.gate_history) != self._shown_history:
+            if self._shown_history is not None:
+                self.measurement_probs = density.outcome_probabilities(self.gate_history)
+            self._shown_history = len(self.gate_history)
+
+    def _bot_to_act(self):
+        """Bot that should make the next move, if any.
+
+        A bot plays its own placement turns; measuring and continuing are
+        left to the humans unless every player is a bot.
+        """
+        player = self.players[self.current_player]
+        if player.bot is None or not self.previous_scene.local_bots:
+            return None
+        if self.current_player not in self.round.skipped:
+            return player.bot
+        if all(p.bot is not None for p in self.players):
+            return player.bot
+        return None
 
     def handle_event(self, event):
         if event.type == pygame.QUIT:
@@ -69,8 +111,8 @@ class GateScene(Scene):
             skip_btn_rect = pygame.Rect(self.WIDTH - 350, self.HEIGHT - 300, 120, 50)  # juste sous la mesure
             btn_rect = pygame.Rect(self.WIDTH - 180, self.HEIGHT - 300, 150, 50)      # juste sous la mesure
             if skip_btn_rect.collidepoint(mx, my):
-                self.skipped_players.add(self.current_player)
-                self.next_player()
+                if self._legal(rules.SKIP) and self._may_place():
+                    self._apply(rules.SKIP)
                 self.dragging_gate = None
                 self.drag_pos = (0,0)
                 return
@@ -79,79 +121,47 @@ class GateScene(Scene):
                     self.dragging_gate = gate
                     self.drag_offset = (mx - rect.x, my - rect.y)
                     self.drag_pos = (mx, my)
-            if btn_rect.collidepoint(mx, my):
-                percent = self.get_decoherence_percent()
-                noise_model = CircuitSimulator.apply_decoherence_noise(self.qiskit_circuit, percent)
-                self.measurement_result = CircuitSimulator.apply_circuit(self.qiskit_circuit, noise_model=noise_model, gate_history=self.gate_history)
-                # Ne pas mettre à jour self.measurement_probs ici !
+            if btn_rect.collidepoint(mx, my) and self._legal(rules.MEASURE):
+                self._apply(rules.MEASURE)
         elif event.type == pygame.MOUSEBUTTONUP:
             if self.dragging_gate:
                 mx, my = event.pos
                 base_x = 200
                 gate_layer = max(0, len(self.gate_history) - 2)
                 drop_x = base_x + (gate_layer+2)*60
-                dropped = False
                 base_y = 100  # Correction pour aligner avec le circuit
                 for q in range(2):
                     y = base_y + q*60
                     if drop_x-20 < mx < drop_x+20 and y-20 < my < y+20:
-                        if self.dragging_gate == "CNOT":
-                            control = q
-                            target = 1 - q
-                            self.qiskit_circuit.cx(control, target)
-                            self.gate_history.append(("CNOT", control, target))
-                            self.players[self.current_player].gates["CNOT"] -= 1
-                            self.next_player()
-                            self.measurement_result = None
-                            dropped = True
-                            break
-                        elif self.dragging_gate == "SWAP":
-                            self.qiskit_circuit.swap(0, 1)
-                            self.gate_history.append(("SWAP", 0, 1))
-                            self.players[self.current_player].gates["SWAP"] -= 1
-                            self.next_player()
-                            self.measurement_result = None
-                            dropped = True
-                            break
-                        else:
-                            if self.dragging_gate == "H":
-                                self.qiskit_circuit.h(q)
-                            elif self.dragging_gate == "X":
-                                self.qiskit_circuit.x(q)
-                            elif self.dragging_gate == "Y":
-                                self.qiskit_circuit.y(q)
-                            elif self.dragging_gate == "Z":
-                                self.qiskit_circuit.z(q)
-                            self.gate_history.append((self.dragging_gate, q))
-                            self.players[self.current_player].gates[self.dragging_gate] -= 1
-                            self.next_player()
-                            self.measurement_result = None
-                            dropped = True
-                            break
-                placed_gates = [g for g in self.gate_history[2:] if g[0] != "DECOH"]
-                if len(placed_gates) > 0 and len(placed_gates) % 4 == 0:
-                    self.gate_history.append(("DECOH", None))
-                # Met à jour les probabilités après chaque placement de porte
-                percent = self.get_decoherence_percent()
-                noise_model = CircuitSimulator.apply_decoherence_noise(self.qiskit_circuit, percent)
-                self.measurement_probs = CircuitSimulator.get_probabilities(self.qiskit_circuit, noise_model=noise_model, gate_history=self.gate_history)
+                        action = rules.place(self.dragging_gate, 0 if self.dragging_gate == "SWAP" else q)
+                        if self._legal(action) and self._may_place():
+                            self._apply(action)
+                        break
                 self.dragging_gate = None
                 self.drag_pos = (0,0)
         elif event.type == pygame.MOUSEMOTION:
             if self.dragging_gate:
                 self.drag_pos = event.pos
-        if self.continue_button.handle_event(event):
-            if self.previous_scene is not None:
-                self.previous_scene.apply_measurement(self.measurement_result or "00")
-                self.manager.go_to(self.previous_scene)
-            else:
-                from super_quantum_party.scenes.game import GameScene
-                self.manager.go_to(
-                    GameScene(self.manager, self.players, self.n_turns, self.map_module)
-                )
+        if self.continue_button.handle_event(event) and self._legal(rules.CONTINUE):
+            self._apply(rules.CONTINUE)
+
+    def _may_place(self):
+        """Whether the player placing gates now sits at this screen."""
+        return self.previous_scene.is_local(self.players[self.current_player])
 
     def update(self, dt):
-        pass  # No time-based updates needed for this minigame
+        self.previous_scene.sync(dt)
+        if self.manager.scene is not self:
+            return                      # the round ended while syncing
+        self._refresh_probs()
+        bot = self._bot_to_act()
+        if bot is None:
+            self.bot_timer = self.BOT_DELAY
+            return
+        self.bot_timer -= dt
+        if self.bot_timer <= 0 or self.previous_scene.turbo:
+            self.bot_timer = self.BOT_DELAY
+            self._apply(bot.act(self.engine, self.engine.legal_actions()))
 
     def draw(self, screen):
         screen.fill((240,240,240))
@@ -2,6 +2,8 @@ from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 from qiskit_aer.noise import NoiseModel, depolarizing_error
 
+from super_quantum_party.core import jobs
+
 class CircuitSimulator:
 
     def create_empty_circuit():
@@ -42,7 +44,7 @@ class CircuitSimulator:
             noise_model.add_all_qubit_quantum_error(single_qubit_error, ['h', 'x', 'y', 'z'])
             
             # Apply depolarizing error to two-qubit gates
-            two_qubit_error = depolarizing_error(error_rate * 2, 2)
+            two_qubit_error = depolarizing_error(min(error_rate * 2, 1.0), 2)
             noise_model.add_all_qubit_quantum_error(two_qubit_error, ['cx', 'swap'])
             
             # Apply depolarizing error to measurements
@@ -72,7 +74,7 @@ class CircuitSimulator:
                 qc_copy.measure(1, 1)
         
         sim = AerSimulator()
-        result = sim.run(qc_copy, noise_model=noise_model, shots=1).result()
+        result = jobs.run(sim, qc_copy, shots=1, noise_model=noise_model)
         counts = result.get_counts()
         # Return the most probable result
         measured = max(counts, key=counts.get)
@@ -87,7 +89,7 @@ class CircuitSimulator:
             noise_model.add_all_qubit_quantum_error(single_qubit_error, ['h', 'x', 'y', 'z'])
             
             # Apply depolarizing error to two-qubit gates
-            two_qubit_error = depolarizing_error(error_rate * 2, 2)  # Scale error for 2-qubit gates
+            two_qubit_error = depolarizing_error(min(error_rate * 2, 1.0), 2)  # Scale error for 2-qubit gates (capped: >1 is invalid)
             noise_model.add_all_qubit_quantum_error(two_qubit_error, ['cx', 'swap'])
             
             # Apply depolarizing error to measurements
@@ -124,7 +126,7 @@ class CircuitSimulator:
                 qc_copy.measure(1, 1)
         sim = AerSimulator()
         # Ne pas passer noise_model ici !
-        result = sim.run(qc_copy, shots=32768).result()
+        result = jobs.run(sim, qc_copy, shots=32768)
         counts = result.get_counts()
         # Normalize to probabilities
         total = sum(counts.values())
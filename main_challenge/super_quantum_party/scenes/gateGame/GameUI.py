@@ -1,5 +1,7 @@
 import pygame
 
+from super_quantum_party.core import assets
+
 class GameUI:
     
     @staticmethod
@@ -32,7 +34,7 @@ class GameUI:
             pygame.draw.rect(screen, GATE_COLORS[gate], rect)
             # Use same font, smaller size, not bold for CNOT and SWAP
             if gate in ("CNOT", "SWAP"):
-                small_font = pygame.font.SysFont(None, 24)
+                small_font = assets.font(None, 24)
                 txt = small_font.render(f"{gate} ({player.gates.get(gate, 0)})", True, (0,0,0))
             else:
                 txt = font.render(f"{gate} ({player.gates.get(gate, 0)})", True, (0,0,0))
@@ -0,0 +1,41 @@
+"""
+Start-up screen shown while ``core.assets`` loads images, sounds and fonts.
+"""
+import sys
+
+import pygame
+
+from super_quantum_party.settings import WIDTH, HEIGHT, BLACK, WHITE, GREEN
+from super_quantum_party.core import assets
+from super_quantum_party.core.scene import Scene
+from super_quantum_party.ui import widgets
+
+
+class LoadingScene(Scene):
+    """Progress bar over the preloads; then switches to ``make_next(manager)``."""
+    BAR = pygame.Rect(WIDTH // 4, HEIGHT // 2, WIDTH // 2, 24)
+
+    def __init__(self, manager, make_next, preload=()):
+        super().__init__(manager)
+        self.make_next = make_next
+        assets.preload(preload)
+        self.done, self.total = assets.poll()
+
+    def handle_event(self, e):
+        if e.type == pygame.QUIT:
+            pygame.quit(); sys.exit()
+
+    def update(self, dt):
+        self.done, self.total = assets.poll()
+        if self.done == self.total:
+            self.manager.go_to(self.make_next(self.manager))
+
+    def draw(self, s):
+        s.fill(WHITE)
+        title = widgets.FONT_M.render("Loading ...", True, BLACK)
+        s.blit(title, title.get_rect(midbottom=(WIDTH // 2, self.BAR.top - 12)))
+        pygame.draw.rect(s, BLACK, self.BAR, 2)
+        if self.total:
+            fill = self.BAR.inflate(-6, -6)
+            fill.width = round(fill.width * self.done / self.total)
+            pygame.draw.rect(s, GREEN, fill)
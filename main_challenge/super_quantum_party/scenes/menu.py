@@ -1,11 +1,12 @@
-import pygame, sys
-from super_quantum_party.settings import BLACK, WHITE, GREEN, MAP_FILES, MAP_THUMBS, WIDTH, HEIGHT
+import pygame, sys, os
+from super_quantum_party.settings import BLACK, WHITE, GREEN, MAP_FILES, MAP_THUMBS, WIDTH, HEIGHT, AUTOSAVE
 from super_quantum_party.models.player import Player
 from super_quantum_party.ui import widgets                   
 from super_quantum_party.core.scene import Scene
 from super_quantum_party.scenes.game import GameScene  
-   
-from importlib import import_module
+from super_quantum_party.maps import registry
+from super_quantum_party.core import assets, bots, bundle, snapshot
+from super_quantum_party.core.board import Board
 
 
 TextInput   = widgets.TextInput          
@@ -13,16 +14,30 @@ DropDown    = widgets.DropDown
 ToggleGroup = widgets.ToggleGroup
 ImageSelect = widgets.ImageSelect
 Button      = widgets.Button
+
+
+def map_thumbnail(idx):
+    """The menu picture of ``MAP_FILES[idx]``: its PNG, or one drawn from its YAML."""
+    png = MAP_THUMBS[idx] if idx < len(MAP_THUMBS) else None
+    if png and bundle.exists(png):
+        return assets.image_asset(png, ImageSelect.THUMB_SIZE)
+    return assets.map_asset(MAP_FILES[idx], ImageSelect.THUMB_SIZE)
+
+
 class MenuScene(Scene):
+    BACKGROUND = "super_quantum_party/resources/superquantumparty.png"
+    MUSIC = "super_quantum_party/resources/audio/menu_music.mp3"
+    THUMBNAILS = [map_thumbnail(i) for i in range(len(MAP_FILES))]
+    ASSETS = [assets.image_asset(BACKGROUND, (WIDTH, HEIGHT)), assets.music_asset(MUSIC)] + THUMBNAILS
+
     def __init__(self, manager):
         super().__init__(manager)
 
         # background image
-        self.background = pygame.image.load("super_quantum_party/resources/superquantumparty.png")
-        self.background = pygame.transform.scale(self.background, (WIDTH, HEIGHT))
+        self.background = self.resource(assets.image_asset(self.BACKGROUND, (WIDTH, HEIGHT)))
 
         # ── background music ────────────────────────────────────────────
-        pygame.mixer.music.load("super_quantum_party/resources/audio/menu_music.mp3")
+        pygame.mixer.music.load(assets.music(self.MUSIC), "mp3")
         pygame.mixer.music.play(-1)
         pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
 
@@ -30,42 +45,63 @@ class MenuScene(Scene):
         self.players_ui=[]
 
         self.turn_toggle = ToggleGroup((300,420), [10,15,20,25])
-        self.map_select  = ImageSelect(MAP_THUMBS, (264, 450))
+        self.map_select  = ImageSelect(self.THUMBNAILS, (264, 450), load=self.resource)
         self.play_btn    = Button("Play!", (900,500))
+        # resume the autosaved game, if there is one
+        self.continue_btn = Button("Continue", (900,590)) if AUTOSAVE and os.path.exists(AUTOSAVE) else None
 
         order_opts=[1,2,3,4]
+        control_opts=["Human"] + [level.capitalize() for level in bots.BOT_LEVELS]
         # Keep all drop downs vertically aligned
         for id in range(4):
             idx = 3-id
             y=180+idx*45
             name = TextInput((150,y,180,28), f"Player {idx+1}")
             prio = DropDown((455, y, 60, 28), order_opts, idx+1)
-            self.players_ui.append((name, prio))
+            ctrl = DropDown((535, y, 130, 28), control_opts, "Human")
+            self.players_ui.append((name, prio, ctrl))
 
         self.all_players = [Player(i) for i in range(4)]
 
     # ─── helper ──────────────────────────────────────────────────────
     def _collect_menu_data(self):
-        for p,(name_ui,dd) in zip(self.all_players, self.players_ui):
+        for p,(name_ui,dd,ctrl) in zip(self.all_players, self.players_ui):
             p.set_name(name_ui.text or f"Player{p.slot+1}")
             p.set_turn_priority(dd.value)
+            p.bot = bots.make_bot(ctrl.value)
         return self.all_players, self.turn_toggle.value
 
+    def _resume(self):
+        """GameScene continuing the autosaved game (``None`` if it cannot be loaded)."""
+        try:
+            map_name, _, blob = snapshot.read_save(AUTOSAVE)
+            map_module = registry.get_map(map_name)
+            saved = snapshot.from_snapshot(blob, Board.from_compiled(map_module.load()))
+        except (OSError, KeyError, snapshot.SnapshotError) as err:
+            print(f">>> cannot resume {AUTOSAVE}: {err}")
+            return None
+        return GameScene(self.manager, saved.players, saved.state.n_turns, map_module,
+                         resume=blob)
+
     # ─── Scene overrides ────────────────────────────────────────────
     def handle_event(self, e):
-        for n,d in self.players_ui: n.handle_event(e); d.handle_event(e)
+        for n,d,c in self.players_ui: n.handle_event(e); d.handle_event(e); c.handle_event(e)
         self.turn_toggle.handle_event(e); self.map_select.handle_event(e)
 
         if self.play_btn.handle_event(e):
             pygame.mixer.music.stop()
             players, n_turns = self._collect_menu_data()
             idx         = self.map_select.index        # 0,1,2…
-            module_path = MAP_FILES[idx]               # maps.example_map
-            map_module  = import_module(module_path)   # real Python module
+            map_module  = registry.get_map(MAP_FILES[idx])  # compiled map entry
             self.manager.go_to(
                 GameScene(self.manager, players, n_turns, map_module)
             )
 
+        elif self.continue_btn is not None and self.continue_btn.handle_event(e):
+            scene = self._resume()
+            if scene is not None:
+                pygame.mixer.music.stop()
+                self.manager.go_to(scene)
 
         if e.type == pygame.QUIT:
             pygame.mixer.music.stop()
@@ -92,9 +128,12 @@ class MenuScene(Scene):
             s.blit(widgets.FONT_S.render(f"Player {i+1} :",True,BLACK),(65,y+4))
             s.blit(widgets.FONT_S.render("Turn Priority:",True,BLACK),(350,y+4))
 
-        for n,d in self.players_ui: n.draw(s); d.draw(s)
+        # draw bottom rows first so open drop downs stay on top
+        for n,d,c in self.players_ui: n.draw(s); d.draw(s); c.draw(s)
         s.blit(widgets.FONT_M.render("Number of turns :",True,BLACK),(65,400))
         self.turn_toggle.draw(s)
         s.blit(widgets.FONT_M.render("Map selection :",True,BLACK),(65,450))
         self.map_select.draw(s)
         self.play_btn.draw(s)
+        if self.continue_btn is not None:
+            self.continue_btn.draw(s)
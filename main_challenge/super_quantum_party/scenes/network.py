@@ -0,0 +1,173 @@
+"""
+Scenes of a LAN game (``python -m super_quantum_party --join HOST``).
+
+``LobbyScene`` waits for the server to fill the table; ``NetGameScene`` is a
+``GameScene`` whose engine is a ``net.client.Mirror`` of the server's game:
+decisions taken on this screen are sent to the server, and the steps the
+server broadcasts are played into the mirror, paced like local moves.
+
+The view hides the round trip: pawns glide between tiles instead of
+jumping, a branch chosen here starts moving the pawn before the server has
+confirmed it, and the camera follows the (predicted) active pawn.
+"""
+import math
+
+import pygame
+
+from super_quantum_party.settings import WIDTH, HEIGHT, BLACK, WHITE
+from super_quantum_party.core import assets, engine as rules, snapshot
+from super_quantum_party.core.scene import Scene
+from super_quantum_party.net import protocol as proto
+from super_quantum_party.net.client import Mirror, load_board
+from super_quantum_party.scenes.game import GameScene
+
+
+class LobbyScene(Scene):
+    """Connected, waiting for the other players to join."""
+
+    def __init__(self, manager, client):
+        super().__init__(manager)
+        self.client = client
+        self.seat = None
+        self.map_module = self.board = None
+        self.names = []
+        self.message = f"connecting to {client.host}:{client.port} ..."
+        self.font = self.resource(assets.font_asset(None, 32))
+
+    def handle_event(self, e):
+        if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+            self.client.close()
+            from super_quantum_party.scenes.menu import MenuScene
+            self.manager.go_to(MenuScene(self.manager))
+
+    def update(self, dt):
+        for kind, payload in self.client.poll():
+            if kind == proto.WELCOME:
+                self.seat, map_name, digest = proto.unpack(payload, "isb")
+                try:
+                    self.map_module, self.board = load_board(map_name, digest)
+                except (KeyError, proto.ProtocolError) as err:
+                    self.message = str(err)
+                    self.client.close()
+                    return
+                self.message = f"waiting for players on {map_name} ..."
+            elif kind == proto.LOBBY:
+                self.names = proto.read_lobby(payload)
+            elif kind == proto.START:
+                self.manager.go_to(NetGameScene(self.manager, self.client, self.seat,
+                                                self.map_module, self.board, payload))
+                return
+            elif kind == proto.ERROR:
+                (self.message,) = proto.unpack(payload, "s")
+            elif kind is None:
+                self.message = "disconnected from the server"
+
+    def draw(self, s):
+        s.fill(WHITE)
+        s.blit(self.font.render(self.message, True, BLACK), (60, 60))
+        for i, name in enumerate(self.names):
+            label = name or "(free)"
+            if i == self.seat:
+                label += "  <- you"
+            s.blit(self.font.render(f"Seat {i + 1}: {label}", True, BLACK), (80, 120 + 40 * i))
+        s.blit(self.font.render("Esc: leave", True, BLACK), (60, HEIGHT - 50))
+
+
+class NetGameScene(GameScene):
+    """Board view of a game run by a LAN server."""
+    REMOTE_DELAY = 0.25    # seconds between two decisions replayed from the server
+    GLIDE = 12.0           # pawn easing rate (1/s)
+    FOLLOW = 4.0           # camera easing rate (1/s)
+    AUTOSAVES = False      # the server's game: not for the local save slot
+
+    def __init__(self, manager, client, seat, map_module, board, start):
+        players = snapshot.from_snapshot(start, board).players
+        super().__init__(manager, players, 1, map_module, resume=start)
+        self.client = client
+        self.seat = seat
+        self.mirror = Mirror(self.engine)
+        self.local_bots = False          # the server plays the bots
+        self.remote_timer = 0.0
+        self.predicted = None            # (slot, node) sent but not confirmed yet
+        self.drawn = {}                  # slot -> board position currently drawn
+        self.follow = True               # camera tracks the active pawn
+        self.status = ""
+        self.pending = False             # a decision is on its way to the server
+
+    def is_local(self, player):
+        return player.slot == self.seat
+
+    # ── network ────────────────────────────────────────────────────────
+    def submit(self, action):
+        if self.pending or not self.mirror.caught_up() or \
+                action not in self.engine.legal_actions():
+            return []
+        self.pending = True
+        if action[0] == "branch":
+            self.predicted = (self.state.players[self.state.active].slot, action[1])
+        self.client.send_action(self.state, action)
+        return []
+
+    def sync(self, dt):
+        for kind, payload in self.client.poll():
+            if kind == proto.DELTA:
+                self.mirror.feed(payload)
+                self.pending = False
+            elif kind == proto.SEAT:
+                self.mirror.seat_to_bot(payload)
+            elif kind == proto.ERROR:
+                (self.status,) = proto.unpack(payload, "s")
+                self.pending, self.predicted = False, None
+            elif kind is None:
+                self.status = "disconnected from the server"
+        # replay the server's decisions, one every REMOTE_DELAY seconds
+        self.remote_timer -= dt
+        if self.state.phase != rules.MOVE and self.remote_timer <= 0:
+            action = self.mirror.next_action()
+            if action is not None:
+                self.remote_timer = self.REMOTE_DELAY
+                self.predicted = None
+                self._step(action)
+
+    # ── latency hiding ─────────────────────────────────────────────────
+    def _target(self, p):
+        """Where ``p`` is, or is about to be if we are waiting for the server."""
+        if self.predicted is not None and self.predicted[0] == p.slot:
+            return self.g.nodes[self.predicted[1]]["pos"]
+        return self.g.nodes[p.position]["pos"]
+
+    def _pawn_pos(self, p):
+        return self.drawn.get(p.slot) or self._target(p)
+
+    def update(self, dt):
+        pressed = pygame.key.get_pressed()
+        if any(pressed[k] for k in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)):
+            self.follow = False
+        super().update(dt)
+        if self.manager.scene is not self:
+            return
+        # ease the drawn pawns towards their (predicted) tiles
+        k = 1 - math.exp(-self.GLIDE * dt)
+        for p in self.players:
+            tx, ty = self._target(p)
+            x, y = self.drawn.get(p.slot, (tx, ty))
+            self.drawn[p.slot] = (x + (tx - x) * k, y + (ty - y) * k)
+        if self.follow:
+            x, y = self.drawn[self.state.players[self.state.active].slot]
+            k = 1 - math.exp(-self.FOLLOW * dt)
+            self.cam_x += (WIDTH / 2 - x * self.zoom - self.cam_x) * k
+            self.cam_y += (HEIGHT / 2 - y * self.zoom - self.cam_y) * k
+
+    def handle_event(self, e):
+        if e.type == pygame.KEYDOWN and e.key == pygame.K_f:
+            self.follow = True
+        elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
+            self.client.close()
+        super().handle_event(e)
+
+    def draw(self, s):
+        super().draw(s)
+        if self.status:
+            img = self.font.render(self.status, True, (160, 0, 0))
+            s.blit(img, (10, HEIGHT - 60))
+
@@ -3,6 +3,7 @@ from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 
 from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK
+from super_quantum_party.core import assets, jobs
 from super_quantum_party.core.scene import Scene, SceneManager
 from super_quantum_party.ui.widgets import Button
 
@@ -10,7 +11,7 @@ class QuantumCoinScene(Scene):
     """Simple coin flip using Qiskit AerSimulator."""
     def __init__(self, manager):
         super().__init__(manager)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = self.resource(assets.font_asset(None, 48))
         self.result = None
         self.button = Button("Flip", (WIDTH//2, HEIGHT//2))
 
@@ -19,7 +20,7 @@ class QuantumCoinScene(Scene):
         qc.h(0)
         qc.measure(0, 0)
         sim = AerSimulator()
-        counts = sim.run(qc).result().get_counts()
+        counts = jobs.run(sim, qc).get_counts()
         # get most probable bit (since only one shot)
         self.result = max(counts, key=counts.get)
 
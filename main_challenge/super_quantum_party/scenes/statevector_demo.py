@@ -1,73 +1,107 @@
+import argparse
 import pygame, sys
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector
-from qiskit.visualization import plot_bloch_vector
+import numpy as np
 
-import matplotlib.pyplot as plt
-
-from settings import WIDTH, HEIGHT, WHITE, BLACK
+from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK, GREEN
+from super_quantum_party.core import assets
+from super_quantum_party.core.density import SINGLE
 from super_quantum_party.core.scene import Scene, SceneManager
+from super_quantum_party.ui.bloch import BlochSphere, bloch_vectors
 
 class StatevectorDemo(Scene):
-    """Simple interactive demo manipulating a single-qubit state."""
-    def __init__(self, manager):
+    """Interactive demo: gates on a few qubits, each shown on its Bloch sphere.
+
+    The statevector is a NumPy array in Qiskit's basis order; every sphere
+    shows its qubit's reduced state, so entangled qubits get short arrows.
+    """
+    GATE_KEYS = {pygame.K_h: "H", pygame.K_x: "X", pygame.K_y: "Y", pygame.K_z: "Z",
+                 pygame.K_s: "SX"}
+
+    def __init__(self, manager, n_qubits=1):
         super().__init__(manager)
-        self.font = pygame.font.SysFont(None, 36)
-        self.state = Statevector([1, 0])
-        self.image = None
-        self._update_image()
-        self.instructions = self.font.render(
-            "Press H/X/Y/Z to apply gate, ESC to exit", True, BLACK)
+        self.font = self.resource(assets.font_asset(None, 36))
+        self.n_qubits = n_qubits
+        self.selected = 0
+        self.state = np.zeros(2 ** n_qubits, dtype=complex)
+        self.state[0] = 1
+        radius = min(150, (WIDTH - 40) // (2 * n_qubits) - 40)
+        self.spheres = [BlochSphere(radius) for _ in range(n_qubits)]
+        help_ = "H/X/Y/Z/S: gate"
+        if n_qubits > 1:
+            help_ += ", Left/Right: qubit, C: CNOT to the next qubit"
+        self.instructions = self.font.render(help_ + ", R: reset, ESC: exit", True, BLACK)
 
-    def _update_image(self):
-        px = float(self.state.expectation_value('X').real)
-        py = float(self.state.expectation_value('Y').real)
-        pz = float(self.state.expectation_value('Z').real)
-        fig = plot_bloch_vector([px, py, pz])
-        fig.savefig("/tmp/state.png")
-        plt.close(fig)
-        self.image = pygame.image.load("/tmp/state.png").convert_alpha()
+    # ── statevector ────────────────────────────────────────────────────
+    def _axis(self, q):
+        return self.n_qubits - 1 - q                # qubit q's axis in the reshaped state
 
     def _apply(self, gate):
-        qc = QuantumCircuit(1)
-        getattr(qc, gate.lower())(0)
-        self.state = self.state.evolve(qc)
-        self._update_image()
+        psi = self.state.reshape((2,) * self.n_qubits)
+        axis = self._axis(self.selected)
+        psi = np.moveaxis(np.tensordot(SINGLE[gate], psi, axes=([1], [axis])), 0, axis)
+        self.state = psi.reshape(-1)
+        self._show(gate, [self.selected])
+
+    def _apply_cnot(self):
+        control, target = self.selected, (self.selected + 1) % self.n_qubits
+        psi = self.state.reshape((2,) * self.n_qubits).copy()
+        on = [slice(None)] * self.n_qubits
+        on[self._axis(control)] = 1
+        sub = psi[tuple(on)]                        # control axis removed: target axis shifts
+        t = self._axis(target) - (self._axis(target) > self._axis(control))
+        psi[tuple(on)] = np.moveaxis(np.tensordot(SINGLE["X"], sub, axes=([1], [t])), 0, t)
+        self.state = psi.reshape(-1)
+        self._show(None, range(self.n_qubits))
 
+    def _reset(self):
+        self.state = np.zeros_like(self.state)
+        self.state[0] = 1
+        self._show(None, range(self.n_qubits))
+
+    def _show(self, gate, qubits):
+        vectors = bloch_vectors(self.state, self.n_qubits)
+        for q in qubits:
+            self.spheres[q].set_vector(vectors[q], gate)
+
+    # ── scene callbacks ────────────────────────────────────────────────
     def handle_event(self, e):
         if e.type == pygame.KEYDOWN:
             if e.key == pygame.K_ESCAPE:
                 pygame.quit(); sys.exit()
-            elif e.key == pygame.K_h: self._apply('h')
-            elif e.key == pygame.K_x: self._apply('x')
-            elif e.key == pygame.K_y: self._apply('y')
-            elif e.key == pygame.K_z: self._apply('z')
+            elif e.key in self.GATE_KEYS: self._apply(self.GATE_KEYS[e.key])
+            elif e.key == pygame.K_c and self.n_qubits > 1: self._apply_cnot()
+            elif e.key == pygame.K_r: self._reset()
+            elif e.key == pygame.K_LEFT: self.selected = (self.selected - 1) % self.n_qubits
+            elif e.key in (pygame.K_RIGHT, pygame.K_TAB):
+                self.selected = (self.selected + 1) % self.n_qubits
         if e.type == pygame.QUIT:
             pygame.quit(); sys.exit()
 
     def update(self, dt):
-        pass
+        for sphere in self.spheres:
+            sphere.update(dt)
 
     def draw(self, s):
         s.fill(WHITE)
         title = self.font.render("Statevector Demo", True, BLACK)
         s.blit(title, title.get_rect(center=(WIDTH//2, 40)))
         s.blit(self.instructions, self.instructions.get_rect(center=(WIDTH//2, HEIGHT-40)))
-        if self.image:
-            img = pygame.transform.smoothscale(self.image, (300, 300))
-            rect = img.get_rect(center=(WIDTH//2, HEIGHT//2))
-            s.blit(img, rect)
+        slot = WIDTH / self.n_qubits
+        for q, sphere in enumerate(self.spheres):
+            selected = q == self.selected and self.n_qubits > 1
+            sphere.draw(s, (int(slot * (q + 0.5)), HEIGHT//2 - 20), f"q{q}",
+                        GREEN if selected else BLACK)
 
 if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Single- and multi-qubit Bloch sphere demo.")
+    ap.add_argument("--qubits", type=int, default=1, choices=range(1, 5))
+    args = ap.parse_args()
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     clock = pygame.time.Clock()
-    from ui.widgets import init_fonts
-    font_l = pygame.font.SysFont(None, 72)
-    font_m = pygame.font.SysFont(None, 32)
-    font_s = pygame.font.SysFont(None, 24)
-    init_fonts(font_l, font_m, font_s)
-    manager = SceneManager(StatevectorDemo(None))
+    from super_quantum_party.ui.widgets import init_fonts
+    init_fonts(assets.font(None, 72), assets.font(None, 32), assets.font(None, 24))
+    manager = SceneManager(StatevectorDemo(None, args.qubits))
     manager.scene.manager = manager
     while True:
         dt = clock.tick(60) / 1000
@@ -76,4 +110,3 @@ if __name__ == "__main__":
         manager.update(dt)
         manager.draw(screen)
         pygame.display.flip()
-
@@ -1,19 +1,21 @@
 import pygame, sys
 from super_quantum_party.settings import WIDTH, HEIGHT, WHITE, BLACK, YELLOW
+from super_quantum_party.core import assets
 from super_quantum_party.core.scene import Scene
+from super_quantum_party.core.engine import final_ranking
 from super_quantum_party.ui.widgets import Button
 
 class WinnerScene(Scene):
+    TITLE_FONT = assets.font_asset("comicsansms", 64)
+    FONT = assets.font_asset("comicsansms", 36)
+    ASSETS = [TITLE_FONT, FONT]
+
     def __init__(self, manager, players):
         super().__init__(manager)
         # Sort players by stars desc, then by gate count desc
-        self.players = sorted(
-            players,
-            key=lambda p: (-p.stars, -sum(p.gates.values()))
-        )
-        comic = pygame.font.match_font("comicsansms")
-        self.font_big = pygame.font.Font(comic or pygame.font.get_default_font(), 64)
-        self.font = pygame.font.Font(comic or pygame.font.get_default_font(), 36)
+        self.players = final_ranking(players)
+        self.font_big = self.resource(self.TITLE_FONT)
+        self.font = self.resource(self.FONT)
         self.button = Button("Menu", (WIDTH//2, HEIGHT - 60))
 
     def handle_event(self, e):
@@ -1,3 +1,5 @@
+import os
+
 # Window & frame-rate constants; tweak once, propagate everywhere.
 WIDTH, HEIGHT = 1100, 650
 FPS           = 30
@@ -9,12 +11,66 @@ GREEN = (25, 180, 40)
 WHITE = (255, 255, 255)
 YELLOW = (255, 215, 0)
 
+# colour palette for node types
+TYPE_COLOUR = {
+    1: ( 50, 140, 255),   # blue
+    2: (255, 70,  70 ),   # red
+    3: (255, 200,  40),   # yellow
+    4: (255, 210,   0),   # gold
+}
+
 # Paths to map thumbnails / backgrounds
-# Map modules must be importable using their full package path. The previous
-# values referred to a top-level ``maps`` package which does not exist, causing
-# a crash when the Play button tries to load the selected map.  Prefix the
-# module path with ``the_game`` so ``importlib`` can locate it correctly.
-MAP_FILES   = ["super_quantum_party.maps.new_map",  # first map implemented
-               "super_quantum_party.maps.old_map"]  # second map not yet implemented
+# Maps are looked up by name in ``maps.registry``, which discovers every
+# ``maps/*.yml`` file and loads its compiled ``.qmap`` artifact.
+MAP_FILES   = ["new_map",   # maps/new_map.yml
+               "old_map"]   # maps/old_map.yml
+# A map without a thumbnail here (None, or a missing file) is drawn from its YAML.
 MAP_THUMBS  = ["super_quantum_party/resources/map1.png",
-               "super_quantum_party/resources/map2.png"]
\ No newline at end of file
+               "super_quantum_party/resources/map2.png"]
+
+# Packed runtime assets, built by ``python -m super_quantum_party.core.bundle``
+# and read in place of the loose files when present (SQP_BUNDLE).
+BUNDLE      = os.environ.get("SQP_BUNDLE",
+                             os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets.sqpb"))
+
+# Scaled images and drawn map thumbnails are cached here, keyed by the
+# source's content hash and the target size (SQP_CACHE_DIR; empty disables).
+CACHE_DIR   = os.environ.get("SQP_CACHE_DIR",
+                             os.path.join(os.path.expanduser("~"), ".cache", "super_quantum_party"))
+
+# Hot-reload the map YAML into a running game (SQP_WATCH_MAPS=1).
+WATCH_MAPS  = os.environ.get("SQP_WATCH_MAPS", "") not in ("", "0")
+
+# Record every game as a replay file into this directory (SQP_RECORD_DIR=replays).
+RECORD_DIR  = os.environ.get("SQP_RECORD_DIR", "")
+
+# Save the game after every turn to this file; the menu offers to resume it
+# (SQP_AUTOSAVE=autosave.sqps).
+AUTOSAVE    = os.environ.get("SQP_AUTOSAVE", "")
+
+# Stream frame, scene and quantum-job timings of every launch into this
+# directory (SQP_TRACE_DIR=traces), as a Chrome trace or as JSON lines
+# (SQP_TRACE_FORMAT=chrome|jsonl).  F3 shows them in game (SQP_OVERLAY=1).
+TRACE_DIR   = os.environ.get("SQP_TRACE_DIR", "")
+TRACE_FORMAT = os.environ.get("SQP_TRACE_FORMAT", "chrome")
+OVERLAY     = os.environ.get("SQP_OVERLAY", "") not in ("", "0")
+
+# Profiles (core.profiling) go to PROFILE_DIR: F4 captures PROFILE_FRAMES
+# frames, Shift+F4 runs until the next scene; SQP_PROFILE=120 or
+# SQP_PROFILE=scene starts one at launch.  SQP_PROFILER=cprofile|sample.
+PROFILE     = os.environ.get("SQP_PROFILE", "")
+PROFILER    = os.environ.get("SQP_PROFILER", "cprofile")
+PROFILE_DIR = os.environ.get("SQP_PROFILE_DIR", "profiles")
+PROFILE_FRAMES = int(os.environ.get("SQP_PROFILE_FRAMES", "60"))
+
+# On exit, print the call sites whose quantum jobs took longest, with their
+# shots and circuit sizes (SQP_JOB_REPORT=10 for the top ten; 0 disables).
+JOB_REPORT  = int(os.environ.get("SQP_JOB_REPORT", "0"))
+
+# Measure the heap and the live surfaces at every scene switch, flag what
+# outlives its scene, and print the growth per switch on exit (SQP_MEMORY=1).
+MEMORY      = os.environ.get("SQP_MEMORY", "") not in ("", "0")
+
+# Start games in turbo mode: instant moves, no bot delays (SQP_TURBO=1;
+# the T key toggles it during a game).
+TURBO       = os.environ.get("SQP_TURBO", "") not in ("", "0")
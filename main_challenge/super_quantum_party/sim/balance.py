@@ -0,0 +1,306 @@
+"""Monte Carlo balance simulator.
+
+Plays large batches of seeded headless games (``core.engine`` with the
+``ExactBackend``) across a process pool and streams one row per game into a
+columnar results directory, then prints win-rate reports per map and rule
+setting.
+
+    $ python -m super_quantum_party.sim.balance --games 20000 \\
+          --maps new_map old_map --turns 10 15 20 25 --reward 1-4 2-5 -o results/
+
+Every combination of ``--maps``, ``--turns``, ``--reward``,
+``--decoh-every`` and ``--decoh-percent`` is a *config* and gets
+``--games`` games.  Game ``i`` of a config uses seed ``--seed + i``, so
+configs are compared on the same dice streams and a run is reproducible
+whatever the number of workers.
+
+The results directory holds one raw little-endian file per column
+(``<column>.bin``) plus ``schema.json`` (dtypes, row count and the config
+table); ``load_results`` reads it back as NumPy arrays.  Workers load each
+board once and return whole chunks of games as arrays, so the parent only
+appends bytes and throughput grows with the number of cores.
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.engine import (
+    Engine, RuleSet, MOVE, BRANCH, GATES, REWARD_RANGE, DECOH_EVERY, DECOH_PERCENT,
+    final_ranking, random_policy,
+)
+from super_quantum_party.core.density import OUTCOMES
+from super_quantum_party.maps import registry
+from super_quantum_party.models.player import Player
+
+SCHEMA_FILE = "schema.json"
+DEFAULT_TURNS = (10, 15, 20, 25)    # the MenuScene toggle
+
+
+def columns_for(n_players: int) -> Dict[str, str]:
+    """Column name -> NumPy dtype of the per-game results table."""
+    cols = {
+        "seed": "<i8",
+        "config": "<i4",
+        "winner": "<i1",          # seat (turn order index) of the winner
+        "tie": "<u1",             # winner tied on stars and gates
+        "turns": "<i4",           # player turns played
+        "steps_mean": "<f4",      # tiles walked per turn
+        "steps_max": "<i2",
+        "branches": "<i4",        # intersection choices made
+        "gates_placed": "<i4",    # gates placed in the minigame
+        "decoh_layers": "<i4",
+        "measurements": "<i4",
+    }
+    for o in OUTCOMES:
+        cols[f"topo_{o}"] = "<i4"  # player turns played on each topology
+    for k in range(n_players):
+        cols[f"stars_{k}"] = "<i2"
+        cols[f"gates_{k}"] = "<i2"  # gates left at the end (tie-breaker)
+    return cols
+
+
+# ── one game ───────────────────────────────────────────────────────────
+def play_game(board: Board, n_players: int, n_turns: int, ruleset: RuleSet,
+              seed: int, policy=random_policy) -> dict:
+    """Play one seeded game and return its results row."""
+    players = [Player(slot) for slot in range(n_players)]
+    engine = Engine(board, players, n_turns, seed=seed, ruleset=ruleset)
+    # policy stream, independent of the engine's: Random(-n) is Random(n), so
+    # a negated integer seed would replay game seed + 1's engine draws
+    rng = random.Random(f"policy-{seed}")
+    s = engine.state
+    topo = dict.fromkeys(OUTCOMES, 0)
+    walks: List[int] = []
+    walked = branches = placed = decoh = measured = 0
+    while True:
+        actions = engine.legal_actions()
+        if not actions:
+            break
+        action = actions[0] if len(actions) == 1 else policy(engine, actions, rng)
+        if action[0] == "roll" and not s.dice:
+            topo[s.topology] += 1
+        elif action[0] == "branch":
+            branches += 1
+        elif action[0] == "continue" and s.phase == GATES:
+            decoh += sum(1 for g in s.round.history if g[0] == "DECOH")
+        for ev in engine.step(action):
+            kind = ev[0]
+            if kind == "move":
+                walked += 1
+            elif kind == "place":
+                placed += 1
+            elif kind == "measured":
+                measured += 1
+        if action[0] in ("advance", "branch") and s.phase not in (MOVE, BRANCH):
+            walks.append(walked)     # the walk is over
+            walked = 0
+
+    ranking = final_ranking(players)
+    key = lambda p: (p.stars, sum(p.gates.values()))
+    row = {
+        "seed": seed,
+        "winner": players.index(ranking[0]),
+        "tie": int(len(ranking) > 1 and key(ranking[0]) == key(ranking[1])),
+        "turns": len(walks),
+        "steps_mean": float(np.mean(walks)) if walks else 0.0,
+        "steps_max": max(walks, default=0),
+        "branches": branches,
+        "gates_placed": placed,
+        "decoh_layers": decoh,
+        "measurements": measured,
+    }
+    for o in OUTCOMES:
+        row[f"topo_{o}"] = topo[o]
+    for k, p in enumerate(players):
+        row[f"stars_{k}"] = p.stars
+        row[f"gates_{k}"] = sum(p.gates.values())
+    return row
+
+
+# ── process pool ───────────────────────────────────────────────────────
+_BOARDS: Dict[str, Board] = {}
+
+
+def _init_worker(map_names: Sequence[str]):
+    for name in map_names:
+        _BOARDS[name] = Board.from_compiled(registry.get_map(name).load())
+
+
+def _run_chunk(task) -> Dict[str, np.ndarray]:
+    config_id, config, n_players, seeds = task
+    board = _BOARDS[config["map"]]
+    ruleset = RuleSet(config["reward_range"], config["decoh_every"], config["decoh_percent"])
+    rows = [play_game(board, n_players, config["n_turns"], ruleset, seed) for seed in seeds]
+    cols = columns_for(n_players)
+    out = {name: np.array([r[name] for r in rows], dtype=dtype)
+           for name, dtype in cols.items() if name != "config"}
+    out["config"] = np.full(len(rows), config_id, dtype=cols["config"])
+    return out
+
+
+def make_configs(maps: Iterable[str], turns: Iterable[int], rewards: Iterable[Sequence[int]],
+                 decoh_every: Iterable[int], decoh_percent: Iterable[int]) -> List[dict]:
+    """Cartesian product of the rule settings to compare."""
+    return [{"map": m, "n_turns": t, "reward_range": list(r), "decoh_every": e,
+             "decoh_percent": p}
+            for m, t, r, e, p in itertools.product(maps, turns, rewards, decoh_every, decoh_percent)]
+
+
+class ResultsWriter:
+    """Append-only columnar results directory (one raw file per column)."""
+
+    def __init__(self, path: str, columns: Dict[str, str], meta: dict):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.meta = meta
+        self.rows = 0
+        self._files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name in columns}
+        self._write_schema()
+
+    def _write_schema(self):
+        schema = dict(self.meta, columns=self.columns, rows=self.rows)
+        tmp = os.path.join(self.path, SCHEMA_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, SCHEMA_FILE))
+
+    def append(self, chunk: Dict[str, np.ndarray]):
+        for name, f in self._files.items():
+            f.write(np.ascontiguousarray(chunk[name], dtype=self.columns[name]).tobytes())
+        self.rows += len(chunk["seed"])
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._write_schema()
+
+
+def load_results(path: str):
+    """Return ``(columns, schema)`` of a results directory.
+
+    Rows are counted from the column files, so the rows of an interrupted
+    run are readable too.
+    """
+    with open(os.path.join(path, SCHEMA_FILE), encoding="utf-8") as f:
+        schema = json.load(f)
+    cols = {name: np.fromfile(os.path.join(path, f"{name}.bin"), dtype=dtype)
+            for name, dtype in schema["columns"].items()}
+    rows = min(len(c) for c in cols.values())
+    return {name: c[:rows] for name, c in cols.items()}, schema
+
+
+def run(configs: List[dict], games: int, out: str, *, n_players: int = 4, seed: int = 0,
+        workers: int | None = None, chunk: int = 64, progress: bool = True) -> str:
+    """Simulate ``games`` games of every config into the directory ``out``."""
+    maps = sorted({c["map"] for c in configs})
+    for name in maps:                 # compile once here, not in every worker
+        registry.get_map(name).load()
+    cols = columns_for(n_players)
+    meta = {"n_players": n_players, "seed": seed, "games": games, "configs": configs}
+    writer = ResultsWriter(out, cols, meta)
+    tasks = [(cid, config, n_players, range(seed + i, seed + min(i + chunk, games)))
+             for cid, config in enumerate(configs) for i in range(0, games, chunk)]
+    total = games * len(configs)
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(maps,)) as pool:
+        try:
+            for result in pool.imap_unordered(_run_chunk, tasks):
+                writer.append(result)
+                if progress:
+                    rate = writer.rows / (time.perf_counter() - t0)
+                    print(f"\r{writer.rows}/{total} games  {rate:,.0f} games/s", end="", flush=True)
+        finally:
+            writer.close()
+    if progress:
+        print()
+    return out
+
+
+# ── reports ────────────────────────────────────────────────────────────
+def _config_label(c: dict) -> str:
+    lo, hi = c["reward_range"]
+    return (f"{c['map']} turns={c['n_turns']} reward={lo}-{hi} "
+            f"decoh={c['decoh_percent']}%/{c['decoh_every']}")
+
+
+def summarize(path: str) -> str:
+    """Text report: win rate by seat, spread and game shape per config and map."""
+    cols, schema = load_results(path)
+    n_players = schema["n_players"]
+    configs = schema["configs"]
+    lines = []
+    seat_hdr = " ".join(f"seat{k}" for k in range(n_players))
+
+    def block(label, mask):
+        n = int(mask.sum())
+        if not n:
+            return
+        wins = np.bincount(cols["winner"][mask], minlength=n_players) / n
+        # binomial standard error of a seat's win rate
+        se = np.sqrt(wins * (1 - wins) / n).max()
+        topo = np.array([cols[f"topo_{o}"][mask].sum() for o in OUTCOMES], dtype=float)
+        topo /= max(topo.sum(), 1)
+        stars = np.stack([cols[f"stars_{k}"][mask] for k in range(n_players)])
+        lines.append(label)
+        lines.append(f"  games {n:>8}   {seat_hdr}   spread (±se)")
+        lines.append("  win rate        " + " ".join(f"{w:5.3f}" for w in wins)
+                     + f"   {wins.max() - wins.min():.3f} (±{se:.3f})")
+        lines.append(f"  ties {cols['tie'][mask].mean():.3f}   winner stars "
+                     f"{stars.max(axis=0).mean():.2f}   total stars {stars.sum(axis=0).mean():.2f}")
+        lines.append(f"  steps/turn {cols['steps_mean'][mask].mean():.2f} "
+                     f"(max {cols['steps_max'][mask].max()})   branches/game "
+                     f"{cols['branches'][mask].mean():.1f}   gates placed/game "
+                     f"{cols['gates_placed'][mask].mean():.1f}   decoh layers/game "
+                     f"{cols['decoh_layers'][mask].mean():.1f}")
+        lines.append("  topology usage  " + "  ".join(f"{o}:{t:.3f}" for o, t in zip(OUTCOMES, topo)))
+
+    for cid, config in enumerate(configs):
+        block(f"[{cid}] {_config_label(config)}", cols["config"] == cid)
+    by_map = {}
+    for cid, config in enumerate(configs):
+        by_map.setdefault(config["map"], []).append(cid)
+    if len(configs) > len(by_map):
+        for name, ids in by_map.items():
+            block(f"[map] {name} (all settings)", np.isin(cols["config"], ids))
+    return "\n".join(lines)
+
+
+def _reward_range(text: str):
+    lo, _, hi = text.partition("-")
+    return int(lo), int(hi or lo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch-simulate games for balance tuning.")
+    parser.add_argument("--games", type=int, default=1000, help="games per config")
+    parser.add_argument("--maps", nargs="+", default=None, help="map names (default: all)")
+    parser.add_argument("--turns", type=int, nargs="+", default=list(DEFAULT_TURNS))
+    parser.add_argument("--reward", type=_reward_range, nargs="+",
+                        default=[REWARD_RANGE], help="gate reward ranges, e.g. 1-4")
+    parser.add_argument("--decoh-every", type=int, nargs="+", default=[DECOH_EVERY])
+    parser.add_argument("--decoh-percent", type=int, nargs="+", default=[DECOH_PERCENT])
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk", type=int, default=64, help="games per worker task")
+    parser.add_argument("-o", "--out", default="balance_results")
+    parser.add_argument("--report-only", action="store_true",
+                        help="summarize an existing results directory")
+    args = parser.parse_args()
+    if not args.report_only:
+        maps = args.maps or list(registry.discover_maps())
+        configs = make_configs(maps, args.turns, args.reward, args.decoh_every, args.decoh_percent)
+        run(configs, args.games, args.out, n_players=args.players, seed=args.seed,
+            workers=args.workers, chunk=args.chunk)
+    print(summarize(args.out))
@@ -0,0 +1,363 @@
+"""Vectorized lockstep simulation of many games at once.
+
+``VectorSim`` keeps the state of ``n_games`` games as NumPy arrays
+(struct of arrays) and plays the ``core.engine`` rules for all of them
+together: each ``step()`` is one player turn in every game.
+
+* positions, stars and gate inventories are ``(games, seats[, gates])``
+  arrays; live tile types (the star moves) are ``(games, tiles)``;
+* dice are drawn from ``quantum_dice.ROLL_DISTRIBUTION``;
+* a move is an index into the padded successor table of the game's current
+  topology, and intersections ask a vectorized *branch policy*;
+* star relocation, blue-tile rewards and the gate minigame (played with the
+  same random policy as ``engine.random_policy``, measured with
+  ``density.batch_outcome_probabilities``) are vectorized as well.
+
+All games share the turn counter, so they end on the same call.
+
+    $ python -m super_quantum_party.sim.vector --map new_map --games 20000 --check
+
+``--check`` plays the same number of games through ``core.engine`` and
+compares the two result distributions statistically.
+"""
+
+from __future__ import annotations
+import argparse
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from super_quantum_party.core import density
+from super_quantum_party.core.board import Board
+from super_quantum_party.core.engine import (
+    ALL_GATES, DEFAULT_RULES, INITIAL_HISTORY, PLACEABLE_GATES, REWARD_GATES, RuleSet,
+    gate_entry,
+)
+from super_quantum_party.models.player import Player
+from super_quantum_party.quantum_dice import ROLL_DISTRIBUTION
+
+OUTCOMES = density.OUTCOMES
+# inventory columns: every gate a player can hold
+GATE_ORDER = ALL_GATES
+_GATE_COL = {g: i for i, g in enumerate(GATE_ORDER)}
+_REWARD_COLS = np.array([_GATE_COL[g] for g in REWARD_GATES])
+_PLACE_COLS = np.array([_GATE_COL[g] for g in PLACEABLE_GATES])
+# minigame placements per gate (SWAP is the same on either wire)
+_PLACE_SLOTS = np.array([1 if g == "SWAP" else 2 for g in PLACEABLE_GATES])
+# code of placing PLACEABLE_GATES[i] on qubit q
+_PLACE_CODES = np.array([[density.GATE_CODE[gate_entry(g, q)] for q in (0, 1)]
+                         for g in PLACEABLE_GATES])
+
+
+def random_branch(sim: "VectorSim", games: np.ndarray, options: np.ndarray,
+                  degree: np.ndarray) -> np.ndarray:
+    """Branch policy: a uniformly random way out of each intersection."""
+    return (sim.rng.random(len(games)) * degree).astype(np.int64)
+
+
+class VectorSim:
+    """``n_games`` games of ``n_players`` played in lockstep on one board."""
+
+    def __init__(self, board: Board, n_games: int, n_players: int = 4, n_turns: int = 10,
+                 seed=None, ruleset: RuleSet = DEFAULT_RULES,
+                 branch_policy: Callable = random_branch):
+        self.board = board
+        self.n_games, self.n_players = n_games, n_players
+        self.ruleset = ruleset
+        self.branch_policy = branch_policy
+        self.rng = np.random.default_rng(seed)
+        index = {n: i for i, n in enumerate(board.ids)}
+        n = len(board.ids)
+
+        # padded successor table per topology: (4, tiles, max degree), -1 = none
+        width = max(1, max(len(v) for succ in board.succ.values() for v in succ.values()))
+        self.succ = np.full((len(OUTCOMES), n, width), -1, dtype=np.int32)
+        self.degree = np.zeros((len(OUTCOMES), n), dtype=np.int32)
+        for t, outcome in enumerate(OUTCOMES):
+            for node, nxt in board.succ.get(outcome, board.succ["00"]).items():
+                self.succ[t, index[node], :len(nxt)] = [index[v] for v in nxt]
+                self.degree[t, index[node]] = len(nxt)
+
+        faces = np.array(list(ROLL_DISTRIBUTION), dtype=np.int64)
+        weights = np.array(list(ROLL_DISTRIBUTION.values()), dtype=float)
+        self._faces, self._face_p = faces, weights / weights.sum()
+
+        g, p = n_games, n_players
+        self.types = np.tile(np.array([board.types[i] for i in board.ids], dtype=np.int8), (g, 1))
+        self.position = np.full((g, p), index[board.start], dtype=np.int32)
+        self.stars = np.zeros((g, p), dtype=np.int32)
+        self.gates = np.zeros((g, p, len(GATE_ORDER)), dtype=np.int32)
+        for gate, count in Player(0).gates.items():
+            self.gates[:, :, _GATE_COL[gate]] = count
+        self.topology = np.zeros(g, dtype=np.int8)     # index into OUTCOMES
+        self.turns_left = n_turns
+        self.active = 0
+
+        # per-game statistics, named like the ``sim.balance`` columns
+        self.steps_total = np.zeros(g, dtype=np.int64)
+        self.steps_max = np.zeros(g, dtype=np.int32)
+        self.turns = 0
+        self.branches = np.zeros(g, dtype=np.int32)
+        self.gates_placed = np.zeros(g, dtype=np.int32)
+        self.decoh_layers = np.zeros(g, dtype=np.int32)
+        self.measurements = np.zeros(g, dtype=np.int32)
+        self.topo_turns = np.zeros((g, len(OUTCOMES)), dtype=np.int32)
+
+    @property
+    def over(self) -> bool:
+        return self.turns_left <= 0
+
+    # ── one turn ───────────────────────────────────────────────────────
+    def step(self):
+        """Play one player turn in every game (and the gate round after it)."""
+        if self.over:
+            return
+        all_games = np.arange(self.n_games)
+        seat = self.active
+        self.topo_turns[all_games, self.topology] += 1
+        dice = self.rng.choice(self._faces, size=(self.n_games, 2), p=self._face_p)
+        steps = dice.sum(axis=1)
+        walked = np.zeros(self.n_games, dtype=np.int32)
+        pos = self.position[:, seat]
+
+        walking = all_games
+        while len(walking):
+            here = pos[walking]
+            topo = self.topology[walking]
+            deg = self.degree[topo, here]
+            # a dead end ends the walk where it is
+            walking, here, topo, deg = (a[deg > 0] for a in (walking, here, topo, deg))
+            if not len(walking):
+                break
+            pick = np.zeros(len(walking), dtype=np.int64)
+            fork = deg > 1
+            if fork.any():
+                games = walking[fork]
+                pick[fork] = self.branch_policy(self, games, self.succ[topo[fork], here[fork]],
+                                                deg[fork])
+                self.branches[games] += 1
+            nxt = self.succ[topo, here, pick]
+            pos[walking] = nxt
+            walked[walking] += 1
+            self._collect_stars(walking, nxt, seat)
+            walking = walking[walked[walking] < steps[walking]]
+
+        self.position[:, seat] = pos
+        self.steps_total += walked
+        self.steps_max = np.maximum(self.steps_max, walked)
+        self.turns += 1
+        self._reward(seat)
+
+        self.active = (seat + 1) % self.n_players
+        if self.active == 0:
+            self.turns_left -= 1
+            if not self.over:
+                self._gate_round()
+
+    def run(self):
+        """Play every game to the end and return ``results()``."""
+        while not self.over:
+            self.step()
+        return self.results()
+
+    def _collect_stars(self, games, nodes, seat):
+        hit = self.types[games, nodes] == 4
+        if not hit.any():
+            return
+        games, nodes = games[hit], nodes[hit]
+        self.stars[games, seat] += 1
+        self.types[games, nodes] = 1
+        # uniform choice among the other blue tiles: argmax of random keys
+        blue = self.types[games] == 1
+        blue[np.arange(len(games)), nodes] = False
+        keys = np.where(blue, self.rng.random(blue.shape), -1.0)
+        new = keys.argmax(axis=1)
+        has = blue.any(axis=1)
+        self.types[games[has], new[has]] = 4
+
+    def _reward(self, seat):
+        lo, hi = self.ruleset.reward_range
+        here = self.position[:, seat]
+        games = np.flatnonzero(self.types[np.arange(self.n_games), here] == 1)
+        count = self.rng.integers(lo, hi + 1, size=len(games))
+        for j in range(hi):
+            got = games[count > j]
+            cols = _REWARD_COLS[self.rng.integers(len(REWARD_GATES), size=len(got))]
+            np.add.at(self.gates, (got, seat, cols), 1)
+
+    # ── gate minigame ──────────────────────────────────────────────────
+    def _gate_round(self):
+        """Play a minigame round in every game with ``engine.random_policy``.
+
+        ``legal_actions`` order is: placements (``PLACEABLE_GATES`` x qubit),
+        SKIP, MEASURE (until measured), CONTINUE; the random policy measures
+        with probability 1/2 when it may, otherwise picks uniformly.
+        """
+        g, p = self.n_games, self.n_players
+        rules = self.ruleset
+        history = np.full((g, 16), -1, dtype=np.int16)
+        init = [density.gate_code(h) for h in INITIAL_HISTORY]
+        history[:, :len(init)] = init
+        length = np.full(g, len(init), dtype=np.int32)
+        current = np.zeros(g, dtype=np.int64)
+        skipped = np.zeros((g, p), dtype=bool)
+        result = np.full(g, -1, dtype=np.int8)
+        placed = np.zeros(g, dtype=np.int32)
+        decoh = np.zeros(g, dtype=np.int32)
+
+        live = np.arange(g)
+        while len(live):
+            cur = current[live]
+            can_place = ~skipped[live, cur]
+            inv = self.gates[live, cur][:, _PLACE_COLS]
+            slots = np.where(inv > 0, _PLACE_SLOTS, 0) * can_place[:, None]
+            n_place = slots.sum(axis=1)
+            can_measure = result[live] < 0
+            total = n_place + can_place + can_measure + 1
+            choice = (self.rng.random(len(live)) * total).astype(np.int64)
+            measure_first = can_measure & (self.rng.random(len(live)) < 0.5) & (total > 1)
+            choice = np.where(measure_first, n_place + can_place, choice)
+
+            # placements
+            is_place = choice < n_place
+            if is_place.any():
+                games, c = live[is_place], choice[is_place]
+                ends = slots[is_place].cumsum(axis=1)
+                gi = (c[:, None] >= ends).sum(axis=1)
+                q = c - np.where(gi > 0, ends[np.arange(len(gi)), gi - 1], 0)
+                if length.max() >= history.shape[1]:
+                    history = np.pad(history, ((0, 0), (0, history.shape[1])), constant_values=-1)
+                history[games, length[games]] = _PLACE_CODES[gi, q]
+                length[games] += 1
+                self.gates[games, current[games], _PLACE_COLS[gi]] -= 1
+                result[games] = -1
+                placed[games] += 1
+                decoh[games] += placed[games] % rules.decoh_every == 0
+                self._next_player(current, skipped, games)
+            # skip
+            is_skip = can_place & (choice == n_place)
+            if is_skip.any():
+                games = live[is_skip]
+                skipped[games, current[games]] = True
+                self._next_player(current, skipped, games)
+            # measure
+            is_measure = can_measure & (choice == n_place + can_place)
+            if is_measure.any():
+                games = live[is_measure]
+                percent = np.minimum(100, decoh[games] * rules.decoh_percent)
+                probs = density.batch_outcome_probabilities(
+                    history[games, :length[games].max()], percent)
+                u = self.rng.random(len(games))[:, None]
+                result[games] = np.minimum((u >= probs.cumsum(axis=1)).sum(axis=1), 3)
+                self.measurements[games] += 1
+            # continue
+            done = choice == total - 1
+            games = live[done]
+            self.topology[games] = np.maximum(result[games], 0)
+            live = live[~done]
+
+        self.gates_placed += placed
+        self.decoh_layers += decoh
+
+    def _next_player(self, current, skipped, games):
+        """``GateRound.next_player`` for ``games``: next seat that has not skipped."""
+        cur = current[games]
+        new, found = cur.copy(), np.zeros(len(games), dtype=bool)
+        for k in range(1, self.n_players + 1):
+            seat = (cur + k) % self.n_players
+            take = ~found & ~skipped[games, seat]
+            new[take] = seat[take]
+            found |= take
+        current[games] = new      # everyone skipped: the seat stays put
+
+    # ── results ────────────────────────────────────────────────────────
+    def results(self) -> Dict[str, np.ndarray]:
+        """Per-game results with the ``sim.balance`` column names."""
+        held = self.gates.sum(axis=2)
+        key = self.stars.astype(np.int64) * (1 << 20) + held
+        best = key.max(axis=1, keepdims=True)
+        out = {
+            "winner": key.argmax(axis=1),        # first seat wins ties, like final_ranking
+            "tie": ((key == best).sum(axis=1) > 1).astype(np.uint8),
+            "turns": np.full(self.n_games, self.turns),
+            "steps_mean": self.steps_total / max(self.turns, 1),
+            "steps_max": self.steps_max,
+            "branches": self.branches,
+            "gates_placed": self.gates_placed,
+            "decoh_layers": self.decoh_layers,
+            "measurements": self.measurements,
+        }
+        for t, o in enumerate(OUTCOMES):
+            out[f"topo_{o}"] = self.topo_turns[:, t]
+        for k in range(self.n_players):
+            out[f"stars_{k}"] = self.stars[:, k]
+            out[f"gates_{k}"] = held[:, k]
+        return out
+
+
+# ── statistical check against the engine ──────────────────────────────
+def compare(vector: Dict[str, np.ndarray], engine: Dict[str, np.ndarray],
+            threshold: float = 4.0):
+    """Two-sample z-scores of the column means; ``(report, ok)``.
+
+    With a few dozen columns a correct simulation stays well below
+    ``threshold`` standard errors; a rules mismatch shows up as a large z.
+    """
+    lines, ok = [], True
+    for name in vector:
+        if name == "winner":
+            continue
+        a = np.asarray(vector[name], dtype=float)
+        b = np.asarray(engine[name], dtype=float)
+        se = np.sqrt(a.var() / len(a) + b.var() / len(b))
+        z = 0.0 if se == 0 else (a.mean() - b.mean()) / se
+        flag = "" if abs(z) < threshold else "   <-- mismatch"
+        ok &= abs(z) < threshold
+        lines.append(f"  {name:<14} vector {a.mean():9.3f}   engine {b.mean():9.3f}   z {z:+6.2f}{flag}")
+    for k in range(int(max(vector["winner"].max(), engine["winner"].max())) + 1):
+        a, b = vector["winner"] == k, engine["winner"] == k
+        se = np.sqrt(a.var() / len(a) + b.var() / len(b))
+        z = 0.0 if se == 0 else (a.mean() - b.mean()) / se
+        ok &= abs(z) < threshold
+        flag = "" if abs(z) < threshold else "   <-- mismatch"
+        lines.append(f"  win seat{k:<6} vector {a.mean():9.3f}   engine {b.mean():9.3f}   z {z:+6.2f}{flag}")
+    return "\n".join(lines), ok
+
+
+def engine_results(board: Board, n_games: int, n_players: int, n_turns: int,
+                   ruleset: RuleSet = DEFAULT_RULES, seed: int = 0) -> Dict[str, np.ndarray]:
+    """The same columns from ``n_games`` games played through ``core.engine``."""
+    from super_quantum_party.sim.balance import play_game
+    rows = [play_game(board, n_players, n_turns, ruleset, seed + i) for i in range(n_games)]
+    return {name: np.array([r[name] for r in rows]) for name in rows[0] if name != "seed"}
+
+
+if __name__ == "__main__":
+    from super_quantum_party.maps import registry
+
+    parser = argparse.ArgumentParser(description="Lockstep NumPy simulation of many games.")
+    parser.add_argument("--map", default="new_map")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true",
+                        help="compare against the same number of engine games")
+    args = parser.parse_args()
+
+    board = Board.from_compiled(registry.get_map(args.map).load())
+    t0 = time.perf_counter()
+    sim = VectorSim(board, args.games, args.players, args.turns, seed=args.seed)
+    res = sim.run()
+    dt = time.perf_counter() - t0
+    print(f"{args.games} games x {args.turns} turns in {dt:.2f}s ({args.games / dt:,.0f} games/s)")
+    wins = np.bincount(res["winner"], minlength=args.players) / args.games
+    print("win rate by seat: " + " ".join(f"{w:.3f}" for w in wins))
+    if args.check:
+        t0 = time.perf_counter()
+        ref = engine_results(board, args.games, args.players, args.turns, seed=args.seed)
+        print(f"engine: {time.perf_counter() - t0:.2f}s")
+        report, ok = compare(res, ref)
+        print(report)
+        raise SystemExit(0 if ok else 1)
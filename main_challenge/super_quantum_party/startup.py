@@ -0,0 +1,98 @@
+"""
+Startup benchmark: time from launch to the menu's first frame.
+
+Starts ``python -m super_quantum_party --quit-after-frames 1`` on SDL's
+dummy video and audio drivers ``--runs`` times and takes the median time
+until the game reports its first frame – the first one drawn by the menu,
+once the loading screen has finished preloading the assets.  One more run with
+``-X importtime`` lists the slowest imports made before that frame and
+checks that none of ``LAZY_MODULES`` was among them: qiskit and Aer are
+loaded on the first roll, or by the warm-up thread started once the menu
+is up (``quantum_dice.start_warm_up``).
+
+    $ python -m super_quantum_party.startup --budget 2.5
+
+Exits with status 1 when the median is over ``--budget`` seconds or a lazy
+module was imported too early, so it can gate CI.
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_FRAME = "super_quantum_party: first frame"
+LAZY_MODULES = ("qiskit", "qiskit_aer", "matplotlib")
+DEFAULT_BUDGET = 1.5        # seconds
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _launch(importtime=False):
+    """``(seconds to the first frame, stderr lines before it)`` of one launch."""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYTHONPATH=os.pathsep.join(filter(None, [_ROOT, os.environ.get("PYTHONPATH")])))
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+          ["-m", "super_quantum_party", "--quit-after-frames", "1"]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=_ROOT, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    lines, elapsed = [], None
+    for line in proc.stderr:
+        if line.strip() == FIRST_FRAME:
+            elapsed = time.perf_counter() - t0
+            break
+        lines.append(line)
+    proc.stderr.read()
+    if proc.wait() != 0 or elapsed is None:
+        sys.exit("the game did not reach its first frame:\n" + "".join(lines[-20:]))
+    return elapsed, lines
+
+
+def parse_importtime(lines):
+    """``[(cumulative µs, depth, module)]`` from ``-X importtime`` output."""
+    out = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue                                # the header line
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        out.append((int(cumulative), depth, name.strip()))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Measure the time to the menu's first frame.")
+    ap.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=12, help="slowest imports to list")
+    args = ap.parse_args(argv)
+
+    times = [_launch()[0] for _ in range(args.runs)]
+    median = statistics.median(times)
+    _, lines = _launch(importtime=True)
+    imports = parse_importtime(lines)
+
+    print(f"first frame after {median:.2f}s (median of {args.runs}: "
+          f"{', '.join(f'{t:.2f}' for t in times)}), budget {args.budget:.2f}s")
+    print("slowest top-level imports before it:")
+    for us, _, name in sorted((i for i in imports if i[1] == 0), reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    early = sorted({name for _, _, name in imports if name.split(".")[0] in LAZY_MODULES})
+    ok = median <= args.budget
+    if early:
+        ok = False
+        print(f"imported before the first frame but meant to load lazily: {', '.join(early[:8])}"
+              + (" ..." if len(early) > 8 else ""))
+    if median > args.budget:
+        print("over budget")
+    print("startup", "OK" if ok else "FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
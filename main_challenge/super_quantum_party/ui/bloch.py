@@ -0,0 +1,201 @@
+"""
+Bloch spheres drawn with pygame and NumPy.
+
+The shaded sphere, its equator, meridian and axis labels depend only on
+the radius and are rendered once into a cached surface
+(``sphere_background``).  Each frame only the state's arrow is drawn on
+top of it, projected analytically for a fixed viewpoint (``project``).
+
+``BlochSphere`` animates its arrow between states: a single-qubit gate
+is shown as the rotation it is – ``GATE_ROTATIONS`` gives its axis and
+angle – anything else (an entangling gate shortening the vector) as a
+great-circle slide.
+
+    >>> sphere = BlochSphere(120)
+    >>> sphere.set_vector(bloch_vectors(state, 1)[0], "H")
+    >>> sphere.update(dt); sphere.draw(screen, (300, 300), "q0")
+"""
+from __future__ import annotations
+from functools import lru_cache
+
+import numpy as np
+import pygame
+
+from super_quantum_party.core import assets
+from super_quantum_party.settings import BLACK, GREY
+
+ELEVATION = np.radians(20)          # viewpoint above the equator
+AZIMUTH = np.radians(30)            # viewpoint around the z axis, from +x towards +y
+LIGHT = np.array([-0.4, 0.5, 0.77])  # in view coordinates (right, up, towards the viewer)
+SPHERE_COLOUR = np.array([200, 220, 255])
+ARROW_COLOUR = (200, 40, 60)
+
+# screen axes as world vectors: right, up, towards the viewer
+_RIGHT = np.array([-np.sin(AZIMUTH), np.cos(AZIMUTH), 0.0])
+_UP = np.array([-np.sin(ELEVATION) * np.cos(AZIMUTH), -np.sin(ELEVATION) * np.sin(AZIMUTH),
+                np.cos(ELEVATION)])
+_VIEW = np.cross(_RIGHT, _UP)
+
+# single-qubit gates as rotations of the sphere: (axis, angle)
+_R2 = 1 / np.sqrt(2)
+GATE_ROTATIONS = {
+    "X": ((1, 0, 0), np.pi),
+    "Y": ((0, 1, 0), np.pi),
+    "Z": ((0, 0, 1), np.pi),
+    "H": ((_R2, 0, _R2), np.pi),
+    "SX": ((1, 0, 0), np.pi / 2),
+}
+
+
+# ── geometry ───────────────────────────────────────────────────────────
+def project(points, radius):
+    """Screen offsets ``(dx, dy)`` and depths of world ``points`` (..., 3) on a sphere of ``radius``."""
+    points = np.asarray(points, dtype=float)
+    return (np.stack([points @ _RIGHT, -(points @ _UP)], axis=-1) * radius,
+            points @ _VIEW)
+
+
+def bloch_vectors(state, n_qubits):
+    """``(n_qubits, 3)`` Bloch vectors of each qubit's reduced state.
+
+    Amplitudes are in Qiskit's order: basis index ``q0 + 2*q1 + ...``.
+    Entangled qubits get vectors shorter than 1.
+    """
+    psi = np.asarray(state, dtype=complex).reshape((2,) * n_qubits)
+    out = np.empty((n_qubits, 3))
+    for q in range(n_qubits):
+        a = np.moveaxis(psi, n_qubits - 1 - q, 0).reshape(2, -1)
+        rho = a @ a.conj().T
+        out[q] = 2 * rho[1, 0].real, 2 * rho[1, 0].imag, (rho[0, 0] - rho[1, 1]).real
+    return out
+
+
+def _rotate(v, axis, angle):
+    """Rodrigues' rotation of ``v`` about the unit ``axis``."""
+    axis = np.asarray(axis, dtype=float)
+    c, s = np.cos(angle), np.sin(angle)
+    return v * c + np.cross(axis, v) * s + axis * (axis @ v) * (1 - c)
+
+
+def _slide(a, b, t):
+    """Between ``a`` and ``b`` along a great circle, the length changing linearly."""
+    la, lb = np.linalg.norm(a), np.linalg.norm(b)
+    length = la + (lb - la) * t
+    if la < 1e-9 or lb < 1e-9:
+        return a + (b - a) * t
+    ua, ub = a / la, b / lb
+    cos = np.clip(ua @ ub, -1.0, 1.0)
+    axis = np.cross(ua, ub)
+    if np.linalg.norm(axis) < 1e-9:
+        if cos > 0:
+            return ua * length
+        axis = np.cross(ua, (1.0, 0, 0) if abs(ua[0]) < 0.9 else (0, 1.0, 0))
+    return _rotate(ua, axis / np.linalg.norm(axis), np.arccos(cos) * t) * length
+
+
+# ── drawing ────────────────────────────────────────────────────────────
+def _circle(normal, radius, n=96):
+    """Projected points of the great circle orthogonal to ``normal``, and their depths."""
+    normal = np.asarray(normal, dtype=float)
+    u = np.cross(normal, (0, 0, 1.0) if abs(normal[2]) < 0.9 else (1.0, 0, 0))
+    u /= np.linalg.norm(u)
+    w = np.cross(normal, u)
+    t = np.linspace(0, 2 * np.pi, n, endpoint=False)[:, None]
+    return project(np.cos(t) * u + np.sin(t) * w, radius)
+
+
+@lru_cache(maxsize=8)
+def sphere_background(radius):
+    """The shaded sphere with its equator, meridian and axis labels, ``radius`` pixels large."""
+    pad = 28
+    size = 2 * (radius + pad)
+    surf = pygame.Surface((size, size), pygame.SRCALPHA)
+    c = size / 2
+
+    # shading: Lambert over the visible hemisphere
+    yy, xx = np.mgrid[0:size, 0:size]
+    dx, dy = (xx + 0.5 - c) / radius, (c - yy - 0.5) / radius
+    r2 = dx * dx + dy * dy
+    inside = r2 <= 1.0
+    dz = np.sqrt(np.clip(1.0 - r2, 0.0, 1.0))
+    light = LIGHT / np.linalg.norm(LIGHT)
+    lambert = np.clip(dx * light[0] + dy * light[1] + dz * light[2], 0.0, 1.0)
+    shade = 0.55 + 0.45 * lambert
+    rgb = np.clip(SPHERE_COLOUR[None, None, :] * shade[..., None], 0, 255).astype(np.uint8)
+    pygame.surfarray.pixels3d(surf)[...] = rgb.transpose(1, 0, 2)
+    alpha = pygame.surfarray.pixels_alpha(surf)
+    alpha[...] = np.where(inside, 110, 0).T.astype(np.uint8)
+    del alpha                                   # unlock the surface
+
+    # equator and the x-z meridian; the far halves lighter
+    for normal in ((0, 0, 1), (0, 1, 0)):
+        xy, depth = _circle(normal, radius)
+        pts = xy + c
+        for i in range(len(pts)):
+            if depth[i] >= 0 or i % 2 == 0:     # far half dashed
+                colour = GREY if depth[i] >= 0 else (150, 150, 170)
+                pygame.draw.aaline(surf, colour, pts[i], pts[(i + 1) % len(pts)])
+    pygame.draw.circle(surf, GREY, (c, c), radius, 1)
+
+    # axes and their labels
+    font = assets.font(None, 24)
+    for axis, label in (((1, 0, 0), "x"), ((0, 1, 0), "y"), ((0, 0, 1), "|0>"), ((0, 0, -1), "|1>")):
+        (tip,), _ = project([axis], radius)
+        pygame.draw.aaline(surf, (150, 150, 170), (c, c), tip + c)
+        (at,), _ = project([np.asarray(axis) * 1.18], radius)
+        img = font.render(label, True, BLACK)
+        surf.blit(img, img.get_rect(center=at + c))
+    return surf
+
+
+class BlochSphere:
+    """One qubit's Bloch sphere whose arrow turns smoothly to each new state."""
+    TURN_TIME = 0.4             # seconds per change
+
+    def __init__(self, radius, vector=(0.0, 0.0, 1.0)):
+        self.radius = radius
+        self.vector = np.array(vector, dtype=float)
+        self._from = self._to = self.vector
+        self._rotation = None
+        self._t = 1.0
+
+    @property
+    def turning(self):
+        return self._t < 1.0
+
+    def set_vector(self, vector, gate=None):
+        """Turn to ``vector``: as ``gate``'s rotation if it is a single-qubit gate."""
+        self._from = self.vector.copy()
+        self._to = np.array(vector, dtype=float)
+        self._rotation = GATE_ROTATIONS.get(gate)
+        self._t = 0.0
+
+    def update(self, dt):
+        if not self.turning:
+            return
+        self._t = min(1.0, self._t + dt / self.TURN_TIME)
+        s = 0.5 - 0.5 * np.cos(np.pi * self._t)            # ease in and out
+        if self._t >= 1.0:
+            self.vector = self._to
+        elif self._rotation is not None:
+            axis, angle = self._rotation
+            self.vector = _rotate(self._from, axis, angle * s)
+        else:
+            self.vector = _slide(self._from, self._to, s)
+
+    def draw(self, surface, center, label=None, colour=BLACK):
+        bg = sphere_background(self.radius)
+        cx, cy = center
+        surface.blit(bg, bg.get_rect(center=center))
+        (tip,), (depth,) = project([self.vector], self.radius)
+        (foot,), _ = project([(self.vector[0], self.vector[1], 0.0)], self.radius)
+        end = (cx + tip[0], cy + tip[1])
+        pygame.draw.aaline(surface, GREY, center, (cx + foot[0], cy + foot[1]))
+        pygame.draw.line(surface, ARROW_COLOUR, center, end, 3)
+        # the tip looks smaller and paler behind the sphere
+        tip_colour = ARROW_COLOUR if depth >= 0 else (230, 150, 160)
+        pygame.draw.circle(surface, tip_colour, end, 7 if depth >= 0 else 5)
+        pygame.draw.circle(surface, (20, 20, 20), center, 3)
+        if label:
+            img = assets.font(None, 32).render(label, True, colour)
+            surface.blit(img, img.get_rect(midtop=(cx, cy + self.radius + 30)))
@@ -0,0 +1,49 @@
+"""
+Performance overlay (F3): FPS, frame time percentiles and the latency of
+the last dice roll or measurement, from ``core.trace``.
+"""
+import pygame
+
+from super_quantum_party.core import assets, trace
+
+
+class PerfOverlay:
+    REFRESH = 0.25              # seconds between two updates of the text
+    PAD = 6
+
+    def __init__(self, visible=False):
+        self.visible = visible
+        self._timer = 0.0
+        self._image = None
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._image = None
+
+    def update(self, dt):
+        self._timer -= dt
+        if self.visible and (self._image is None or self._timer <= 0):
+            self._timer = self.REFRESH
+            self._image = self._render(trace.stats())
+
+    def _render(self, st):
+        lines = [f"{st['fps']:5.1f} FPS",
+                 f"frame p50 {st['p50']:.1f}  p95 {st['p95']:.1f}  p99 {st['p99']:.1f} ms"]
+        if st["sim"] is not None:
+            name, seconds = st["sim"]
+            lines.append(f"last {name}: {seconds * 1000:.0f} ms")
+        font = assets.font(None, 22)
+        imgs = [font.render(line, True, (255, 255, 255)) for line in lines]
+        w = max(i.get_width() for i in imgs) + 2 * self.PAD
+        h = sum(i.get_height() for i in imgs) + 2 * self.PAD
+        surf = pygame.Surface((w, h), pygame.SRCALPHA)
+        surf.fill((0, 0, 0, 170))
+        y = self.PAD
+        for img in imgs:
+            surf.blit(img, (self.PAD, y))
+            y += img.get_height()
+        return surf
+
+    def draw(self, s):
+        if self.visible and self._image is not None:
+            s.blit(self._image, self._image.get_rect(topright=(s.get_width() - 8, 8)))
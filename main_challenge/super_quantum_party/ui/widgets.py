@@ -5,6 +5,7 @@ know which fonts to use.
 """
 import pygame
 from super_quantum_party.settings import BLACK, GREY, GREEN
+from super_quantum_party.core import assets
 
 # will be set by init_fonts()
 FONT_L = FONT_M = FONT_S = None
@@ -87,14 +88,16 @@ class ToggleGroup:
                    FONT_S.render("0",True,BLACK).get_rect(center=r.center))
 
 class ImageSelect:
-    def __init__(self, images, pos):
+    THUMB_SIZE = (150, 150)
+    def __init__(self, images, pos, load=assets.get):
+        # images: core.assets descriptors, THUMB_SIZE large
         self.thumb_rects, self.images = [], []
         x,y=pos
-        for idx,fn in enumerate(images):
-            img=pygame.transform.smoothscale(pygame.image.load(fn),(150,150))
+        for idx,asset in enumerate(images):
+            img=load(asset)
             r  = img.get_rect(topleft=(x+idx*220, y))
             self.images.append(img); self.thumb_rects.append(r)
-        self.index=0; self.files=images
+        self.index=0; self.files=[asset[1] for asset in images]
     @property
     def filename(self): return self.files[self.index]
     def handle_event(self,e):
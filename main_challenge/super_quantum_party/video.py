@@ -0,0 +1,317 @@
+"""
+Replay to video.
+
+Renders a recorded game (``core.replay``) with the game's own scenes on an
+off-screen display (SDL's dummy video driver) and encodes it with
+``imageio``:
+
+    $ python -m super_quantum_party.video replays/game.sqpr -o game.mp4
+    $ python -m super_quantum_party.video --play 7 --bots greedy -o demo.mp4 --size 854x480
+
+``--play SEED`` records a fresh bot game first instead of reading a replay.
+
+Each round of the game (the players' turns and the gate round after them)
+is a segment.  A pool of processes renders the segments, and every worker
+restores its round from the replay's nearest keyframe (``engine_at``).
+Frames are paced by the game's own delays, e.g. ``GameScene.MOVE_DELAY``
+per step, and consecutive identical frames are merged.  Segments come back
+as zlib-compressed frame differences, in order, and only ``workers + 1`` of them are pending
+at a time.  The parent decompresses one frame at a time into the encoder's
+stream, so memory does not grow with the length of the game.
+
+The output size and frame rate are independent of ``settings.WIDTH`` /
+``HEIGHT`` / ``FPS``.  Scenes are drawn at the window size, then scaled and
+letterboxed to the video size.  ``.mp4`` needs the ``imageio-ffmpeg``
+plugin, which streams; ``.gif`` uses Pillow, which keeps the frames until
+the file is closed.
+"""
+from __future__ import annotations
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+from collections import deque
+
+import numpy as np
+
+from super_quantum_party.core.engine import ROLL
+from super_quantum_party.core.replay import ReplayReader, replay_to_end
+
+# seconds each kind of step stays on screen (at --speed 1)
+PACE = {
+    "dice": 0.5,
+    "move": 0.4,            # GameScene.MOVE_DELAY
+    "star": 0.8,
+    "reward": 0.6,
+    "place": 0.6,
+    "measured": 1.2,
+    "topology": 0.8,
+    "gate_round": 0.8,
+    "game_over": 3.0,
+}
+DEFAULT_PACE = 0.25         # decisions without visible events (skip, continue)
+OPENING = 1.0               # first frame of the game
+GLIDE = 0.6                 # share of a move's time spent sliding the pawn
+
+_W = {}                     # per-worker state, filled by _init_worker
+
+
+# ── rendering (worker processes) ───────────────────────────────────────
+def _init_worker(data, size, fps, speed):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    from super_quantum_party.maps import registry
+    from super_quantum_party.settings import WIDTH, HEIGHT
+    from super_quantum_party.ui.widgets import init_fonts
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))        # images need a display to convert
+    from super_quantum_party.core import assets
+    init_fonts(assets.font(None, 72), assets.font(None, 32), assets.font(None, 24))
+    reader = ReplayReader(data)
+    _W.update(reader=reader, map_module=registry.get_map(reader.map_name),
+              size=size, fps=fps, speed=speed,
+              canvas=pygame.Surface((WIDTH, HEIGHT)), frame=pygame.Surface(size))
+
+
+def _video_scene_class():
+    from super_quantum_party.core.scene import SceneManager
+    from super_quantum_party.scenes.game import GameScene
+
+    class QuietManager(SceneManager):
+        def go_to(self, scene):
+            self.scene = scene
+
+    class VideoScene(GameScene):
+        """Board view whose pawns slide between tiles."""
+
+        def __init__(self, manager, engine, map_module):
+            super().__init__(manager, engine.players, engine.state.n_turns, map_module,
+                             engine=engine)
+            self.glide = {}              # slot -> (from, to, progress 0..1)
+
+        def _pawn_pos(self, p):
+            if p.slot not in self.glide:
+                return super()._pawn_pos(p)
+            (x0, y0), (x1, y1), t = self.glide[p.slot]
+            return x0 + (x1 - x0) * t, y0 + (y1 - y0) * t
+
+    return QuietManager, VideoScene
+
+
+class _Clip:
+    """Frames of one segment as ``[zlib bytes, repeat count]``.
+
+    The first frame is its RGB bytes, every later one the XOR with the
+    frame before it – mostly zeros, since little moves between two frames.
+    """
+
+    def __init__(self, manager):
+        import pygame
+        self.pygame = pygame
+        self.manager = manager
+        self.fps = _W["fps"]
+        self.time = 0.0
+        self.frames = []
+        self.n_frames = 0
+        self._last = None
+
+    def show(self, seconds, glide=None):
+        """Add ``seconds`` of the current scene; ``glide`` animates a move."""
+        start = round(self.time * self.fps)
+        self.time += seconds / _W["speed"]
+        n = round(self.time * self.fps) - start
+        scene = self.manager.scene
+        if glide is None:
+            if n:
+                self._add(self._render(scene), n)       # a still: drawn once
+            return
+        slot, a, b = glide
+        for i in range(n):
+            scene.glide[slot] = (a, b, min(1.0, (i + 1) / max(1.0, n * GLIDE)))
+            self._add(self._render(scene))
+        scene.glide.pop(slot, None)
+
+    def _render(self, scene):
+        pygame = self.pygame
+        canvas, frame = _W["canvas"], _W["frame"]
+        if hasattr(scene, "_refresh_probs"):
+            scene._refresh_probs()                  # gate round view
+        scene.draw(canvas)
+        if frame.get_size() == canvas.get_size():
+            return pygame.image.tobytes(canvas, "RGB")
+        fw, fh = frame.get_size()
+        cw, ch = canvas.get_size()
+        k = min(fw / cw, fh / ch)
+        w, h = max(1, round(cw * k)), max(1, round(ch * k))
+        frame.fill((0, 0, 0))
+        frame.blit(pygame.transform.smoothscale(canvas, (w, h)), ((fw - w) // 2, (fh - h) // 2))
+        return pygame.image.tobytes(frame, "RGB")
+
+    def _add(self, raw, repeat=1):
+        self.n_frames += repeat
+        if raw == self._last:
+            self.frames[-1][1] += repeat
+            return
+        delta = raw if self._last is None else _xor(raw, self._last)
+        self._last = raw
+        self.frames.append([zlib.compress(delta, 1), repeat])
+
+
+def _xor(a, b):
+    return np.bitwise_xor(np.frombuffer(a, np.uint8), np.frombuffer(b, np.uint8)).tobytes()
+
+
+def render_segment(rnd):
+    """Frames of round ``rnd``: its turns, then the gate round or the results."""
+    reader = _W["reader"]
+    QuietManager, VideoScene = _video_scene_class()
+    engine = reader.engine_at(rnd)
+    manager = QuietManager(None)
+    scene = manager.scene = VideoScene(manager, engine, _W["map_module"])
+    clip = _Clip(manager)
+    if rnd == 0:
+        clip.show(OPENING)
+    steps = reader.steps(engine)
+    s = engine.state
+    while True:
+        if s.phase == ROLL and s.active == 0 and not s.dice and reader.current_round(engine) > rnd:
+            break                                    # next segment's round
+        before = {p.slot: p.position for p in engine.players}
+        item = next(steps, None)
+        if item is None:
+            break
+        events = item[0]
+        scene.react(events)
+        glide = None
+        for event in events:
+            if event[0] == "move":
+                p = engine.players[event[1]]
+                g = scene.g.nodes
+                glide = (p.slot, g[before[p.slot]]["pos"], g[p.position]["pos"])
+        clip.show(max([DEFAULT_PACE] + [PACE.get(e[0], 0) for e in events]),
+                  glide if manager.scene is scene else None)
+    return clip.frames, clip.n_frames
+
+
+# ── encoding (parent process) ──────────────────────────────────────────
+def _writer(path, fps):
+    import imageio.v2 as imageio
+    if path.lower().endswith(".gif"):
+        return imageio.get_writer(path, mode="I", duration=1000 / fps, loop=0)
+    try:
+        return imageio.get_writer(path, fps=fps, macro_block_size=1)
+    except (ImportError, ValueError) as err:
+        raise SystemExit(f"cannot encode {path}: {err}\n"
+                         "(install imageio-ffmpeg for .mp4, or export a .gif)") from None
+
+
+def export(data, path, size=(1280, 720), fps=30, workers=None, speed=1.0, progress=True):
+    """Render the replay ``data`` into the video file ``path``; return the frame count."""
+    reader = ReplayReader(data)
+    final = replay_to_end(reader)
+    rounds = reader.n_turns if final.is_over() else reader.current_round(final) + 1
+    workers = workers or os.cpu_count() or 1
+    w, h = size
+    writer = _writer(path, fps)
+    frames = 0
+    t0 = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(data, size, fps, speed)) as pool:
+        todo = iter(range(rounds))
+        pending = deque()
+
+        def submit():
+            rnd = next(todo, None)
+            if rnd is not None:
+                pending.append(pool.apply_async(render_segment, (rnd,)))
+
+        for _ in range(workers + 1):
+            submit()
+        done = 0
+        try:
+            while pending:
+                chunk, n = pending.popleft().get()
+                submit()
+                image = None
+                for packed, repeat in chunk:
+                    delta = np.frombuffer(zlib.decompress(packed), np.uint8).reshape(h, w, 3)
+                    image = delta if image is None else image ^ delta
+                    for _ in range(repeat):
+                        writer.append_data(image)
+                frames += n
+                done += 1
+                if progress:
+                    print(f"\rround {done}/{rounds}: {frames} frames "
+                          f"({frames / (time.perf_counter() - t0):.0f} frames/s)", end="", flush=True)
+        finally:
+            writer.close()
+    if progress:
+        print()
+    return frames
+
+
+def record_bot_game(seed, level="greedy", n_turns=10, map_name="new_map", seats=4):
+    """Replay bytes of a fresh headless game played by ``level`` bots."""
+    from super_quantum_party.core import bots
+    from super_quantum_party.core.board import Board
+    from super_quantum_party.core.engine import Engine, play
+    from super_quantum_party.core.replay import Recorder
+    from super_quantum_party.maps import registry
+    from super_quantum_party.models.player import Player
+    cmap = registry.get_map(map_name).load()
+    players = []
+    for i in range(seats):
+        p = Player(i)
+        p.bot = bots.make_bot(level, seed * 8 + i)
+        p.set_name(f"{level} bot {i + 1}")
+        players.append(p)
+    engine = Engine(Board.from_compiled(cmap), players, n_turns, seed=seed)
+    recorder = Recorder(engine, map_name, cmap.digest, seed)
+    play(engine, bots.bot_policy)
+    return recorder.to_bytes()
+
+
+def _size(text):
+    w, _, h = text.lower().partition("x")
+    try:
+        size = int(w), int(h)
+    except ValueError:
+        raise argparse.ArgumentTypeError("size must look like 1280x720") from None
+    if size[0] < 16 or size[1] < 16 or size[0] % 2 or size[1] % 2:
+        raise argparse.ArgumentTypeError("width and height must be even and at least 16")
+    return size
+
+
+if __name__ == "__main__":
+    from super_quantum_party.core import bots
+
+    ap = argparse.ArgumentParser(description="Render a replay into a video.")
+    ap.add_argument("replay", nargs="?", help=".sqpr file (see SQP_RECORD_DIR)")
+    ap.add_argument("-o", "--output", default="game.mp4", help=".mp4 or .gif")
+    ap.add_argument("--size", type=_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    ap.add_argument("--fps", type=int, default=30)
+    ap.add_argument("--speed", type=float, default=1.0, help="playback speed factor")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--play", type=int, default=None, metavar="SEED",
+                    help="record a new bot game with this seed instead of reading a replay")
+    ap.add_argument("--bots", default="greedy", choices=sorted(bots.BOT_LEVELS))
+    ap.add_argument("--turns", type=int, default=10)
+    ap.add_argument("--map", default="new_map")
+    args = ap.parse_args()
+
+    if args.play is not None:
+        data = record_bot_game(args.play, args.bots, args.turns, args.map)
+    elif args.replay:
+        with open(args.replay, "rb") as f:
+            data = f.read()
+    else:
+        ap.error("give a replay file or --play SEED")
+    t0 = time.perf_counter()
+    n = export(data, args.output, args.size, args.fps, args.workers, args.speed)
+    dt = time.perf_counter() - t0
+    print(f"{args.output}: {n} frames ({n / args.fps:.1f}s of video) in {dt:.1f}s, "
+          f"{os.path.getsize(args.output) / 1024:.0f} KiB")
+    sys.exit(0)
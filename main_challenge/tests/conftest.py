@@ -0,0 +1,5 @@
+"""Headless pygame for every test: no window, no sound card."""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,43 @@
+"""Memory stays flat over menu -> game -> gate -> winner cycles (``core.memory``)."""
+import pygame
+import pytest
+
+from super_quantum_party.core import assets, memory
+from super_quantum_party.core.scene import SceneManager
+from super_quantum_party.scenes.menu import MenuScene
+from super_quantum_party.settings import WIDTH, HEIGHT
+from super_quantum_party.ui.widgets import init_fonts
+
+WARM_UP, CYCLES = 1, 3
+HEAP_BUDGET = 256 << 10         # bytes of heap growth allowed per cycle, as the CLI
+
+
+@pytest.fixture
+def manager():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    init_fonts(assets.font(None, 72), assets.font(None, 32), assets.font(None, 24))
+    manager = SceneManager(MenuScene(None))
+    manager.scene.manager = manager
+    memory.start(verbose=False)
+    yield manager, screen
+    memory.stop()
+    pygame.quit()
+
+
+# pytest keeps every warning it catches; qiskit's would pile up in the heap
+@pytest.mark.filterwarnings("ignore")
+def test_cycles_do_not_grow(manager):
+    manager, screen = manager
+    for _ in range(WARM_UP):
+        memory._cycle(manager, screen, "Greedy")
+    samples = [memory.sample()]
+    for _ in range(CYCLES):
+        memory._cycle(manager, screen, "Greedy")
+        samples.append(memory.sample())
+    base, end = samples[0], samples[-1]
+    report = "\n".join(memory.report())
+    assert (end.traced - base.traced) / CYCLES <= HEAP_BUDGET, report
+    assert end.surfaces <= base.surfaces, report
+    assert end.sounds <= base.sounds, report
+    assert not memory.flags(), report
@@ -0,0 +1,11 @@
+"""The menu's first frame comes within budget and before qiskit is loaded (``startup``)."""
+from super_quantum_party import startup
+
+
+def test_first_frame(capsys):
+    ok = startup.main(["--runs", "1", "--budget", str(startup.DEFAULT_BUDGET)])
+    out = capsys.readouterr().out
+    assert "over budget" not in out, out
+    assert "meant to load lazily" not in out, out
+    assert ok, out
+
@@ -8,6 +8,21 @@ from qiskit_ibm_runtime import EstimatorV2 as Estimator
 from qiskit_aer import AerSimulator
 from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
 
+try:    # shots and run time per call site, when main_challenge is on PYTHONPATH
+    from super_quantum_party.core import jobs
+except ImportError:
+    from types import SimpleNamespace
+
+    def _run_primitive(primitive, pubs, site=None, **options):
+        return primitive.run(pubs, **options).result()
+
+    def _transpile(circuits, pass_manager, site=None):
+        return pass_manager.run(circuits)
+
+    # same calls, nothing accounted
+    jobs = SimpleNamespace(run_primitive=_run_primitive, transpile=_transpile,
+                           report=lambda *args, **kwargs: "quantum jobs not tracked")
+
 
 def compute_exact_sol(hamiltonian: SparsePauliOp) -> tuple[float, list[str]]:
     """ Classical computation of the inputted Hamiltonian's solutions.
@@ -58,7 +73,7 @@ def calc_score(
     sampler = Sampler(mode=backend)
     circuit_copy = circuit.decompose(reps=2).copy()
     circuit_copy.measure_all()
-    data = sampler.run([(circuit_copy, params)]).result()[0].data.meas
+    data = jobs.run_primitive(sampler, [(circuit_copy, params)], site="calc_score sampler")[0].data.meas
     counts = data.get_counts()
     nb_shots = data.num_shots
 
@@ -73,9 +88,10 @@ def calc_score(
     # Compute the average value of the cost function obtained with the specified optimal parameters
     estimator = Estimator(mode=backend)
     pm = generate_preset_pass_manager(backend=estimator._backend, optimization_level=1)
-    isa_psi = pm.run(circuit)
+    isa_psi = jobs.transpile(circuit, pm, site="calc_score estimator")
     isa_observables = hamiltonian.apply_layout(isa_psi.layout)
-    cost = estimator.run([(isa_psi, isa_observables, params)]).result()[0].data.evs
+    cost = jobs.run_primitive(estimator, [(isa_psi, isa_observables, params)],
+                              site="calc_score estimator")[0].data.evs
 
     print("Optimal cost : ", cost)
     print("Score : ", score)
@@ -120,6 +136,7 @@ def main():
 
     print("Score", score)
     print("Solutions", binary_sols)
+    print(jobs.report())
 
 
 if __name__ == "__main__":
@@ -389,6 +389,9 @@ def main():
     else:
         print("\nKey generation failed. Encryption cannot proceed.")
 
+    if bell.jobs is not None:
+        print("\n" + bell.jobs.report())
+
 
 
 if __name__ == "__main__":
@@ -2,10 +2,25 @@ import random
 import numpy as np
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
-from qiskit import transpile
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 
+try:    # shots and run time per call site, when main_challenge is on PYTHONPATH
+    from super_quantum_party.core import jobs
+except ImportError:
+    from types import SimpleNamespace
+    from qiskit import transpile as _qiskit_transpile
+
+    def _run(backend, circuits, shots=None, site=None, transpile=False, **options):
+        if transpile:
+            circuits = _qiskit_transpile(circuits, backend)
+        if shots is not None:
+            options["shots"] = shots
+        return backend.run(circuits, **options).result()
+
+    # same calls, nothing accounted
+    jobs = SimpleNamespace(run=_run, report=lambda *args, **kwargs: "quantum jobs not tracked")
+
 
 # ------------------------------------------------------------------------------------
 # CHSH Bell inequality
@@ -104,10 +119,10 @@ def run_circuit(circ: QuantumCircuit, shots=1) -> dict:
     MANUAL_SIMULATOR_SEED_COUNTER += 1 # Increment for the next call to run_circuit
     # ---------------------------------
     
-    circ = transpile(circ, aer_simulator)
-    result = aer_simulator.run(circ, shots=shots, seed_simulator=current_run_seed).result()
+    result = jobs.run(aer_simulator, circ, shots=shots, transpile=True,
+                      seed_simulator=current_run_seed)
 
-    return result.get_counts(circ) # get the counts of the circuit
+    return result.get_counts() # get the counts of the circuit
 
 
 # --------------------------------------------------------
@@ -616,6 +631,7 @@ def visualize_bell_test_results(correlations, chsh_value, title="Bell Test Resul
 def main():
     # Test both standard Bell inequality demo and comparison of measurement methods
     demonstrate_bell_inequality(1000)
+    print(jobs.report())
 
 
 